@@ -0,0 +1,146 @@
+"""
+Benchmark: wall-clock latency of a model turn with parallel function calls,
+using the synchronous tools versus their async variants.
+
+Each turn is executed the way ADK executes the function calls of one model
+response: every call becomes a task on the event loop, and the turn ends when
+all of them have finished. Synchronous tools block the loop, so their calls
+run one after another; the async variants overlap.
+
+Usage:
+    python benchmarks/async_tools_benchmark.py [--files 2000] [--repeat 5]
+    GITHUB_TOKEN=... python benchmarks/async_tools_benchmark.py --repository owner/repo --paths README.md,setup.py
+    python benchmarks/async_tools_benchmark.py --simulate-github-ms 150
+
+Local disk calls on a warm page cache are CPU-bound and gain little; the
+difference shows on network-bound calls. --simulate-github-ms runs a GitHub
+turn offline against a stand-in API with a fixed per-request latency.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.adk.tools import FunctionTool  # noqa: E402
+
+from coding_assistant.shared_libraries.cache import content_cache  # noqa: E402
+from coding_assistant.tools import async_tools, filesystem, github_tools, grep  # noqa: E402
+
+
+class _ToolContext:
+    """Just enough of a ToolContext for the tools under test."""
+
+    def __init__(self):
+        self.state = {}
+        self.function_call_id = "benchmark"
+
+
+def _make_tree(root: str, file_count: int):
+    for i in range(file_count):
+        directory = os.path.join(root, f"pkg{i % 20}", f"mod{i % 7}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"file{i}.py"), "w") as f:
+            for line in range(200):
+                f.write(f"def function_{i}_{line}(value):\n    return value + {line}  # TODO\n")
+
+
+async def _run_turn(tools, calls):
+    """Run one turn's function calls concurrently, as ADK does."""
+    tasks = [
+        asyncio.create_task(FunctionTool(tools[name]).run_async(args=args, tool_context=_ToolContext()))
+        for name, args in calls
+    ]
+    return await asyncio.gather(*tasks)
+
+
+def _measure(tools, calls, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        # Measure the I/O, not the content cache
+        content_cache.clear()
+        started = time.perf_counter()
+        asyncio.run(_run_turn(tools, calls))
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def _simulate_github(latency_seconds: float):
+    """Answer GitHub API requests offline after a fixed delay."""
+    os.environ.setdefault("GITHUB_TOKEN", "benchmark")
+    os.environ["CODING_ASSISTANT_CACHE_DIR"] = tempfile.mkdtemp()
+    success, env = github_tools._get_github_env()
+    success, client = github_tools._create_github_client(env)
+
+    def request_json(verb, url, parameters=None, headers=None, input=None, **kwargs):
+        time.sleep(latency_seconds)
+        path = url.split("/contents/", 1)[-1]
+        if url.endswith("/contents/"):
+            entries = [{"type": "file", "name": f"f{i}.py", "path": f"f{i}.py", "sha": "0", "size": 1} for i in range(20)]
+            return 200, {}, json.dumps(entries)
+        content = base64.b64encode(b"print('hello')\n" * 100).decode("ascii")
+        return 200, {}, json.dumps({"type": "file", "name": path, "path": path, "sha": "0", "size": 1600, "content": content})
+
+    client.requester.requestJson = request_json
+
+
+def _report(label: str, calls, sync_tools, async_tools_map, repeat: int):
+    sync_time = _measure(sync_tools, calls, repeat)
+    async_time = _measure(async_tools_map, calls, repeat)
+    print(f"{label}: {len(calls)} calls")
+    print(f"  sync tools:  {sync_time * 1000:8.1f} ms")
+    print(f"  async tools: {async_time * 1000:8.1f} ms  ({sync_time / async_time:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000, help="Files in the synthetic project")
+    parser.add_argument("--repeat", type=int, default=5, help="Turns per measurement (median is reported)")
+    parser.add_argument("--repository", help="GitHub repository (owner/repo) for the GitHub turn")
+    parser.add_argument("--paths", default="README.md", help="Comma-separated files to fetch from --repository")
+    parser.add_argument("--simulate-github-ms", type=float, default=0, help="Run an offline GitHub turn with this request latency")
+    args = parser.parse_args()
+
+    sync_tools = {
+        "read_file": filesystem.read_file,
+        "list_directory": filesystem.list_directory,
+        "search_files": filesystem.search_files,
+        "grep_files": grep.grep_files,
+        "github_get_file_contents": github_tools.github_get_file_contents,
+        "github_list_directory_contents": github_tools.github_list_directory_contents,
+    }
+    async_tools_map = {name: getattr(async_tools, name) for name in sync_tools}
+
+    with tempfile.TemporaryDirectory() as root:
+        _make_tree(root, args.files)
+        calls = [("read_file", {"path": os.path.join(root, f"pkg{i}", f"mod{i % 7}", f"file{i}.py")}) for i in range(8)]
+        calls += [("list_directory", {"path": os.path.join(root, f"pkg{i}")}) for i in range(4)]
+        calls += [("search_files", {"path": root, "pattern": f"file{i}*.py"}) for i in range(2)]
+        calls += [("grep_files", {"directory": os.path.join(root, f"pkg{i}"), "pattern": f"function_{i}_1"}) for i in range(4)]
+        _report("Local project turn", calls, sync_tools, async_tools_map, args.repeat)
+
+    if args.simulate_github_ms > 0:
+        _simulate_github(args.simulate_github_ms / 1000)
+        calls = [("github_get_file_contents", {"path": f"src/file{i}.py", "repository": "owner/repo"}) for i in range(8)]
+        calls.append(("github_list_directory_contents", {"repository": "owner/repo", "path": "/"}))
+        _report(f"Simulated GitHub turn ({args.simulate_github_ms:g} ms per request)", calls, sync_tools, async_tools_map, args.repeat)
+
+    if args.repository:
+        if not os.environ.get("GITHUB_TOKEN"):
+            print("GitHub turn skipped: GITHUB_TOKEN is not set")
+            return
+        paths = [p for p in args.paths.split(",") if p]
+        calls = [("github_get_file_contents", {"path": p, "repository": args.repository}) for p in paths]
+        calls.append(("github_list_directory_contents", {"repository": args.repository, "path": "/"}))
+        _report(f"GitHub turn ({args.repository})", calls, sync_tools, async_tools_map, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark: import time of the Coding Assistant.
+
+Imports a module in fresh interpreters with ``python -X importtime`` and
+reports the total time, the cost per top-level package and the most expensive
+modules, as the median over several runs. With --serve it also starts the
+HTTP server and measures the time from process start to the first /healthz
+response, which is what a cold container start pays before serving.
+
+Usage:
+    python benchmarks/import_benchmark.py
+    python benchmarks/import_benchmark.py --module coding_assistant.server --top 30
+    python benchmarks/import_benchmark.py --serve
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import httpx
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+    return env
+
+
+def _import_times(module: str) -> Tuple[float, Dict[str, Tuple[float, float]]]:
+    """Import module in a fresh interpreter; return the wall time and {module: (self, cumulative)} in seconds."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=_env(), cwd=REPO_ROOT,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(own) / 1e6, int(cumulative) / 1e6)
+    return elapsed, modules
+
+
+def _serve_time(timeout: float) -> float:
+    """Start the server and return the seconds until /healthz answers."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    env = _env()
+    env.update(HOST="127.0.0.1", PORT=str(port), WEB_CONCURRENCY="1")
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "coding_assistant.server"],
+        env=env, cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise SystemExit("The server exited during start-up")
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/healthz", timeout=1).raise_for_status()
+                return time.perf_counter() - started
+            except httpx.HTTPError:
+                time.sleep(0.01)
+        raise SystemExit(f"The server did not answer within {timeout:.0f} s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def _report(module: str, runs: List[Tuple[float, Dict[str, Tuple[float, float]]]], top: int):
+    totals = [modules[module][1] for _, modules in runs if module in modules]
+    print(f"import {module}: {statistics.median(totals) * 1000:.0f} ms imports, "
+          f"{statistics.median(elapsed for elapsed, _ in runs) * 1000:.0f} ms interpreter wall time "
+          f"(median of {len(runs)} runs)")
+
+    names = set().union(*(modules for _, modules in runs))
+    own = {name: statistics.median(modules.get(name, (0, 0))[0] for _, modules in runs) for name in names}
+    cumulative = {name: statistics.median(modules.get(name, (0, 0))[1] for _, modules in runs) for name in names}
+
+    packages: Dict[str, float] = defaultdict(float)
+    for name, seconds in own.items():
+        packages[name.split(".")[0]] += seconds
+    print(f"\n  {'ms':>8}  package (self time of all its modules)")
+    for name, seconds in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {seconds * 1000:8.1f}  {name}")
+
+    print(f"\n  {'self ms':>8} {'cum ms':>8}  module")
+    for name in sorted(names, key=lambda name: -cumulative[name])[:top]:
+        print(f"  {own[name] * 1000:8.1f} {cumulative[name] * 1000:8.1f}  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="coding_assistant.agent", help="Module to import")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters to import in")
+    parser.add_argument("--top", type=int, default=20, help="Packages and modules to list")
+    parser.add_argument("--serve", action="store_true", help="Also measure server start to first /healthz response")
+    parser.add_argument("--timeout", type=float, default=60, help="Longest wait for the server in seconds")
+    args = parser.parse_args()
+
+    _report(args.module, [_import_times(args.module) for _ in range(args.repeat)], args.top)
+    if args.serve:
+        times = [_serve_time(args.timeout) for _ in range(args.repeat)]
+        print(f"\nserver start to first response: {statistics.median(times) * 1000:.0f} ms "
+              f"(median of {len(times)}, min {min(times) * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
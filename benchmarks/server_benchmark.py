@@ -0,0 +1,66 @@
+"""
+Benchmark: throughput of the HTTP server under concurrent users.
+
+Each simulated user sends its queries one after another in its own session, as
+a chat client would; all users run at the same time. The report gives queries
+per second and latency percentiles, so runs with different worker counts can
+be compared as concurrent users per core.
+
+Usage:
+    python -m coding_assistant.server &
+    python benchmarks/server_benchmark.py --url http://localhost:8080 --users 50 --queries 4
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def _user(client: httpx.AsyncClient, url: str, query: str, queries: int, latencies: list, errors: list):
+    session_id = None
+    for _ in range(queries):
+        started = time.perf_counter()
+        try:
+            response = await client.post(url, json={"query": query, "session_id": session_id})
+            response.raise_for_status()
+            session_id = response.json()["session_id"]
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            errors.append(repr(e))
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def _run(url: str, users: int, queries: int, query: str, timeout: float):
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(_user(client, url, query, queries, latencies, errors) for _ in range(users)))
+        elapsed = time.perf_counter() - started
+
+    print(f"{users} users x {queries} queries in {elapsed:.2f} s: {len(latencies) / elapsed:.1f} queries/s, {len(errors)} errors")
+    if latencies:
+        latencies.sort()
+        print(f"  latency p50 {statistics.median(latencies) * 1000:.0f} ms, "
+              f"p95 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000:.0f} ms, "
+              f"max {latencies[-1] * 1000:.0f} ms")
+    if errors:
+        print(f"  first error: {errors[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8080/", help="Server URL")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent users")
+    parser.add_argument("--queries", type=int, default=3, help="Queries per user, in one session")
+    parser.add_argument("--query", default="List the files in the project root", help="Query text")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-request timeout in seconds")
+    args = parser.parse_args()
+    asyncio.run(_run(args.url, args.users, args.queries, args.query, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
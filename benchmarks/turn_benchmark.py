@@ -0,0 +1,73 @@
+"""
+Benchmark: time breakdown of scripted agent turns.
+
+Replays a script with the scripted model (no network) several times, each
+turn in a new session on one runner, and reports the median total, model,
+tool and framework time. The first turn pays one-off start-up costs and is
+reported separately. Comparing the medians between revisions shows
+regressions in tool or orchestration overhead.
+
+Usage:
+    python benchmarks/turn_benchmark.py --script benchmarks/scripts/review.json --turns 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.genai import types  # noqa: E402
+
+from coding_assistant.main import DEFAULT_USER_ID, create_runner, get_or_create_session  # noqa: E402
+from coding_assistant.shared_libraries.profiling import TurnProfiler, format_report  # noqa: E402
+from coding_assistant.shared_libraries.scripted_llm import ScriptedLlm, use_model  # noqa: E402
+
+FIELDS = ("total_ms", "model_ms", "tool_ms", "framework_ms")
+
+
+async def _turn(runner, profiler: TurnProfiler, model: ScriptedLlm, query: str) -> dict:
+    session_id = await get_or_create_session(runner, DEFAULT_USER_ID)
+    model.rewind()
+    profiler.reset()
+    content = types.Content(role="user", parts=[types.Part(text=query)])
+    async for event in runner.run_async(user_id=DEFAULT_USER_ID, session_id=session_id, new_message=content):
+        profiler.record_event(event)
+    profiler.finish()
+    return profiler.report()
+
+
+async def _run(script: str, turns: int, query: str, show_timeline: bool):
+    from coding_assistant.agent import root_agent
+    model = ScriptedLlm.from_file(script)
+    use_model(root_agent, model)
+    profiler = TurnProfiler()
+    runner = create_runner(root_agent, plugins=[profiler])
+
+    first = await _turn(runner, profiler, model, query)
+    reports = [await _turn(runner, profiler, model, query) for _ in range(turns)]
+    await runner.close()
+
+    print("first turn: " + ", ".join(f"{field[:-3]} {first[field]:.1f} ms" for field in FIELDS))
+    print(f"median of {turns} turns: " + ", ".join(
+        f"{field[:-3]} {statistics.median(report[field] for report in reports):.1f} ms" for field in FIELDS
+    ))
+    if show_timeline and reports:
+        print()
+        print(format_report(reports[-1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--script", default="benchmarks/scripts/review.json", help="Script replayed by the scripted model")
+    parser.add_argument("--turns", type=int, default=10, help="Measured turns after the first")
+    parser.add_argument("--query", default="Review coding_assistant/tools/grep.py", help="User message of each turn")
+    parser.add_argument("--timeline", action="store_true", help="Print the timeline of the last turn")
+    args = parser.parse_args()
+    asyncio.run(_run(args.script, args.turns, args.query, args.timeline))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,8 @@ from coding_assistant.sub_agents.planner.agent import planner_agent
 from coding_assistant.sub_agents.coder.agent import coder_agent
 from coding_assistant.sub_agents.reviewer.agent import reviewer_agent
 from coding_assistant.tools.filesystem import load_initial_context
+from coding_assistant.tools.history_compaction import history_compaction
+from coding_assistant.tools.response_budget import get_more_results
 from coding_assistant.prompts.root_agent import ROOT_AGENT_PROMPT
 
 # Root agent that orchestrates the coding assistant
@@ -20,6 +22,8 @@ root_agent = Agent(
     name="coding_assistant",
     description="A coding assistant that helps with code analysis, planning, implementation, and review",
     instruction=ROOT_AGENT_PROMPT,
+    # Returns tool output that history compaction left out of the prompt
+    tools=[get_more_results],
     sub_agents=[
         analyzer_agent,
         planner_agent,
@@ -27,6 +31,7 @@ root_agent = Agent(
         reviewer_agent,
     ],
     before_agent_callback=load_initial_context,
+    before_model_callback=history_compaction(),
     generate_content_config=GenerateContentConfig(
         temperature=0.2,
     ),
@@ -2,75 +2,205 @@
 Main entrypoint for the Coding Assistant.
 
 This module demonstrates how to use the Coding Assistant agent.
+
+Usage:
+    python -m coding_assistant.main "Analyze the structure of this project"
+    python -m coding_assistant.main --profile "Review README.md"
+    python -m coding_assistant.main --profile --script benchmarks/scripts/review.json
 """
 
+import argparse
+import asyncio
 import os
 import json
+from typing import Any, Dict, List, Optional
+
 from dotenv import load_dotenv
-from google.adk.artifacts.in_memory_artifact_service import InMemoryArtifactService
+from google.adk.agents import BaseAgent
+from google.adk.apps import App
+from google.adk.artifacts import BaseArtifactService
+from google.adk.plugins import BasePlugin
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
+from google.adk.sessions import BaseSessionService
 from google.genai import types
 
-from coding_assistant.agent import root_agent
+from coding_assistant.shared_libraries.persistence import default_artifact_service, default_session_service
+from coding_assistant.shared_libraries.profiling import TurnProfiler, format_report
+from coding_assistant.shared_libraries.scripted_llm import ScriptedLlm, restore_models, use_model
+
+APP_NAME = "coding_assistant"
+DEFAULT_USER_ID = "user1"
+
+_runner: Optional[Runner] = None
 
-def run_coding_assistant(query: str):
+
+def initial_state() -> Dict[str, Any]:
     """
-    Run the coding assistant with a query.
-    
-    Args:
-        query: The query to run
+    Return the state a new session starts with.
     """
-    # Load environment variables
-    load_dotenv()
-    
-    # Set up services
-    session_service = InMemorySessionService()
-    artifact_service = InMemoryArtifactService()
-    
-    # Create a session with initial state
-    initial_state = {
+    return {
         "project_path": os.getcwd(),
         "project_language": "python",
         "project_framework": "google-adk",
     }
-    
-    session = session_service.create_session(
-        state=initial_state, app_name="coding_assistant", user_id="user1"
+
+
+def create_runner(
+    agent: Optional[BaseAgent] = None,
+    session_service: Optional[BaseSessionService] = None,
+    artifact_service: Optional[BaseArtifactService] = None,
+    plugins: Optional[List[BasePlugin]] = None,
+) -> Runner:
+    """
+    Build a runner for the coding assistant.
+
+    The runner and its services are meant to be built once per process and
+    shared by every query; sessions then persist between queries.
+
+    Args:
+        agent: The root agent (defaults to the coding assistant)
+        session_service: Session storage (defaults to the SQLite session database,
+            see CODING_ASSISTANT_SESSION_DB)
+        artifact_service: Artifact storage (defaults to the same database)
+        plugins: Runner plugins applied to every agent, e.g. a TurnProfiler
+
+    Returns:
+        Runner: The runner
+    """
+    if agent is None:
+        from coding_assistant.agent import root_agent
+        agent = root_agent
+    return Runner(
+        app=App(name=APP_NAME, root_agent=agent, plugins=plugins or []),
+        artifact_service=artifact_service or default_artifact_service(),
+        session_service=session_service or default_session_service(),
     )
-    
+
+
+def get_runner() -> Runner:
+    """
+    Return the process-wide runner, building it on first use.
+    """
+    global _runner
+    if _runner is None:
+        load_dotenv()
+        _runner = create_runner()
+    return _runner
+
+
+async def get_or_create_session(runner: Runner, user_id: str, session_id: Optional[str] = None, state: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Return the ID of an existing session, or create the session.
+
+    Args:
+        runner: The runner whose session service holds the sessions
+        user_id: The user the session belongs to
+        session_id: ID of the session to reuse (a new ID is generated if empty)
+        state: State overrides for a new session
+
+    Returns:
+        str: The session ID
+    """
+    if session_id:
+        session = await runner.session_service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+        if session is not None:
+            return session.id
+    session = await runner.session_service.create_session(
+        app_name=APP_NAME,
+        user_id=user_id,
+        state={**initial_state(), **(state or {})},
+        session_id=session_id or None,
+    )
+    return session.id
+
+
+async def _run(query: str, session_id: Optional[str], runner: Runner, profiler: Optional[TurnProfiler] = None) -> str:
+    session_id = await get_or_create_session(runner, DEFAULT_USER_ID, session_id)
+
     # Create content from query
     print(f"[User]: {query}")
     content = types.Content(role="user", parts=[types.Part(text=query)])
-    
-    # Create a runner
-    runner = Runner(
-        app_name="coding_assistant",
-        agent=root_agent,
-        artifact_service=artifact_service,
-        session_service=session_service,
-    )
-    
+
     # Run the agent
-    for event in runner.run(
-        session_id=session.id, user_id="user1", new_message=content
+    if profiler is not None:
+        profiler.reset()
+    async for event in runner.run_async(
+        session_id=session_id, user_id=DEFAULT_USER_ID, new_message=content
     ):
+        if profiler is not None:
+            profiler.record_event(event)
         if event.content:
             author = event.author
-            for part in event.content.parts:
-                if hasattr(part, "text") and part.text:
+            for part in event.content.parts or []:
+                if part.text:
                     print(f"[{author}]: {part.text}")
-                elif hasattr(part, "function_call"):
+                elif part.function_call:
                     function_call = part.function_call
                     print(f"[{author}]: Function call: {function_call.name}({json.dumps(function_call.args)})")
-                elif hasattr(part, "function_response"):
+                elif part.function_response:
                     function_response = part.function_response
-                    print(f"[{author}]: Function response: {function_response.name} -> {json.dumps(function_response.response)}")
+                    print(f"[{author}]: Function response: {function_response.name} -> {json.dumps(function_response.response, default=str)}")
+    if profiler is not None:
+        profiler.finish()
+    return session_id
+
+
+def run_coding_assistant(
+    query: str,
+    session_id: Optional[str] = None,
+    profile: bool = False,
+    script: Optional[str] = None,
+    profile_json: Optional[str] = None,
+) -> str:
+    """
+    Run the coding assistant with a query.
+
+    In profiling mode the turn runs on its own runner with a TurnProfiler, and
+    a breakdown of model, tool and framework time is printed afterwards. With
+    a script, every agent calls a ScriptedLlm instead of Gemini, so the turn
+    is deterministic and runs offline.
+
+    Args:
+        query: The query to run
+        session_id: Session to continue (a new session is created if empty)
+        profile: Print a timeline and time breakdown of the turn
+        script: JSON script replayed by a scripted model instead of Gemini
+        profile_json: Also write the profile report to this file as JSON
+
+    Returns:
+        str: The ID of the session the query ran in
+    """
+    if not (profile or script or profile_json):
+        return asyncio.run(_run(query, session_id, get_runner()))
+
+    load_dotenv()
+    from coding_assistant.agent import root_agent
+    # The scripted model only replaces Gemini for this run, not for later users of root_agent
+    models = use_model(root_agent, ScriptedLlm.from_file(script)) if script else {}
+    profiler = TurnProfiler()
+    try:
+        session_id = asyncio.run(_run(query, session_id, create_runner(root_agent, plugins=[profiler]), profiler))
+    finally:
+        restore_models(root_agent, models)
+    report = profiler.report()
+    print()
+    print(format_report(report))
+    if profile_json:
+        with open(profile_json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return session_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Coding Assistant with a query.")
+    parser.add_argument("query", nargs="?", default="Analyze the structure of this project", help="The query to run")
+    parser.add_argument("--session", default=None, help="Session ID to continue")
+    parser.add_argument("--profile", action="store_true", help="Print a timeline and time breakdown of the turn")
+    parser.add_argument("--script", default=None, help="Replay this JSON script instead of calling Gemini (offline)")
+    parser.add_argument("--profile-json", default=None, help="Write the profile report to this JSON file")
+    args = parser.parse_args()
+    run_coding_assistant(args.query, args.session, args.profile, args.script, args.profile_json)
+
 
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) > 1:
-        query = sys.argv[1]
-    else:
-        query = "Analyze the structure of this project"
-    run_coding_assistant(query)
+    main()
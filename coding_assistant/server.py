@@ -0,0 +1,254 @@
+"""
+HTTP server for the Coding Assistant.
+
+Each worker process builds the runner and its services once and serves many
+queries concurrently on its event loop. Sessions are kept between requests by
+session ID, and replies can be streamed back as server-sent events.
+
+Run with:
+    python -m coding_assistant.server
+    uvicorn coding_assistant.server:app --host 0.0.0.0 --port 8080 --workers 4
+
+Requests:
+    POST /  {"query": "...", "session_id": "...", "user_id": "...", "state": {...}, "stream": false}
+    GET  /healthz
+    GET  /metrics                        tool and cache metrics (Prometheus text format)
+    GET  /sessions/{session_id}/tools    time spent per tool and agent in a session
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+from typing import Any, AsyncIterator, Dict, Optional
+
+from dotenv import load_dotenv
+from google.adk.agents import BaseAgent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event
+from google.genai import types
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from coding_assistant.main import DEFAULT_USER_ID, create_runner, get_or_create_session
+from coding_assistant.tools.instrumentation import prometheus_metrics, session_summary
+
+# Queries a worker runs at once; further requests wait for a free slot
+MAX_CONCURRENT_RUNS = int(os.environ.get("CODING_ASSISTANT_SERVER_MAX_RUNS", 64))
+
+
+def event_payload(event: Event) -> Dict[str, Any]:
+    """
+    Convert an event into the JSON sent to clients.
+
+    Args:
+        event: An event produced by the runner
+
+    Returns:
+        Dict[str, Any]: The author, the text and tool call parts, and whether
+        the event is partial (a streamed chunk) or the final response
+    """
+    parts = []
+    for part in (event.content.parts or []) if event.content else []:
+        if part.text:
+            parts.append({"text": part.text})
+        elif part.function_call:
+            parts.append({"function_call": {"name": part.function_call.name, "args": part.function_call.args}})
+        elif part.function_response:
+            parts.append({"function_response": {"name": part.function_response.name, "response": part.function_response.response}})
+    return {
+        "author": event.author,
+        "partial": bool(event.partial),
+        "final": event.is_final_response(),
+        "parts": parts,
+    }
+
+
+class _SessionLocks:
+    """Serializes the queries of one session; different sessions run concurrently."""
+
+    def __init__(self):
+        self._locks: Dict[str, list] = {}
+
+    @contextlib.asynccontextmanager
+    async def hold(self, key: str):
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+
+class AssistantServer:
+    """
+    Runs queries against one shared runner.
+    """
+
+    def __init__(self, agent: Optional[BaseAgent] = None, session_service=None, artifact_service=None):
+        """
+        Args:
+            agent: The root agent (defaults to the coding assistant)
+            session_service: Session storage (defaults to the SQLite session database)
+            artifact_service: Artifact storage (defaults to the same database)
+        """
+        self.runner = create_runner(agent, session_service, artifact_service)
+        self._locks = _SessionLocks()
+        self._slots = asyncio.Semaphore(MAX_CONCURRENT_RUNS)
+        self.active = 0
+        self.completed = 0
+
+    async def run(self, query: str, user_id: str, session_id: Optional[str], state: Optional[dict], stream: bool) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run one query and yield its events as payloads.
+
+        The first payload announces the session ID, so clients can continue the
+        conversation even if the run fails later.
+
+        Args:
+            query: The user's message
+            user_id: The user the session belongs to
+            session_id: Session to continue (a new session is created if empty)
+            state: State overrides for a new session
+            stream: Stream model output in chunks (partial events)
+        """
+        run_config = RunConfig(streaming_mode=StreamingMode.SSE if stream else StreamingMode.NONE)
+        content = types.Content(role="user", parts=[types.Part(text=query)])
+        async with self._slots:
+            # Without an ID there is nothing to serialize against yet
+            async with self._locks.hold(f"{user_id}/{session_id}") if session_id else contextlib.nullcontext():
+                session_id = await get_or_create_session(self.runner, user_id, session_id, state)
+                yield {"session_id": session_id}
+                self.active += 1
+                try:
+                    async for event in self.runner.run_async(
+                        user_id=user_id, session_id=session_id, new_message=content, run_config=run_config
+                    ):
+                        yield event_payload(event)
+                finally:
+                    self.active -= 1
+                    self.completed += 1
+
+    async def close(self):
+        await self.runner.close()
+
+
+def _sse(payload: Dict[str, Any], event: Optional[str] = None) -> str:
+    data = json.dumps(payload, default=str)
+    return f"event: {event}\ndata: {data}\n\n" if event else f"data: {data}\n\n"
+
+
+def create_app(agent: Optional[BaseAgent] = None, session_service=None, artifact_service=None) -> Starlette:
+    """
+    Build the ASGI application; the runner is created once for the worker.
+
+    Args:
+        agent: The root agent (defaults to the coding assistant)
+        session_service: Session storage (defaults to the SQLite session database)
+        artifact_service: Artifact storage (defaults to the same database)
+
+    Returns:
+        Starlette: The application
+    """
+    load_dotenv()
+    server = AssistantServer(agent, session_service, artifact_service)
+
+    async def query(request: Request):
+        try:
+            body = await request.json()
+        except ValueError:
+            return JSONResponse({"success": False, "error": "Request body must be JSON"}, status_code=400)
+        text = body.get("query") if isinstance(body, dict) else None
+        if not isinstance(text, str) or not text.strip():
+            return JSONResponse({"success": False, "error": "'query' is required"}, status_code=400)
+        user_id = str(body.get("user_id") or DEFAULT_USER_ID)
+        session_id = body.get("session_id") or None
+        state = body.get("state") if isinstance(body.get("state"), dict) else None
+        stream = bool(body.get("stream")) or "text/event-stream" in request.headers.get("accept", "")
+        events = server.run(text, user_id, session_id, state, stream)
+
+        if stream:
+            async def sse():
+                try:
+                    async for payload in events:
+                        yield _sse(payload, "session" if "session_id" in payload else None)
+                    yield _sse({"done": True}, "done")
+                except Exception as e:
+                    yield _sse({"error": str(e)}, "error")
+
+            return StreamingResponse(sse(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+        payloads = []
+        try:
+            async for payload in events:
+                payloads.append(payload)
+        except Exception as e:
+            return JSONResponse({"success": False, "error": str(e), **(payloads[0] if payloads else {})}, status_code=500)
+        final = [part["text"] for payload in payloads if payload.get("final") for part in payload["parts"] if "text" in part]
+        return JSONResponse({
+            "success": True,
+            "session_id": payloads[0]["session_id"],
+            "response": "\n".join(final),
+            "events": payloads[1:],
+        })
+
+    async def health(request: Request):
+        return JSONResponse({"status": "ok", "active": server.active, "completed": server.completed})
+
+    async def metrics(request: Request):
+        return PlainTextResponse(prometheus_metrics(), media_type="text/plain; version=0.0.4")
+
+    async def session_tools(request: Request):
+        summary = session_summary(request.path_params["session_id"])
+        if summary is None:
+            return JSONResponse({"success": False, "error": "No tool calls recorded for this session by this worker"}, status_code=404)
+        return JSONResponse({"success": True, **summary})
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        yield
+        await server.close()
+
+    app = Starlette(
+        routes=[
+            Route("/", query, methods=["POST"]),
+            Route("/healthz", health, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+            Route("/sessions/{session_id}/tools", session_tools, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.server = server
+    return app
+
+
+def __getattr__(name):
+    # The app is built on first access: uvicorn imports this module by name, so
+    # "python -m coding_assistant.server" would otherwise build a second app in
+    # __main__ that is never served
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main():
+    """Serve the app with uvicorn; WEB_CONCURRENCY sets the number of worker processes."""
+    import uvicorn
+    uvicorn.run(
+        "coding_assistant.server:app",
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=int(os.environ.get("PORT", 8080)),
+        workers=int(os.environ.get("WEB_CONCURRENCY", 1)),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Cache helpers shared by the Coding Assistant tools.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+CACHE_DIR_ENV = "CODING_ASSISTANT_CACHE_DIR"
+CONTENT_CACHE_ENV = "CODING_ASSISTANT_CONTENT_CACHE_BYTES"
+
+# [hits, misses] of the cache lookups made by the tool call running in this
+# context (set by the tool instrumentation, None outside a tool call)
+cache_lookups: ContextVar[Optional[List[int]]] = ContextVar("cache_lookups", default=None)
+
+
+def count_cache_lookup(hit: bool):
+    """
+    Count a cache lookup towards the tool call running in this context.
+
+    Args:
+        hit: Whether the lookup was served from the cache
+    """
+    counts = cache_lookups.get()
+    if counts is not None:
+        counts[0 if hit else 1] += 1
+
+
+def get_cache_dir(*parts: str) -> str:
+    """
+    Return (and create) a directory for on-disk tool caches.
+
+    The base directory defaults to ``~/.cache/coding_assistant`` and can be
+    moved with the CODING_ASSISTANT_CACHE_DIR environment variable.
+
+    Args:
+        *parts: Optional sub-directory components below the cache root
+
+    Returns:
+        The absolute path of the cache directory
+    """
+    base = os.environ.get(CACHE_DIR_ENV) or os.path.join(
+        os.path.expanduser("~"), ".cache", "coding_assistant"
+    )
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class ByteLRUCache:
+    """
+    A thread-safe LRU cache bounded by the total size of its values in bytes.
+
+    Entries may carry a tag (e.g. the file path they were read from) so that all
+    entries derived from the same source can be invalidated together.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Args:
+            max_bytes: Total size budget of the cached values
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, Optional[Hashable]]]" = OrderedDict()
+        self._tags: Dict[Hashable, set] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a value and mark it as recently used.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        count_cache_lookup(entry is not None)
+        return entry[0] if entry is not None else None
+
+    def put(self, key: Hashable, value: Any, size: int, tag: Optional[Hashable] = None):
+        """
+        Store a value, evicting least recently used entries to stay within budget.
+
+        Args:
+            key: The cache key
+            value: The value to store
+            size: The size of the value in bytes
+            tag: Optional tag used by invalidate_tag
+        """
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (value, size, tag)
+            self._bytes += size
+            if tag is not None:
+                self._tags.setdefault(tag, set()).add(key)
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def _discard(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry[1]
+        tag = entry[2]
+        if tag is not None:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate_tag(self, tag: Hashable):
+        """
+        Drop every entry stored with a tag.
+
+        Args:
+            tag: The tag passed to put
+        """
+        with self._lock:
+            for key in list(self._tags.get(tag, ())):
+                self._discard(key)
+
+    def clear(self):
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return hit/miss counters and the current occupancy.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Shared by read_file and github_get_file_contents
+content_cache = ByteLRUCache(int(os.environ.get(CONTENT_CACHE_ENV, 64 * 1024 * 1024)))
+
+
+def local_file_tag(path: str) -> str:
+    """Return the tag under which content read from a local file is cached."""
+    return os.path.realpath(path)
+
+
+def invalidate_local_file(path: str):
+    """
+    Forget cached content of a local file, e.g. after a tool wrote to it.
+
+    Args:
+        path: The file path
+    """
+    content_cache.invalidate_tag(local_file_tag(path))
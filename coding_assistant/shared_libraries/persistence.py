@@ -0,0 +1,656 @@
+"""
+Persistent session and artifact storage for the Coding Assistant.
+
+Sessions, their events and state, and artifacts are kept in one SQLite
+database in WAL mode, so they survive restarts and are shared by every worker
+process on the host. All writes of a process go through a single writer
+thread that commits whatever has queued up in one transaction (group commit),
+and WAL with synchronous=NORMAL avoids an fsync per commit, so appending an
+event costs far less than a durable commit of its own. Reads use per-thread
+connections and never wait for the writer.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from google.adk.artifacts import BaseArtifactService, InMemoryArtifactService
+from google.adk.artifacts.base_artifact_service import ArtifactVersion, ensure_part
+from google.adk.errors import StaleSessionError
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.errors.input_validation_error import InputValidationError
+from google.adk.errors.session_not_found_error import SessionNotFoundError
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+from google.genai import types
+
+from coding_assistant.shared_libraries.cache import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+SESSION_DB_ENV = "CODING_ASSISTANT_SESSION_DB"
+SESSION_SYNC_ENV = "CODING_ASSISTANT_SESSION_SYNC"
+MAX_EVENTS_ENV = "CODING_ASSISTANT_SESSION_MAX_EVENTS"
+
+# Seconds a connection waits for another process holding the write lock
+BUSY_TIMEOUT = 30.0
+# Most queued writes folded into one transaction
+MAX_BATCH = 256
+# Appends between two compaction passes (when CODING_ASSISTANT_SESSION_MAX_EVENTS is set)
+COMPACT_EVERY = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    update_time REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE INDEX IF NOT EXISTS sessions_by_update ON sessions (app_name, update_time);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    event_data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_session ON events (app_name, user_id, session_id, seq);
+CREATE UNIQUE INDEX IF NOT EXISTS events_by_id ON events (app_name, user_id, session_id, id);
+CREATE TABLE IF NOT EXISTS artifacts (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    mime_type TEXT,
+    custom_metadata TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    part TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, filename, version)
+);
+"""
+
+
+class _Database:
+    """
+    One SQLite database: a group-committing writer thread plus per-thread readers.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.synchronous = os.environ.get(SESSION_SYNC_ENV, "NORMAL").upper()
+        self._local = threading.local()
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self.writes = 0
+        self.commits = 0
+        conn = self._connect()
+        # Only takes effect on a new database; lets compaction hand pages back to the OS
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.executescript(_SCHEMA)
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _read(self, op: Callable, args: tuple) -> Any:
+        conn = self._reader()
+        # One transaction, so the rows come from a single snapshot
+        conn.execute("BEGIN")
+        try:
+            return op(conn, *args)
+        finally:
+            conn.execute("COMMIT")
+
+    async def read(self, op: Callable, *args) -> Any:
+        """Run op(conn, *args) on a read connection in a worker thread."""
+        return await asyncio.to_thread(self._read, op, args)
+
+    async def write(self, op: Callable, *args) -> Any:
+        """Queue op(conn, *args) for the writer and wait until its transaction has committed."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._submit(op, args, loop, future)
+        return await future
+
+    def write_later(self, op: Callable, *args):
+        """Queue op(conn, *args) without waiting for it (used for housekeeping)."""
+        self._submit(op, args, None, None)
+
+    def _submit(self, op, args, loop, future):
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run_writer, name="session-db-writer", daemon=True)
+                self._writer.start()
+        self._queue.put((op, args, loop, future))
+
+    def _run_writer(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            outcomes = []
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for op, args, _, _ in batch:
+                    # A failing write only rolls back its own changes
+                    conn.execute("SAVEPOINT write")
+                    try:
+                        outcomes.append((True, op(conn, *args)))
+                        conn.execute("RELEASE write")
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO write")
+                        conn.execute("RELEASE write")
+                        outcomes.append((False, e))
+                conn.execute("COMMIT")
+                self.commits += 1
+                self.writes += len(batch)
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                outcomes = [(False, e)] * len(batch)
+            for (op, _, loop, future), outcome in zip(batch, outcomes):
+                if future is not None:
+                    try:
+                        loop.call_soon_threadsafe(_resolve, future, outcome)
+                    except RuntimeError:
+                        # The caller's event loop has been closed meanwhile
+                        pass
+                elif not outcome[0]:
+                    logger.warning("Background session write %s failed: %s", op.__name__, outcome[1])
+
+    async def flush(self):
+        """Wait until everything queued so far has been committed."""
+        await self.write(lambda conn: None)
+
+
+def _resolve(future: asyncio.Future, outcome: Tuple[bool, Any]):
+    if future.cancelled():
+        return
+    ok, value = outcome
+    if ok:
+        future.set_result(value)
+    else:
+        future.set_exception(value)
+
+
+_databases: Dict[str, _Database] = {}
+_databases_lock = threading.Lock()
+
+
+def _open(path: str) -> _Database:
+    """Return the process-wide handle of a database file, so its services share one writer."""
+    path = os.path.abspath(path)
+    with _databases_lock:
+        database = _databases.get(path)
+        if database is None:
+            database = _databases[path] = _Database(path)
+        return database
+
+
+def default_db_path() -> str:
+    """
+    Return the session database path.
+
+    CODING_ASSISTANT_SESSION_DB overrides the default of sessions.db in the
+    cache directory.
+    """
+    return os.environ.get(SESSION_DB_ENV) or os.path.join(get_cache_dir("sessions"), "sessions.db")
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+
+def _split_delta(delta: Dict[str, Any]) -> Tuple[dict, dict, dict]:
+    """Split a state delta into its app, user and session parts; temp keys are dropped."""
+    app, user, session = {}, {}, {}
+    for key, value in delta.items():
+        if key.startswith(State.APP_PREFIX):
+            app[key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            user[key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session[key] = value
+    return app, user, session
+
+
+def _load_state(conn: sqlite3.Connection, query: str, params: tuple) -> dict:
+    row = conn.execute(query, params).fetchone()
+    return json.loads(row["state"]) if row else {}
+
+
+def _app_state(conn, app_name: str) -> dict:
+    return _load_state(conn, "SELECT state FROM app_states WHERE app_name=?", (app_name,))
+
+
+def _user_state(conn, app_name: str, user_id: str) -> dict:
+    return _load_state(conn, "SELECT state FROM user_states WHERE app_name=? AND user_id=?", (app_name, user_id))
+
+
+def _merge_state(app_state: dict, user_state: dict, session_state: dict) -> dict:
+    merged = dict(session_state)
+    merged.update({State.APP_PREFIX + key: value for key, value in app_state.items()})
+    merged.update({State.USER_PREFIX + key: value for key, value in user_state.items()})
+    return merged
+
+
+def _apply_shared_deltas(conn, app_name: str, user_id: str, app_delta: dict, user_delta: dict, now: float):
+    if app_delta:
+        state = _app_state(conn, app_name)
+        state.update(app_delta)
+        conn.execute(
+            "INSERT INTO app_states (app_name, state, update_time) VALUES (?, ?, ?) "
+            "ON CONFLICT(app_name) DO UPDATE SET state=excluded.state, update_time=excluded.update_time",
+            (app_name, _dumps(state), now),
+        )
+    if user_delta:
+        state = _user_state(conn, app_name, user_id)
+        state.update(user_delta)
+        conn.execute(
+            "INSERT INTO user_states (app_name, user_id, state, update_time) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(app_name, user_id) DO UPDATE SET state=excluded.state, update_time=excluded.update_time",
+            (app_name, user_id, _dumps(state), now),
+        )
+
+
+def _create_session(conn, app_name: str, user_id: str, session_id: str, state: dict, now: float) -> dict:
+    exists = conn.execute(
+        "SELECT 1 FROM sessions WHERE app_name=? AND user_id=? AND id=?", (app_name, user_id, session_id)
+    ).fetchone()
+    if exists:
+        raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+    app_delta, user_delta, session_state = _split_delta(state)
+    _apply_shared_deltas(conn, app_name, user_id, app_delta, user_delta, now)
+    conn.execute(
+        "INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time) VALUES (?, ?, ?, ?, ?, ?)",
+        (app_name, user_id, session_id, _dumps(session_state), now, now),
+    )
+    return _merge_state(_app_state(conn, app_name), _user_state(conn, app_name, user_id), session_state)
+
+
+def _get_session(conn, app_name: str, user_id: str, session_id: str, num_recent_events: Optional[int], after_timestamp: Optional[float]):
+    row = conn.execute(
+        "SELECT state, update_time FROM sessions WHERE app_name=? AND user_id=? AND id=?",
+        (app_name, user_id, session_id),
+    ).fetchone()
+    if row is None:
+        return None
+    query = "SELECT event_data FROM events WHERE app_name=? AND user_id=? AND session_id=?"
+    params: List[Any] = [app_name, user_id, session_id]
+    if after_timestamp is not None:
+        query += " AND timestamp >= ?"
+        params.append(after_timestamp)
+    query += " ORDER BY seq DESC"
+    if num_recent_events is not None:
+        query += " LIMIT ?"
+        params.append(num_recent_events)
+    events = [r["event_data"] for r in conn.execute(query, params)] if num_recent_events != 0 else []
+    events.reverse()
+    state = _merge_state(_app_state(conn, app_name), _user_state(conn, app_name, user_id), json.loads(row["state"]))
+    return state, events, row["update_time"]
+
+
+def _list_sessions(conn, app_name: str, user_id: Optional[str]):
+    if user_id:
+        rows = conn.execute(
+            "SELECT user_id, id, state, update_time FROM sessions WHERE app_name=? AND user_id=? ORDER BY update_time",
+            (app_name, user_id),
+        ).fetchall()
+    else:
+        rows = conn.execute(
+            "SELECT user_id, id, state, update_time FROM sessions WHERE app_name=? ORDER BY update_time",
+            (app_name,),
+        ).fetchall()
+    app_state = _app_state(conn, app_name)
+    user_states = {}
+    result = []
+    for row in rows:
+        if row["user_id"] not in user_states:
+            user_states[row["user_id"]] = _user_state(conn, app_name, row["user_id"])
+        state = _merge_state(app_state, user_states[row["user_id"]], json.loads(row["state"]))
+        result.append((row["user_id"], row["id"], state, row["update_time"]))
+    return result
+
+
+def _delete_session(conn, app_name: str, user_id: str, session_id: str):
+    key = (app_name, user_id, session_id)
+    conn.execute("DELETE FROM events WHERE app_name=? AND user_id=? AND session_id=?", key)
+    conn.execute("DELETE FROM artifacts WHERE app_name=? AND user_id=? AND session_id=?", key)
+    conn.execute("DELETE FROM sessions WHERE app_name=? AND user_id=? AND id=?", key)
+
+
+def _append_event(conn, app_name: str, user_id: str, session_id: str, last_update_time: float, event_id: str, timestamp: float, event_data: str, delta: dict) -> bool:
+    row = conn.execute(
+        "SELECT state, update_time FROM sessions WHERE app_name=? AND user_id=? AND id=?",
+        (app_name, user_id, session_id),
+    ).fetchone()
+    if row is None:
+        raise SessionNotFoundError(f"Session {session_id} not found.")
+    if row["update_time"] > last_update_time:
+        raise StaleSessionError(
+            "The last_update_time provided in the session object is earlier than the update_time in storage."
+        )
+    inserted = conn.execute(
+        "INSERT OR IGNORE INTO events (app_name, user_id, session_id, id, timestamp, event_data) VALUES (?, ?, ?, ?, ?, ?)",
+        (app_name, user_id, session_id, event_id, timestamp, event_data),
+    ).rowcount
+    if not inserted:
+        # A re-delivered event: its state delta has been applied already
+        return False
+    app_delta, user_delta, session_delta = _split_delta(delta)
+    _apply_shared_deltas(conn, app_name, user_id, app_delta, user_delta, timestamp)
+    state = json.loads(row["state"])
+    state.update(session_delta)
+    conn.execute(
+        "UPDATE sessions SET state=?, update_time=? WHERE app_name=? AND user_id=? AND id=?",
+        (_dumps(state) if session_delta else row["state"], timestamp, app_name, user_id, session_id),
+    )
+    return True
+
+
+def _compact(conn, max_events: int) -> int:
+    """Delete all but the newest max_events events of every session."""
+    deleted = conn.execute(
+        """
+        DELETE FROM events WHERE seq IN (
+            SELECT seq FROM (
+                SELECT seq, ROW_NUMBER() OVER (
+                    PARTITION BY app_name, user_id, session_id ORDER BY seq DESC
+                ) AS newer
+                FROM events
+            ) WHERE newer > ?
+        )
+        """,
+        (max_events,),
+    ).rowcount
+    if deleted:
+        conn.execute("PRAGMA incremental_vacuum")
+    return deleted
+
+
+class SqliteSessionService(BaseSessionService):
+    """
+    Session service backed by a SQLite database in WAL mode.
+
+    Event appends from concurrent sessions are committed together by one writer
+    thread. Sessions whose event count grows beyond max_events are trimmed to
+    their newest events from time to time; their state is kept in full.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_events: Optional[int] = None):
+        """
+        Args:
+            db_path: Database file (defaults to default_db_path())
+            max_events: Events kept per session by compaction (defaults to
+                CODING_ASSISTANT_SESSION_MAX_EVENTS; 0 keeps everything)
+        """
+        self._db = _open(db_path or default_db_path())
+        self.max_events = max_events if max_events is not None else int(os.environ.get(MAX_EVENTS_ENV, 0))
+        self._appends = 0
+
+    async def create_session(self, *, app_name: str, user_id: str, state: Optional[Dict[str, Any]] = None, session_id: Optional[str] = None) -> Session:
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        now = time.time()
+        merged = await self._db.write(_create_session, app_name, user_id, session_id, state or {}, now)
+        return Session(app_name=app_name, user_id=user_id, id=session_id, state=merged, events=[], last_update_time=now)
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str, config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        found = await self._db.read(
+            _get_session, app_name, user_id, session_id,
+            config.num_recent_events if config else None,
+            config.after_timestamp if config else None,
+        )
+        if found is None:
+            return None
+        state, events, update_time = found
+        return Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=state,
+            events=[Event.model_validate_json(data) for data in events],
+            last_update_time=update_time,
+        )
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        rows = await self._db.read(_list_sessions, app_name, user_id)
+        return ListSessionsResponse(sessions=[
+            Session(app_name=app_name, user_id=row_user, id=row_id, state=state, events=[], last_update_time=update_time)
+            for row_user, row_id, state, update_time in rows
+        ])
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self._db.write(_delete_session, app_name, user_id, session_id)
+
+    async def get_user_state(self, *, app_name: str, user_id: str) -> Dict[str, Any]:
+        return await self._db.read(_user_state, app_name, user_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        self._apply_temp_state(session, event)
+        event = self._trim_temp_delta_state(event)
+        delta = dict(event.actions.state_delta) if event.actions and event.actions.state_delta else {}
+        inserted = await self._db.write(
+            _append_event, session.app_name, session.user_id, session.id, session.last_update_time,
+            event.id, event.timestamp, event.model_dump_json(exclude_none=True), delta,
+        )
+        if not inserted:
+            return event
+        session.last_update_time = event.timestamp
+        self._appends += 1
+        if self.max_events and self._appends % COMPACT_EVERY == 0:
+            self._db.write_later(_compact, self.max_events)
+        return self._commit_event_to_session(session, event)
+
+    async def flush(self) -> None:
+        await self._db.flush()
+
+    async def compact(self, max_events: Optional[int] = None) -> int:
+        """
+        Delete all but the newest events of every session now.
+
+        Args:
+            max_events: Events to keep per session (defaults to max_events)
+
+        Returns:
+            int: The number of deleted events
+        """
+        keep = max_events if max_events is not None else self.max_events
+        if not keep or keep < 0:
+            return 0
+        return await self._db.write(_compact, keep)
+
+
+def _artifact_scope(filename: str, session_id: Optional[str]) -> str:
+    """Return the session_id column of an artifact; user-scoped ('user:') artifacts use ''."""
+    if filename.startswith("user:"):
+        return ""
+    if not session_id:
+        raise InputValidationError("Session ID must be provided for session-scoped artifacts.")
+    return session_id
+
+
+def _mime_type(part: types.Part) -> Optional[str]:
+    if part.inline_data is not None:
+        return part.inline_data.mime_type
+    if part.text is not None:
+        return "text/plain"
+    if part.file_data is not None:
+        return part.file_data.mime_type
+    raise InputValidationError("Not supported artifact type.")
+
+
+def _save_artifact(conn, app_name, user_id, scope, filename, mime_type, custom_metadata, now, part) -> int:
+    row = conn.execute(
+        "SELECT MAX(version) AS latest FROM artifacts WHERE app_name=? AND user_id=? AND session_id=? AND filename=?",
+        (app_name, user_id, scope, filename),
+    ).fetchone()
+    version = 0 if row["latest"] is None else row["latest"] + 1
+    conn.execute(
+        "INSERT INTO artifacts (app_name, user_id, session_id, filename, version, mime_type, custom_metadata, create_time, part) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (app_name, user_id, scope, filename, version, mime_type, custom_metadata, now, part),
+    )
+    return version
+
+
+def _artifact_rows(conn, columns: str, app_name, user_id, scope, filename, version: Optional[int]):
+    query = f"SELECT {columns} FROM artifacts WHERE app_name=? AND user_id=? AND session_id=? AND filename=?"
+    params: List[Any] = [app_name, user_id, scope, filename]
+    if version is not None:
+        query += " AND version=?"
+        params.append(version)
+    return conn.execute(query + " ORDER BY version", params).fetchall()
+
+
+def _latest_artifact_row(conn, columns: str, app_name, user_id, scope, filename, version: Optional[int]):
+    rows = _artifact_rows(conn, columns, app_name, user_id, scope, filename, version)
+    return rows[-1] if rows else None
+
+
+def _artifact_keys(conn, app_name, user_id, session_id: Optional[str]) -> List[str]:
+    scopes = ["", session_id] if session_id else [""]
+    rows = conn.execute(
+        f"SELECT DISTINCT filename FROM artifacts WHERE app_name=? AND user_id=? "
+        f"AND session_id IN ({', '.join('?' for _ in scopes)}) ORDER BY filename",
+        (app_name, user_id, *scopes),
+    ).fetchall()
+    return [row["filename"] for row in rows]
+
+
+def _delete_artifact(conn, app_name, user_id, scope, filename):
+    conn.execute(
+        "DELETE FROM artifacts WHERE app_name=? AND user_id=? AND session_id=? AND filename=?",
+        (app_name, user_id, scope, filename),
+    )
+
+
+class SqliteArtifactService(BaseArtifactService):
+    """
+    Artifact service storing every artifact version in the session database.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: Database file (defaults to default_db_path())
+        """
+        self._db = _open(db_path or default_db_path())
+
+    def _uri(self, app_name: str, user_id: str, scope: str, filename: str, version: int) -> str:
+        owner = f"users/{user_id}" + (f"/sessions/{scope}" if scope else "")
+        return f"sqlite://apps/{app_name}/{owner}/artifacts/{filename}/versions/{version}"
+
+    def _version(self, app_name: str, user_id: str, scope: str, filename: str, row) -> ArtifactVersion:
+        return ArtifactVersion(
+            version=row["version"],
+            canonical_uri=self._uri(app_name, user_id, scope, filename, row["version"]),
+            custom_metadata=json.loads(row["custom_metadata"]),
+            create_time=row["create_time"],
+            mime_type=row["mime_type"],
+        )
+
+    async def save_artifact(self, *, app_name: str, user_id: str, filename: str, artifact: Union[types.Part, Dict[str, Any]], session_id: Optional[str] = None, custom_metadata: Optional[Dict[str, Any]] = None) -> int:
+        scope = _artifact_scope(filename, session_id)
+        part = ensure_part(artifact)
+        return await self._db.write(
+            _save_artifact, app_name, user_id, scope, filename, _mime_type(part),
+            _dumps(custom_metadata or {}), time.time(), part.model_dump_json(exclude_none=True),
+        )
+
+    async def load_artifact(self, *, app_name: str, user_id: str, filename: str, session_id: Optional[str] = None, version: Optional[int] = None) -> Optional[types.Part]:
+        scope = _artifact_scope(filename, session_id)
+        row = await self._db.read(_latest_artifact_row, "part", app_name, user_id, scope, filename, version)
+        if row is None:
+            return None
+        part = types.Part.model_validate_json(row["part"])
+        return None if part == types.Part() else part
+
+    async def list_artifact_keys(self, *, app_name: str, user_id: str, session_id: Optional[str] = None) -> List[str]:
+        return await self._db.read(_artifact_keys, app_name, user_id, session_id)
+
+    async def delete_artifact(self, *, app_name: str, user_id: str, filename: str, session_id: Optional[str] = None) -> None:
+        await self._db.write(_delete_artifact, app_name, user_id, _artifact_scope(filename, session_id), filename)
+
+    async def list_versions(self, *, app_name: str, user_id: str, filename: str, session_id: Optional[str] = None) -> List[int]:
+        scope = _artifact_scope(filename, session_id)
+        rows = await self._db.read(_artifact_rows, "version", app_name, user_id, scope, filename, None)
+        return [row["version"] for row in rows]
+
+    async def list_artifact_versions(self, *, app_name: str, user_id: str, filename: str, session_id: Optional[str] = None) -> List[ArtifactVersion]:
+        scope = _artifact_scope(filename, session_id)
+        rows = await self._db.read(
+            _artifact_rows, "version, mime_type, custom_metadata, create_time", app_name, user_id, scope, filename, None
+        )
+        return [self._version(app_name, user_id, scope, filename, row) for row in rows]
+
+    async def get_artifact_version(self, *, app_name: str, user_id: str, filename: str, session_id: Optional[str] = None, version: Optional[int] = None) -> Optional[ArtifactVersion]:
+        scope = _artifact_scope(filename, session_id)
+        row = await self._db.read(
+            _latest_artifact_row, "version, mime_type, custom_metadata, create_time", app_name, user_id, scope, filename, version
+        )
+        return self._version(app_name, user_id, scope, filename, row) if row else None
+
+
+def default_session_service() -> BaseSessionService:
+    """
+    Return the session service configured by CODING_ASSISTANT_SESSION_DB.
+
+    The value 'memory' selects the in-memory service; anything else is the
+    path of the SQLite database (see default_db_path).
+    """
+    if os.environ.get(SESSION_DB_ENV, "").lower() == "memory":
+        return InMemorySessionService()
+    return SqliteSessionService()
+
+
+def default_artifact_service() -> BaseArtifactService:
+    """
+    Return the artifact service matching default_session_service.
+    """
+    if os.environ.get(SESSION_DB_ENV, "").lower() == "memory":
+        return InMemoryArtifactService()
+    return SqliteArtifactService()
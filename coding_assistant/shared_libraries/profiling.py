@@ -0,0 +1,210 @@
+"""
+Turn profiler for the Coding Assistant.
+
+TurnProfiler is a runner plugin that records, for every agent of a run, when
+each agent was active, each model call and each tool call, together with the
+events the runner yielded (function calls, function responses, agent
+transfers and replies). report() turns that into a timeline and a breakdown
+of the turn into model time, tool time and the framework overhead in
+between, and format_report() prints it.
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.events import Event
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.plugins import BasePlugin
+from google.adk.tools import BaseTool, ToolContext
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def _response_detail(llm_response: LlmResponse) -> str:
+    parts = llm_response.content.parts if llm_response.content and llm_response.content.parts else []
+    calls = [part.function_call.name for part in parts if part.function_call]
+    if calls:
+        return "calls " + ", ".join(calls)
+    text = "".join(part.text or "" for part in parts)
+    return f"text ({len(text)} chars)"
+
+
+def _union_seconds(intervals: List[Tuple[float, float]]) -> float:
+    """Total time covered by possibly overlapping intervals (parallel tool calls)."""
+    total = 0.0
+    covered_until = None
+    for start, end in sorted(intervals):
+        if covered_until is None or start > covered_until:
+            total += end - start
+            covered_until = end
+        elif end > covered_until:
+            total += end - covered_until
+            covered_until = end
+    return total
+
+
+class TurnProfiler(BasePlugin):
+    """
+    Records a timeline of agent runs, model calls, tool calls and events.
+    """
+
+    def __init__(self, name: str = "turn_profiler"):
+        super().__init__(name=name)
+        self.reset()
+
+    def reset(self):
+        """Forget the recorded turn and start the clock."""
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        # Closed and open spans: kind, agent, name, start, end, detail
+        self.spans: List[Dict[str, Any]] = []
+        self._open: Dict[Tuple, Dict[str, Any]] = {}
+        self.events: List[Dict[str, Any]] = []
+
+    def _now(self) -> float:
+        return time.perf_counter() - self.started
+
+    def _begin(self, key: Tuple, kind: str, agent: str, name: str = ""):
+        span = {"kind": kind, "agent": agent, "name": name, "start": self._now(), "end": None, "detail": ""}
+        self._open[key] = span
+        self.spans.append(span)
+
+    def _end(self, key: Tuple, detail: str = "", error: Optional[Exception] = None):
+        span = self._open.pop(key, None)
+        if span is None:
+            return
+        span["end"] = self._now()
+        span["detail"] = f"error: {error}" if error is not None else detail
+
+    def record_event(self, event: Event):
+        """
+        Add an event yielded by the runner to the timeline.
+
+        Args:
+            event: The event
+        """
+        offset = self._now()
+        parts = event.content.parts if event.content and event.content.parts else []
+        for part in parts:
+            if part.function_call:
+                self.events.append({"offset": offset, "agent": event.author, "kind": "function_call", "detail": part.function_call.name})
+            elif part.function_response:
+                self.events.append({"offset": offset, "agent": event.author, "kind": "function_response", "detail": part.function_response.name})
+            elif part.text and not event.partial:
+                kind = "final_response" if event.is_final_response() else "text"
+                self.events.append({"offset": offset, "agent": event.author, "kind": kind, "detail": f"{len(part.text)} chars"})
+        if event.actions and event.actions.transfer_to_agent:
+            self.events.append({"offset": offset, "agent": event.author, "kind": "agent_transfer", "detail": event.actions.transfer_to_agent})
+
+    async def before_agent_callback(self, *, agent: BaseAgent, callback_context: CallbackContext):
+        self._begin(("agent", callback_context.invocation_id, agent.name), "agent", agent.name)
+
+    async def after_agent_callback(self, *, agent: BaseAgent, callback_context: CallbackContext):
+        self._end(("agent", callback_context.invocation_id, agent.name))
+
+    async def before_model_callback(self, *, callback_context: CallbackContext, llm_request: LlmRequest):
+        self._begin(("model", callback_context.invocation_id, callback_context.agent_name), "model", callback_context.agent_name, llm_request.model or "")
+
+    async def after_model_callback(self, *, callback_context: CallbackContext, llm_response: LlmResponse):
+        if llm_response.partial:
+            return None
+        detail = _response_detail(llm_response)
+        usage = llm_response.usage_metadata
+        if usage is not None and usage.prompt_token_count is not None:
+            detail += f", {usage.prompt_token_count} prompt tokens"
+        self._end(("model", callback_context.invocation_id, callback_context.agent_name), detail)
+
+    async def on_model_error_callback(self, *, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception):
+        self._end(("model", callback_context.invocation_id, callback_context.agent_name), error=error)
+
+    async def before_tool_callback(self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext):
+        self._begin(("tool", tool_context.function_call_id), "tool", tool_context.agent_name, tool.name)
+
+    async def after_tool_callback(self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext, result: Dict[str, Any]):
+        failed = isinstance(result, dict) and result.get("success") is False
+        self._end(("tool", tool_context.function_call_id), "failed" if failed else "")
+
+    async def on_tool_error_callback(self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext, error: Exception):
+        self._end(("tool", tool_context.function_call_id), error=error)
+
+    def finish(self):
+        """Stop the clock; spans still open (e.g. of an agent that transferred away) end here."""
+        self.finished = self._now()
+        for key in list(self._open):
+            self._end(key, "still open at the end of the turn")
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarize the recorded turn.
+
+        Returns:
+            Dict[str, Any]: Total, model, tool and framework time in ms, the
+            per-tool totals and the timeline of spans and events by start time
+        """
+        total = self.finished if self.finished is not None else self._now()
+        models = [span for span in self.spans if span["kind"] == "model" and span["end"] is not None]
+        tools = [span for span in self.spans if span["kind"] == "tool" and span["end"] is not None]
+        model_seconds = sum(span["end"] - span["start"] for span in models)
+        tool_seconds = _union_seconds([(span["start"], span["end"]) for span in tools])
+
+        per_tool: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for span in tools:
+            entry = per_tool.setdefault((span["name"], span["agent"]), {"tool": span["name"], "agent": span["agent"], "calls": 0, "ms": 0.0})
+            entry["calls"] += 1
+            entry["ms"] = round(entry["ms"] + _ms(span["end"] - span["start"]), 3)
+
+        timeline = [
+            {
+                "offset_ms": _ms(span["start"]),
+                "duration_ms": _ms((span["end"] if span["end"] is not None else total) - span["start"]),
+                "kind": span["kind"],
+                "agent": span["agent"],
+                "detail": " ".join(filter(None, [span["name"], span["detail"]])),
+            }
+            for span in self.spans
+        ] + [
+            {"offset_ms": _ms(event["offset"]), "duration_ms": None, "kind": event["kind"], "agent": event["agent"], "detail": event["detail"]}
+            for event in self.events
+        ]
+        timeline.sort(key=lambda entry: (entry["offset_ms"], entry["duration_ms"] is None))
+        return {
+            "total_ms": _ms(total),
+            "model_ms": _ms(model_seconds),
+            "tool_ms": _ms(tool_seconds),
+            "framework_ms": _ms(max(0.0, total - model_seconds - tool_seconds)),
+            "model_calls": len(models),
+            "tool_calls": len(tools),
+            "tools": sorted(per_tool.values(), key=lambda entry: -entry["ms"]),
+            "timeline": timeline,
+        }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """
+    Render a profiler report as text.
+
+    Args:
+        report: The result of TurnProfiler.report()
+
+    Returns:
+        str: The breakdown, the per-tool totals and the timeline
+    """
+    lines = [
+        f"Turn {report['total_ms']:.1f} ms: model {report['model_ms']:.1f} ms ({report['model_calls']} calls), "
+        f"tools {report['tool_ms']:.1f} ms ({report['tool_calls']} calls), framework {report['framework_ms']:.1f} ms",
+    ]
+    if report["tools"]:
+        lines.append("")
+        lines.append(f"  {'ms':>10} {'calls':>5}  tool (agent)")
+        for entry in report["tools"]:
+            lines.append(f"  {entry['ms']:10.1f} {entry['calls']:5d}  {entry['tool']} ({entry['agent']})")
+    lines.append("")
+    lines.append(f"  {'at ms':>10} {'took ms':>10}  {'kind':<17} {'agent':<18} detail")
+    for entry in report["timeline"]:
+        duration = f"{entry['duration_ms']:10.1f}" if entry["duration_ms"] is not None else " " * 10
+        lines.append(f"  {entry['offset_ms']:10.1f} {duration}  {entry['kind']:<17} {entry['agent']:<18} {entry['detail']}")
+    return "\n".join(lines)
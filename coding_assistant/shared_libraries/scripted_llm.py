@@ -0,0 +1,124 @@
+"""
+Scripted model backend for the Coding Assistant.
+
+ScriptedLlm stands in for Gemini and replays a fixed script: every model call
+takes the next step, either a set of function calls or a text reply, after a
+simulated latency. Runs are deterministic and need no network, so the cost of
+tools and orchestration can be profiled offline and compared between
+revisions (python -m coding_assistant.main --profile --script <file>).
+
+Script format (JSON):
+    {
+      "latency_ms": 50,
+      "steps": [
+        {"calls": [{"name": "transfer_to_agent", "args": {"agent_name": "reviewer_agent"}}]},
+        {"calls": [{"name": "read_file", "args": {"path": "README.md"}}], "latency_ms": 200},
+        {"text": "The README is complete."}
+      ]
+    }
+
+The steps are consumed in order by whichever agent calls the model, so a
+script follows the agents through their transfers.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncGenerator, Dict, List
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+from pydantic import PrivateAttr
+
+from coding_assistant.shared_libraries.text import estimate_content_tokens
+
+# Reply once the script has no steps left
+FINISHED_TEXT = "The script has no more steps."
+
+
+class ScriptedLlm(BaseLlm):
+    """
+    A model that replays scripted function calls and replies.
+    """
+
+    model: str = "scripted"
+    steps: List[Dict[str, Any]] = []
+    latency_ms: float = 0.0
+
+    _position: int = PrivateAttr(default=0)
+
+    @classmethod
+    def from_file(cls, path: str) -> "ScriptedLlm":
+        """
+        Load a script from a JSON file.
+
+        Args:
+            path: Path of the script
+
+        Returns:
+            ScriptedLlm: The model replaying the script
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            script = json.load(f)
+        return cls(steps=script.get("steps", []), latency_ms=script.get("latency_ms", 0.0))
+
+    def rewind(self):
+        """Start the script over from its first step."""
+        self._position = 0
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        if self._position < len(self.steps):
+            step = self.steps[self._position]
+        else:
+            step = {"text": FINISHED_TEXT}
+        self._position += 1
+        await asyncio.sleep(step.get("latency_ms", self.latency_ms) / 1000)
+
+        parts = [
+            types.Part(function_call=types.FunctionCall(name=call["name"], args=call.get("args", {})))
+            for call in step.get("calls", [])
+        ]
+        if step.get("text") or not parts:
+            parts.insert(0, types.Part(text=step.get("text", "")))
+        content = types.Content(role="model", parts=parts)
+        yield LlmResponse(
+            content=content,
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=estimate_content_tokens(llm_request.contents),
+                candidates_token_count=estimate_content_tokens([content]),
+            ),
+        )
+
+
+def use_model(agent: BaseAgent, model: BaseLlm) -> Dict[str, Any]:
+    """
+    Make an agent and all of its sub-agents call the given model.
+
+    Args:
+        agent: The root of the agent tree
+        model: The model to use, e.g. a ScriptedLlm
+
+    Returns:
+        The previous model of each LLM agent by agent name, for restore_models
+    """
+    previous = {}
+    if isinstance(agent, LlmAgent):
+        previous[agent.name] = agent.model
+        agent.model = model
+    for sub_agent in agent.sub_agents:
+        previous.update(use_model(sub_agent, model))
+    return previous
+
+
+def restore_models(agent: BaseAgent, models: Dict[str, Any]):
+    """
+    Give the agents of a tree back the models use_model replaced.
+
+    Args:
+        agent: The root of the agent tree
+        models: The mapping returned by use_model
+    """
+    if isinstance(agent, LlmAgent) and agent.name in models:
+        agent.model = models[agent.name]
+    for sub_agent in agent.sub_agents:
+        restore_models(sub_agent, models)
@@ -0,0 +1,74 @@
+"""
+Text helpers shared by the Coding Assistant tools.
+"""
+
+import json
+from typing import Any, Iterable
+
+# How much of a file is inspected to decide whether it is binary
+BINARY_SNIFF_BYTES = 8192
+# Rough size of a token in characters of JSON, good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+
+def looks_binary(chunk: bytes) -> bool:
+    """
+    Guess whether a buffer holds binary data.
+
+    Like grep, a NUL byte within the sniffed prefix marks the file as binary.
+
+    Args:
+        chunk: The first bytes of the file (BINARY_SNIFF_BYTES is enough)
+
+    Returns:
+        True if the data looks binary
+    """
+    return b"\0" in chunk[:BINARY_SNIFF_BYTES]
+
+
+def json_size(value: Any) -> int:
+    """
+    Return the length of a value serialized as JSON, as it is sent to the model.
+
+    Args:
+        value: A tool response or any part of one
+
+    Returns:
+        The number of characters
+    """
+    return len(json.dumps(value, ensure_ascii=False, default=str))
+
+
+def estimate_tokens(value: Any) -> int:
+    """
+    Estimate the tokens a value takes up when sent to the model as JSON.
+
+    Args:
+        value: A tool response or any part of one
+
+    Returns:
+        The estimated token count
+    """
+    return -(-json_size(value) // CHARS_PER_TOKEN)
+
+
+def estimate_content_tokens(contents: Iterable[Any]) -> int:
+    """
+    Estimate the tokens of a model request history.
+
+    Args:
+        contents: The contents (google.genai Content objects) of a request
+
+    Returns:
+        The estimated token count of their texts, function calls and responses
+    """
+    total = 0
+    for content in contents:
+        for part in content.parts or []:
+            if part.function_response is not None:
+                total += estimate_tokens(part.function_response.response)
+            elif part.function_call is not None:
+                total += estimate_tokens(part.function_call.args)
+            elif part.text:
+                total += -(-len(part.text) // CHARS_PER_TOKEN)
+    return total
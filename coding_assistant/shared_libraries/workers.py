@@ -0,0 +1,67 @@
+"""
+Worker pool helpers shared by the Coding Assistant tools.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+WORKERS_ENV = "CODING_ASSISTANT_WORKERS"
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def worker_count() -> int:
+    """
+    Return the number of worker processes tools may fan out to.
+
+    Defaults to the number of CPUs and can be pinned with the
+    CODING_ASSISTANT_WORKERS environment variable (1 disables the pool).
+    """
+    try:
+        configured = int(os.environ.get(WORKERS_ENV, "0"))
+    except ValueError:
+        configured = 0
+    if configured > 0:
+        return configured
+    return os.cpu_count() or 1
+
+
+def _start_method() -> str:
+    # The pool is first created from threaded code (tool calls run in threads),
+    # and forking a multi-threaded process can deadlock the child
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Return the process-wide worker pool, creating it on first use.
+
+    Workers are started with forkserver (spawn where it is unavailable), never
+    by forking the calling process.
+
+    Returns:
+        The shared ProcessPoolExecutor, or None when only one worker is configured
+    """
+    global _pool
+    workers = worker_count()
+    if workers <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(_start_method()))
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+
+def reset_process_pool():
+    """Drop the shared pool, e.g. after a worker crashed and broke the executor."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -9,7 +9,9 @@ from google.genai.types import GenerateContentConfig
 
 from coding_assistant.prompts.analyzer_agent import ANALYZER_AGENT_PROMPT
 from coding_assistant.tools.code_analysis import analyze_dependencies, analyze_complexity
-from coding_assistant.tools.github_tools import github_search_code, github_list_directory_contents, github_get_file_contents
+from coding_assistant.tools.async_tools import github_search_code, github_list_directory_contents, github_get_file_contents, github_get_files
+from coding_assistant.tools.response_budget import response_budget, get_more_results
+from coding_assistant.tools.history_compaction import history_compaction
 
 # Analyzer agent for understanding code and project structures
 analyzer_agent = Agent(
@@ -22,9 +24,13 @@ analyzer_agent = Agent(
         analyze_complexity,
 
         github_get_file_contents,
+        github_get_files,
         github_list_directory_contents,
-        github_search_code
+        github_search_code,
+        get_more_results,
     ],
+    before_model_callback=history_compaction(),
+    after_tool_callback=response_budget(),
     generate_content_config=GenerateContentConfig(
         temperature=0.1,
     ),
@@ -9,7 +9,10 @@ from google.genai.types import GenerateContentConfig
 
 from coding_assistant.prompts.coder_agent import CODER_AGENT_PROMPT
 from coding_assistant.tools.coding import generate_tests, refactor_code, create_project, create_file
-from coding_assistant.tools.filesystem import search_files, read_file, list_directory, write_file
+from coding_assistant.tools.filesystem import write_file
+from coding_assistant.tools.async_tools import search_files, read_file, list_directory
+from coding_assistant.tools.response_budget import response_budget, get_more_results
+from coding_assistant.tools.history_compaction import history_compaction
 
 # Coder agent for generating code implementations
 coder_agent = Agent(
@@ -26,7 +29,10 @@ coder_agent = Agent(
         read_file,
         list_directory,
         write_file,
+        get_more_results,
     ],
+    before_model_callback=history_compaction(),
+    after_tool_callback=response_budget(),
     generate_content_config=GenerateContentConfig(
         temperature=0.2,
     ),
@@ -9,8 +9,10 @@ from google.genai.types import GenerateContentConfig
 
 from coding_assistant.prompts.planner_agent import PLANNER_AGENT_PROMPT
 from coding_assistant.tools.planning import create_task_list
-from coding_assistant.tools.filesystem import search_files, read_file, list_directory
-from coding_assistant.tools.github_tools import github_search_code, github_list_directory_contents, github_get_file_contents
+from coding_assistant.tools.async_tools import search_files, read_file, list_directory
+from coding_assistant.tools.async_tools import github_search_code, github_list_directory_contents, github_get_file_contents, github_get_files
+from coding_assistant.tools.response_budget import response_budget, get_more_results
+from coding_assistant.tools.history_compaction import history_compaction
 
 # Planner agent for designing software features and components
 planner_agent = Agent(
@@ -25,9 +27,13 @@ planner_agent = Agent(
         list_directory,
 
         github_get_file_contents,
+        github_get_files,
         github_list_directory_contents,
-        github_search_code
+        github_search_code,
+        get_more_results,
     ],
+    before_model_callback=history_compaction(),
+    after_tool_callback=response_budget(scale=0.75),
     generate_content_config=GenerateContentConfig(
         temperature=0.2,
     ),
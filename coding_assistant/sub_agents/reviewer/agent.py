@@ -9,9 +9,10 @@ from google.genai.types import GenerateContentConfig
 
 from coding_assistant.prompts.reviewer_agent import REVIEWER_AGENT_PROMPT
 from coding_assistant.tools.review import check_best_practices, security_scan
-from coding_assistant.tools.filesystem import search_files, read_file, list_directory
-from coding_assistant.tools.grep import grep_files
-from coding_assistant.tools.github_tools import github_search_code, github_list_directory_contents, github_get_file_contents
+from coding_assistant.tools.async_tools import search_files, read_file, list_directory, grep_files
+from coding_assistant.tools.async_tools import github_search_code, github_list_directory_contents, github_get_file_contents, github_get_files
+from coding_assistant.tools.response_budget import response_budget, get_more_results
+from coding_assistant.tools.history_compaction import history_compaction
 
 # Reviewer agent for reviewing code quality and identifying improvements
 reviewer_agent = Agent(
@@ -31,9 +32,13 @@ reviewer_agent = Agent(
         grep_files,
 
         github_get_file_contents,
+        github_get_files,
         github_list_directory_contents,
-        github_search_code
+        github_search_code,
+        get_more_results,
     ],
+    before_model_callback=history_compaction(),
+    after_tool_callback=response_budget(scale=1.5),
     generate_content_config=GenerateContentConfig(
         temperature=0.1,
     ),
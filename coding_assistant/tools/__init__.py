@@ -1,9 +1,44 @@
 """Tools module for the Coding Assistant."""
 
-from coding_assistant.tools.filesystem import search_files, read_file, list_directory, write_file, memorize, load_initial_context
-from coding_assistant.tools.code_analysis import analyze_dependencies, analyze_complexity
-from coding_assistant.tools.planning import create_task_list
-from coding_assistant.tools.coding import generate_tests, refactor_code, create_project, create_file
-from coding_assistant.tools.review import check_best_practices, security_scan
-from coding_assistant.tools.github_tools import github_get_file_contents as get_file_contents, github_list_directory_contents as list_directory_contents, github_search_code as search_code
+import importlib
+
+# Tools are imported from their modules on first access, so importing one tool
+# does not load the dependencies of all the others (e.g. PyGithub)
+_TOOLS = {
+    "search_files": ("filesystem", "search_files"),
+    "read_file": ("filesystem", "read_file"),
+    "list_directory": ("filesystem", "list_directory"),
+    "write_file": ("filesystem", "write_file"),
+    "memorize": ("filesystem", "memorize"),
+    "load_initial_context": ("filesystem", "load_initial_context"),
+    "analyze_dependencies": ("code_analysis", "analyze_dependencies"),
+    "analyze_complexity": ("code_analysis", "analyze_complexity"),
+    "create_task_list": ("planning", "create_task_list"),
+    "generate_tests": ("coding", "generate_tests"),
+    "refactor_code": ("coding", "refactor_code"),
+    "create_project": ("coding", "create_project"),
+    "create_file": ("coding", "create_file"),
+    "check_best_practices": ("review", "check_best_practices"),
+    "security_scan": ("review", "security_scan"),
+    "get_more_results": ("response_budget", "get_more_results"),
+    "get_file_contents": ("github_tools", "github_get_file_contents"),
+    "get_files": ("github_tools", "github_get_files"),
+    "list_directory_contents": ("github_tools", "github_list_directory_contents"),
+    "search_code": ("github_tools", "github_search_code"),
+}
 # Note: create_or_update_file is not implemented yet
+
+__all__ = list(_TOOLS)
+
+
+def __getattr__(name):
+    if name not in _TOOLS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, attr = _TOOLS[name]
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_TOOLS))
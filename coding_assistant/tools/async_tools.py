@@ -0,0 +1,48 @@
+"""
+Async variants of the I/O-bound tools for the Coding Assistant.
+
+ADK runs the function calls of one model turn as concurrent tasks, but a
+synchronous tool blocks the event loop until it returns, so those calls run
+one after another. The variants in this module run the same implementations
+in worker threads, so the calls of a turn overlap. The GitHub tools share
+pooled keep-alive clients and the request scheduler, so they are run in
+threads as well rather than through a separate async HTTP stack.
+"""
+
+import asyncio
+import functools
+from typing import Any, Callable, Coroutine
+
+from coding_assistant.tools import filesystem, github_tools, grep
+
+
+def _in_thread(func: Callable[..., Any]) -> Callable[..., Coroutine[Any, Any, Any]]:
+    """
+    Wrap a synchronous tool as a coroutine function running in a worker thread.
+
+    The wrapper keeps the tool's name, docstring and signature, so the model
+    sees the same function declaration.
+
+    Args:
+        func: The synchronous tool
+
+    Returns:
+        The async tool
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+    return wrapper
+
+
+# Filesystem tools
+read_file = _in_thread(filesystem.read_file)
+list_directory = _in_thread(filesystem.list_directory)
+search_files = _in_thread(filesystem.search_files)
+grep_files = _in_thread(grep.grep_files)
+
+# GitHub tools
+github_get_file_contents = _in_thread(github_tools.github_get_file_contents)
+github_get_files = _in_thread(github_tools.github_get_files)
+github_list_directory_contents = _in_thread(github_tools.github_list_directory_contents)
+github_search_code = _in_thread(github_tools.github_search_code)
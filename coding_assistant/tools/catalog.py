@@ -0,0 +1,432 @@
+"""
+Project file catalog for the Coding Assistant.
+
+This module keeps an in-memory catalog (path, size, mtime, type, language) of
+every file and directory below a project root, so search_files, list_directory
+and grep_files can answer from dictionary lookups instead of walking the disk on
+every call. The catalog is built in the background when the project context is
+loaded and kept fresh with filesystem events (inotify via watchdog) or, when
+watchdog is not available, by periodically re-walking the tree.
+"""
+
+import os
+import threading
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from coding_assistant.tools.walker import IGNORE_FILES, TreeWalker, default_excludes
+
+# Try importing watchdog for inotify/FSEvents based invalidation
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    _WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    _WATCHDOG_AVAILABLE = False
+
+CATALOG_ENV = "CODING_ASSISTANT_FILE_CATALOG"
+POLL_INTERVAL_ENV = "CODING_ASSISTANT_CATALOG_POLL_SECONDS"
+DEFAULT_POLL_INTERVAL = 30.0
+
+LANGUAGE_BY_EXTENSION = {
+    ".py": "python", ".pyi": "python",
+    ".java": "java", ".kt": "kotlin", ".kts": "kotlin", ".scala": "scala", ".groovy": "groovy",
+    ".js": "javascript", ".jsx": "javascript", ".mjs": "javascript", ".cjs": "javascript",
+    ".ts": "typescript", ".tsx": "typescript",
+    ".go": "go", ".rs": "rust", ".rb": "ruby", ".php": "php", ".swift": "swift",
+    ".c": "c", ".h": "c", ".cc": "cpp", ".cpp": "cpp", ".cxx": "cpp", ".hpp": "cpp",
+    ".cs": "csharp", ".m": "objective-c", ".dart": "dart", ".lua": "lua", ".r": "r",
+    ".sh": "shell", ".bash": "shell", ".zsh": "shell",
+    ".html": "html", ".htm": "html", ".css": "css", ".scss": "scss", ".vue": "vue",
+    ".json": "json", ".yaml": "yaml", ".yml": "yaml", ".toml": "toml", ".xml": "xml",
+    ".md": "markdown", ".rst": "restructuredtext", ".sql": "sql",
+}
+
+
+def catalog_enabled() -> bool:
+    """Return True unless the catalog was disabled via CODING_ASSISTANT_FILE_CATALOG=0."""
+    return os.environ.get(CATALOG_ENV, "1").lower() not in ("0", "false", "no", "off")
+
+
+def detect_language(name: str) -> Optional[str]:
+    """
+    Guess the language of a file from its name.
+
+    Args:
+        name: The file name
+
+    Returns:
+        The language name, or None when unknown
+    """
+    return LANGUAGE_BY_EXTENSION.get(os.path.splitext(name)[1].lower())
+
+
+class FileRecord(NamedTuple):
+    """A catalogued file or directory."""
+    path: str
+    relpath: str
+    name: str
+    type: str
+    size: int
+    mtime_ns: int
+    language: Optional[str]
+
+
+def _parent(relpath: str) -> str:
+    return relpath.rpartition("/")[0]
+
+
+class FileCatalog:
+    """
+    An in-memory catalog of the files and directories below a root.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.ready = threading.Event()
+        self._lock = threading.RLock()
+        self._records: Dict[str, FileRecord] = {}
+        # Directory relpath ("" for the root) -> names of its catalogued children
+        self._children: Dict[str, Set[str]] = {"": set()}
+        self._dirty_dirs: Set[str] = set()
+        self._needs_rebuild = False
+        self._observer = None
+        self._poller: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    # Building and invalidation
+
+    def _record(self, item) -> Optional[FileRecord]:
+        try:
+            stats = item.stat()
+        except OSError:
+            return None
+        is_dir = item.is_dir
+        return FileRecord(
+            path=item.path,
+            relpath=item.relpath,
+            name=item.name,
+            type="directory" if is_dir else "file",
+            size=0 if is_dir else stats.st_size,
+            mtime_ns=stats.st_mtime_ns,
+            language=None if is_dir else detect_language(item.name),
+        )
+
+    def _scan(self, dir_relpath: str, max_depth: Optional[int] = None) -> Tuple[Dict[str, FileRecord], Dict[str, Set[str]]]:
+        """Walk below a directory and return its records and child sets, keyed from the catalog root."""
+        directory = os.path.join(self.root, dir_relpath) if dir_relpath else self.root
+        prefix = f"{dir_relpath}/" if dir_relpath else ""
+        records: Dict[str, FileRecord] = {}
+        children: Dict[str, Set[str]] = {dir_relpath: set()}
+        for item in TreeWalker(directory, max_depth=max_depth, ignore_root=self.root):
+            record = self._record(item)
+            if record is None:
+                continue
+            relpath = prefix + item.relpath
+            record = record._replace(relpath=relpath)
+            records[relpath] = record
+            children.setdefault(_parent(relpath), set()).add(record.name)
+            if record.type == "directory":
+                children.setdefault(relpath, set())
+        return records, children
+
+    def build(self):
+        """(Re)build the whole catalog from disk."""
+        with self._lock:
+            self._needs_rebuild = False
+        records, children = self._scan("")
+        with self._lock:
+            self._records = records
+            self._children = children
+        self.ready.set()
+
+    def _drop(self, relpath: str):
+        """Remove a record and, for directories, everything below it."""
+        record = self._records.pop(relpath, None)
+        if record is None:
+            return
+        self._children.get(_parent(relpath), set()).discard(record.name)
+        for name in self._children.pop(relpath, set()):
+            self._drop(f"{relpath}/{name}" if relpath else name)
+
+    def _rescan_dir(self, dir_relpath: str):
+        """Re-read the direct children of a directory, fully scanning new subdirectories."""
+        directory = os.path.join(self.root, dir_relpath) if dir_relpath else self.root
+        if dir_relpath and dir_relpath not in self._records:
+            if os.path.isdir(directory):
+                # Created together with its parents: the nearest catalogued ancestor picks it up
+                self._rescan_dir(_parent(dir_relpath))
+            return
+        if not os.path.isdir(directory):
+            self._drop(dir_relpath)
+            return
+        records, _ = self._scan(dir_relpath, max_depth=1)
+        old_names = self._children.setdefault(dir_relpath, set())
+        new_names = {record.name for record in records.values()}
+        prefix = f"{dir_relpath}/" if dir_relpath else ""
+        for name in old_names - new_names:
+            self._drop(prefix + name)
+        for relpath, record in records.items():
+            previous = self._records.get(relpath)
+            if previous is not None and previous.type == "directory" and record.type != "directory":
+                self._drop(relpath)
+            elif record.type == "directory" and (previous is None or previous.type != "directory"):
+                if previous is not None:
+                    self._drop(relpath)
+                sub_records, sub_children = self._scan(relpath)
+                self._records.update(sub_records)
+                self._children.update(sub_children)
+            self._records[relpath] = record
+            self._children[dir_relpath].add(record.name)
+
+    def mark_changed(self, path: str):
+        """
+        Note that a path changed on disk; the catalog catches up on the next lookup.
+
+        Args:
+            path: Absolute or root-relative path of the changed file or directory
+        """
+        relpath = self.relpath(path) if os.path.isabs(path) else path
+        if relpath is None:
+            return
+        # Excludes name directories, so a file called .env or dist is still catalogued
+        excludes = default_excludes()
+        if any(part in excludes for part in relpath.split("/")[:-1]):
+            return
+        with self._lock:
+            if os.path.basename(relpath) in IGNORE_FILES:
+                self._needs_rebuild = True
+            self._dirty_dirs.add(_parent(relpath))
+
+    def _catch_up(self):
+        """Apply pending invalidations before answering a lookup."""
+        if self._needs_rebuild:
+            self.build()
+            return
+        if not self._dirty_dirs:
+            return
+        with self._lock:
+            # Parents first, so a dropped directory is not rescanned for nothing
+            for dir_relpath in sorted(self._dirty_dirs, key=lambda p: p.count("/")):
+                self._rescan_dir(dir_relpath)
+            self._dirty_dirs.clear()
+
+    # Watching
+
+    def start_watching(self):
+        """Start inotify-style watching, or a polling thread when that is not possible."""
+        if _WATCHDOG_AVAILABLE:
+            try:
+                observer = Observer()
+                observer.schedule(_CatalogEventHandler(self), self.root, recursive=True)
+                observer.daemon = True
+                observer.start()
+                self._observer = observer
+                return
+            except Exception:
+                # e.g. the inotify watch limit is exhausted
+                self._observer = None
+        self._poller = threading.Thread(target=self._poll, name=f"catalog-poll:{self.root}", daemon=True)
+        self._poller.start()
+
+    def _poll(self):
+        try:
+            interval = float(os.environ.get(POLL_INTERVAL_ENV, DEFAULT_POLL_INTERVAL))
+        except ValueError:
+            interval = DEFAULT_POLL_INTERVAL
+        while not self._stopped.wait(interval):
+            try:
+                self.build()
+            except Exception:
+                continue
+
+    def stop(self):
+        """Stop watching the tree."""
+        self._stopped.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+    # Lookups
+
+    def relpath(self, path: str) -> Optional[str]:
+        """
+        Return the catalog-relative path of an absolute path, or None if outside the root.
+        """
+        path = os.path.abspath(path)
+        if path == self.root:
+            return ""
+        if path.startswith(self.root + os.sep):
+            return path[len(self.root) + 1:].replace(os.sep, "/")
+        return None
+
+    def get(self, relpath: str) -> Optional[FileRecord]:
+        """Return the record of a path relative to the root."""
+        self._catch_up()
+        with self._lock:
+            return self._records.get(relpath)
+
+    def is_directory(self, relpath: str) -> bool:
+        """Return True if the relative path is a catalogued directory (or the root)."""
+        self._catch_up()
+        with self._lock:
+            return relpath in self._children
+
+    def list_dir(self, relpath: str) -> List[FileRecord]:
+        """
+        Return the direct children of a directory in name order.
+
+        Args:
+            relpath: Directory path relative to the root ("" for the root)
+        """
+        self._catch_up()
+        prefix = f"{relpath}/" if relpath else ""
+        with self._lock:
+            names = sorted(self._children.get(relpath, ()))
+            return [self._records[prefix + name] for name in names if prefix + name in self._records]
+
+    def iter_tree(self, relpath: str = "") -> Iterator[FileRecord]:
+        """
+        Yield every record below a directory, in the same order TreeWalker uses.
+
+        Args:
+            relpath: Directory path relative to the root ("" for the root)
+        """
+        self._catch_up()
+        with self._lock:
+            ordered = []
+            stack = [relpath]
+            while stack:
+                directory = stack.pop()
+                prefix = f"{directory}/" if directory else ""
+                subdirs = []
+                for name in sorted(self._children.get(directory, ())):
+                    record = self._records.get(prefix + name)
+                    if record is None:
+                        continue
+                    ordered.append(record)
+                    if record.type == "directory":
+                        subdirs.append(record.relpath)
+                stack.extend(reversed(subdirs))
+        return iter(ordered)
+
+    def file_stats(self) -> List[Tuple[str, int, int]]:
+        """Return (relpath, mtime_ns, size) for every catalogued file."""
+        self._catch_up()
+        with self._lock:
+            return [
+                (record.relpath, record.mtime_ns, record.size)
+                for record in self._records.values()
+                if record.type == "file"
+            ]
+
+
+class _CatalogEventHandler(FileSystemEventHandler):
+    """Forward filesystem events to a catalog."""
+
+    def __init__(self, catalog: FileCatalog):
+        super().__init__()
+        self.catalog = catalog
+
+    def on_any_event(self, event):
+        if getattr(event, "event_type", "") in ("opened", "closed", "closed_no_write"):
+            return
+        for path in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+            if path:
+                if isinstance(path, bytes):
+                    path = os.fsdecode(path)
+                self.catalog.mark_changed(path)
+
+
+_catalogs: Dict[str, FileCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def warm_catalog(root: str) -> Optional[FileCatalog]:
+    """
+    Make sure a catalog exists for a project root, building it in the background.
+
+    Calling this again for the same root is cheap.
+
+    Args:
+        root: The project root directory
+
+    Returns:
+        The (possibly still building) catalog, or None when disabled or root is not a directory
+    """
+    if not catalog_enabled() or not root or not os.path.isdir(root):
+        return None
+    root = os.path.abspath(root)
+    with _catalogs_lock:
+        catalog = _catalogs.get(root)
+        if catalog is not None:
+            return catalog
+        catalog = FileCatalog(root)
+        _catalogs[root] = catalog
+
+    def build_and_watch():
+        catalog.start_watching()
+        catalog.build()
+
+    threading.Thread(target=build_and_watch, name=f"catalog-build:{root}", daemon=True).start()
+    return catalog
+
+
+def get_catalog(path: str) -> Optional[FileCatalog]:
+    """
+    Return a ready catalog covering a path.
+
+    Args:
+        path: The file or directory a tool is about to look at
+
+    Returns:
+        The innermost built catalog whose root contains path, or None
+    """
+    if not catalog_enabled():
+        return None
+    path = os.path.abspath(path)
+    best = None
+    with _catalogs_lock:
+        for catalog in _catalogs.values():
+            if catalog.ready.is_set() and catalog.relpath(path) is not None:
+                if best is None or len(catalog.root) > len(best.root):
+                    best = catalog
+    return best
+
+
+def notify_path_changed(path: str):
+    """
+    Tell every catalog covering a path that it changed (e.g. after a tool wrote it).
+
+    Args:
+        path: The path that was created, modified or removed
+    """
+    path = os.path.abspath(path)
+    with _catalogs_lock:
+        catalogs = list(_catalogs.values())
+    for catalog in catalogs:
+        if catalog.relpath(path) is not None:
+            catalog.mark_changed(path)
+
+
+def catalog_entries(path: str, recursive: bool = True) -> Optional[List[Tuple[str, FileRecord]]]:
+    """
+    List the entries below a directory from a ready catalog.
+
+    Args:
+        path: The directory, spelled the way the caller wants paths reported
+        recursive: Return the whole subtree instead of the direct children
+
+    Returns:
+        (path, record) pairs in walker order with paths joined onto the given
+        path, or None when no catalog covers the directory
+    """
+    catalog = get_catalog(path)
+    if catalog is None:
+        return None
+    relpath = catalog.relpath(path)
+    if relpath is None or not catalog.is_directory(relpath):
+        return None
+    records = catalog.iter_tree(relpath) if recursive else catalog.list_dir(relpath)
+    skip = len(relpath) + 1 if relpath else 0
+    return [(os.path.join(path, record.relpath[skip:]), record) for record in records]
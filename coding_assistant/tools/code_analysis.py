@@ -4,54 +4,172 @@ Code analysis tools for the Coding Assistant.
 This module provides tools for analyzing code structure, dependencies, and complexity.
 """
 
+import glob
+import os
+from typing import List
+
 from google.adk.tools import ToolContext
 
-def analyze_dependencies(path: str, tool_context: ToolContext) -> dict:
+from coding_assistant.tools.catalog import catalog_entries
+from coding_assistant.tools.import_graph import get_import_graph
+from coding_assistant.tools.instrumentation import instrumented
+from coding_assistant.tools.metrics import measure_files
+from coding_assistant.tools.walker import iter_files
+
+
+# Caps on the modules and functions listed in summary answers
+MAX_LISTED_MODULES = 200
+MAX_LISTED_FUNCTIONS = 20
+
+DEPENDENCY_QUERIES = ("summary", "dependencies", "dependents", "cycles")
+
+
+@instrumented
+def analyze_dependencies(path: str, query: str = "summary", module: str = "", transitive: bool = False, tool_context: ToolContext = None) -> dict:
     """
-    Analyze dependencies between files in a project.
-    
+    Analyze import dependencies between the Python modules of a project.
+
+    The import graph is built with ast and kept in an on-disk cache, so repeated
+    calls only re-parse files that changed.
+
     Args:
         path: The path to the project
+        query: One of "summary" (per-file imports and totals), "dependencies"
+            (modules imported by `module`), "dependents" (modules importing
+            `module`) or "cycles" (groups of modules that import each other)
+        module: Dotted module name for the "dependencies" and "dependents" queries
+        transitive: Follow imports through intermediate modules
         tool_context: The tool context
-        
+
     Returns:
         A dictionary containing the dependency analysis
     """
     try:
-        # In a real implementation, this would analyze imports and dependencies
-        # using tools like AST parsing
-        return {
-            "dependencies": [
+        if not os.path.isdir(path):
+            return {"error": f"Directory not found: {path}"}
+        if query not in DEPENDENCY_QUERIES:
+            return {"error": f"Unknown query '{query}', expected one of: {', '.join(DEPENDENCY_QUERIES)}"}
+
+        graph = get_import_graph(path)
+        result = {
+            "path": path,
+            "query": query,
+            "module_count": len(graph.modules),
+            "cache": graph.last_refresh,
+        }
+
+        if query == "summary":
+            modules = sorted(graph.modules)
+            dependents = graph.reverse_edges()
+            result["dependencies"] = [
                 {
-                    "source_file": f"{path}/example.py",
-                    "imports": ["module1", "module2"]
+                    "source_file": os.path.join(path, graph.modules[name]),
+                    "module": name,
+                    "imports": sorted(graph.edges[name]),
+                    "external_imports": sorted(graph.external[name]),
                 }
+                for name in modules[:MAX_LISTED_MODULES]
             ]
-        }
+            result["truncated"] = len(modules) > MAX_LISTED_MODULES
+            result["edge_count"] = sum(len(deps) for deps in graph.edges.values())
+            result["most_imported"] = [
+                {"module": name, "dependents": len(dependents[name])}
+                for name in sorted(dependents, key=lambda m: (-len(dependents[m]), m))[:10]
+                if dependents[name]
+            ]
+            result["cycle_count"] = len(graph.cycles())
+            result["parse_errors"] = {
+                os.path.join(path, relpath): error for relpath, error in sorted(graph.errors.items())
+            }
+            return result
+
+        if query == "cycles":
+            result["cycles"] = graph.cycles()
+            return result
+
+        if module not in graph.modules:
+            return {"error": f"Module not found in {path}: {module}"}
+        edges = graph.edges if query == "dependencies" else graph.reverse_edges()
+        related = graph.closure(edges, module) if transitive else edges[module]
+        result["module"] = module
+        result["transitive"] = transitive
+        result[query] = sorted(related)
+        if query == "dependencies":
+            result["external_imports"] = sorted(graph.external[module])
+        return result
     except Exception as e:
         return {"error": str(e)}
 
-def analyze_complexity(file_path: str, tool_context: ToolContext) -> dict:
+def _python_files(path: str) -> List[str]:
+    """Return the Python files of a directory or glob pattern, in sorted order."""
+    if any(ch in path for ch in "*?["):
+        return sorted(p for p in glob.glob(path, recursive=True) if p.endswith(".py") and os.path.isfile(p))
+    entries = catalog_entries(path)
+    if entries is not None:
+        return [p for p, record in entries if record.type == "file" and record.name.endswith(".py")]
+    return [item.path for item in iter_files(path) if item.name.endswith(".py")]
+
+
+@instrumented
+def analyze_complexity(file_path: str, tool_context: ToolContext = None) -> dict:
     """
-    Analyze the complexity of a file.
-    
+    Analyze the complexity of Python code.
+
+    Computes cyclomatic complexity, lines of code (total and source lines),
+    comment ratio and per-function statistics. A directory or glob pattern
+    (e.g. 'src/**/*.py') analyzes every matching Python file. Results are
+    memoized per file content, so unchanged files are not analyzed again.
+
     Args:
-        file_path: The path to the file to analyze
+        file_path: The path to the file, directory or glob pattern to analyze
         tool_context: The tool context
-        
+
     Returns:
         A dictionary containing the complexity analysis
     """
     try:
-        # In a real implementation, this would compute metrics like
-        # cyclomatic complexity, code churn, etc.
+        if os.path.isfile(file_path):
+            metrics, error = measure_files([file_path])[file_path]
+            if error:
+                return {"error": f"Could not analyze {file_path}: {error}"}
+            return {"complexity": {"file": file_path, **metrics}}
+
+        if not os.path.isdir(file_path) and not any(ch in file_path for ch in "*?["):
+            return {"error": f"Path not found: {file_path}"}
+
+        file_paths = _python_files(file_path)
+        results = measure_files(file_paths)
+        files = []
+        functions = []
+        errors = {}
+        for path in file_paths:
+            metrics, error = results[path]
+            if error:
+                errors[path] = error
+                continue
+            files.append({"file": path, **{k: v for k, v in metrics.items() if k != "functions"}})
+            functions.extend({"file": path, **function} for function in metrics["functions"])
+
+        total_lines = sum(f["lines_of_code"] for f in files)
+        total_blank = sum(f["blank_lines"] for f in files)
+        total_comments = sum(f["comment_lines"] for f in files)
+        files.sort(key=lambda f: (-f["cyclomatic_complexity"], f["file"]))
+        functions.sort(key=lambda f: (-f["cyclomatic_complexity"], f["file"], f["line"]))
         return {
-            "complexity": {
-                "file": file_path,
-                "cyclomatic_complexity": 5,
-                "lines_of_code": 100,
-                "comment_ratio": 0.2
-            }
+            "path": file_path,
+            "summary": {
+                "files_analyzed": len(files),
+                "lines_of_code": total_lines,
+                "source_lines_of_code": sum(f["source_lines_of_code"] for f in files),
+                "comment_ratio": round(total_comments / (total_lines - total_blank), 3) if total_lines > total_blank else 0.0,
+                "cyclomatic_complexity": sum(f["cyclomatic_complexity"] for f in files),
+                "function_count": len(functions),
+                "average_function_complexity": round(sum(f["cyclomatic_complexity"] for f in functions) / len(functions), 2) if functions else 0.0,
+            },
+            "files": files[:MAX_LISTED_MODULES],
+            "most_complex_functions": functions[:MAX_LISTED_FUNCTIONS],
+            "truncated": len(files) > MAX_LISTED_MODULES,
+            "errors": errors,
         }
     except Exception as e:
         return {"error": str(e)}
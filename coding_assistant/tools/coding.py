@@ -7,6 +7,11 @@ This module provides tools for generating code and tests.
 import os
 from google.adk.tools import ToolContext
 
+from coding_assistant.shared_libraries.cache import invalidate_local_file
+from coding_assistant.tools.catalog import notify_path_changed
+from coding_assistant.tools.instrumentation import instrumented
+
+@instrumented
 def generate_tests(file_path: str, tool_context: ToolContext) -> dict:
     """
     Generate unit tests for a file.
@@ -38,6 +43,7 @@ if __name__ == '__main__':
     except Exception as e:
         return {"error": str(e)}
 
+@instrumented
 def refactor_code(file_path: str, description: str, tool_context: ToolContext) -> dict:
     """
     Refactor code based on a description.
@@ -72,6 +78,7 @@ class Example:
     except Exception as e:
         return {"error": str(e)}
 
+@instrumented
 def create_project(project_path: str, project_type: str, tool_context: ToolContext) -> dict:
     """
     Create a new project at the specified path.
@@ -88,11 +95,13 @@ def create_project(project_path: str, project_type: str, tool_context: ToolConte
         # Check if the directory exists
         if not os.path.exists(project_path):
             os.makedirs(project_path)
+            notify_path_changed(project_path)
             return {"status": f"Created project directory at {project_path}"}
         return {"status": f"Project directory already exists at {project_path}"}
     except Exception as e:
         return {"error": str(e)}
 
+@instrumented
 def create_file(file_path: str, content: str, tool_context: ToolContext) -> dict:
     """
     Create a new file with the specified content.
@@ -114,6 +123,8 @@ def create_file(file_path: str, content: str, tool_context: ToolContext) -> dict
         # Write the content to the file
         with open(file_path, 'w') as f:
             f.write(content)
+        invalidate_local_file(file_path)
+        notify_path_changed(file_path)
         
         return {"status": f"Created file at {file_path}"}
     except Exception as e:
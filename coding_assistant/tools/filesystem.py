@@ -6,6 +6,7 @@ This module provides tools for interacting with the filesystem to read code and
 
 import os
 import json
+import mmap
 from datetime import datetime
 from typing import Dict, Any
 
@@ -13,51 +14,93 @@ from google.adk.agents.callback_context import CallbackContext
 from google.adk.sessions.state import State
 from google.adk.tools import ToolContext
 
+from coding_assistant.shared_libraries import constants
+from coding_assistant.shared_libraries.cache import content_cache, invalidate_local_file, local_file_tag
+from coding_assistant.shared_libraries.text import BINARY_SNIFF_BYTES, looks_binary
+from coding_assistant.tools.catalog import catalog_entries, notify_path_changed, warm_catalog
+from coding_assistant.tools.instrumentation import instrumented
+from coding_assistant.tools.walker import TreeWalker
+
+# Upper bound on the entries a single listing or search walk may visit
+MAX_WALK_ENTRIES = 200000
+
+# Files above this size (and any requested range) are never returned whole
+MAX_FULL_READ_BYTES = int(os.environ.get("CODING_ASSISTANT_MAX_READ_BYTES", 256 * 1024))
+# Lines shown from each end of an oversized file
+PREVIEW_LINES = 100
+
 # Removed the DEFAULT_CONTEXT_PATH limitation for senior developers
 # to allow full filesystem access
 
-def search_files(path: str, pattern: str, tool_context: ToolContext) -> dict:
+@instrumented
+def search_files(path: str, pattern: str, compact: bool = False, tool_context: ToolContext = None) -> dict:
     """
     Search for files matching a pattern in a given path.
+    Directories such as .git, node_modules or build output and anything matched
+    by .gitignore/.ignore files are skipped.
+    With compact=True the matches come back as a table of [path, type] rows with
+    paths relative to the searched path, which is several times smaller.
     
     Args:
         path: The path to search in
         pattern: The pattern to search for
+        compact: Return the matches as a compact table
         tool_context: The tool context
         
     Returns:
         A dictionary containing the matching files
     """
-    import os
     import fnmatch
     
     matching_files = []
     
     try:
-        for root, dirnames, filenames in os.walk(path):
-            for filename in fnmatch.filter(filenames, f"*{pattern}*"):
-                file_path = os.path.join(root, filename)
-                matching_files.append({
-                    "path": file_path,
-                    "name": filename,
-                    "type": "file"
-                })
-            
-            # Also match directory names if needed
-            for dirname in fnmatch.filter(dirnames, f"*{pattern}*"):
-                dir_path = os.path.join(root, dirname)
+        if not os.path.isdir(path):
+            raise NotADirectoryError(f"Not a directory: {path}")
+        
+        name_filter = f"*{pattern}*"
+        truncated = False
+        
+        # Prefer the project catalog; walk the disk for paths it does not cover
+        entries = catalog_entries(path)
+        if entries is not None:
+            truncated = len(entries) > MAX_WALK_ENTRIES
+            candidates = ((entry_path, record.name, record.type == "directory")
+                          for entry_path, record in entries[:MAX_WALK_ENTRIES])
+        else:
+            walker = TreeWalker(path, max_entries=MAX_WALK_ENTRIES)
+            candidates = ((item.path, item.name, item.is_dir) for item in walker)
+        
+        for entry_path, name, is_dir in candidates:
+            # Match both file and directory names
+            if fnmatch.fnmatch(name, name_filter):
                 matching_files.append({
-                    "path": dir_path,
-                    "name": dirname,
-                    "type": "directory"
+                    "path": entry_path,
+                    "name": name,
+                    "type": "directory" if is_dir else "file"
                 })
+        if entries is None:
+            truncated = walker.truncated
+        
+        if compact:
+            rows = [[os.path.relpath(match["path"], path), match["type"]] for match in matching_files]
+            return {
+                "success": True,
+                "path": path,
+                "pattern": pattern,
+                "columns": ["path", "type"],
+                "rows": rows,
+                "count": len(rows),
+                "truncated": truncated
+            }
         
         return {
             "success": True,
             "path": path,
             "pattern": pattern,
             "matches": matching_files,
-            "count": len(matching_files)
+            "count": len(matching_files),
+            "truncated": truncated
         }
     except Exception as e:
         return {
@@ -65,85 +108,249 @@ def search_files(path: str, pattern: str, tool_context: ToolContext) -> dict:
             "error": str(e)
         }
 
-def read_file(path: str, tool_context: ToolContext) -> dict:
+def _count_lines(buffer) -> int:
+    """Count the lines of a bytes-like buffer (a final line without newline counts too)."""
+    lines = 0
+    chunk_size = 1024 * 1024
+    for start in range(0, len(buffer), chunk_size):
+        lines += buffer[start:start + chunk_size].count(b"\n")
+    if len(buffer) and buffer[len(buffer) - 1:] != b"\n":
+        lines += 1
+    return lines
+
+
+def _line_offset(buffer, line_number: int) -> int:
+    """Return the byte offset where a 1-based line starts (len(buffer) if past the end)."""
+    pos = 0
+    for _ in range(line_number - 1):
+        newline = buffer.find(b"\n", pos)
+        if newline < 0:
+            return len(buffer)
+        pos = newline + 1
+    return pos
+
+
+def _tail_offset(buffer, line_count: int) -> int:
+    """Return the byte offset where the last line_count lines start."""
+    pos = len(buffer)
+    if buffer[pos - 1:pos] == b"\n":
+        pos -= 1
+    for _ in range(line_count):
+        newline = buffer.rfind(b"\n", 0, pos)
+        if newline < 0:
+            return 0
+        pos = newline
+    return pos + 1
+
+
+def _decode_text(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace")
+
+
+@instrumented
+def read_file(path: str, start_line: int = 0, end_line: int = 0, byte_offset: int = 0, byte_length: int = 0, tool_context: ToolContext = None) -> dict:
     """
     Read the contents of a file.
+    Files larger than the preview threshold are not returned whole: without a range
+    you get the first and last lines plus the total line count, then you can ask
+    for specific lines (start_line/end_line) or bytes (byte_offset/byte_length).
     
     Args:
         path: The path to the file to read
+        start_line: First line to return (1-based, 0 = from the beginning)
+        end_line: Last line to return, inclusive (0 = to the end)
+        byte_offset: Byte position to start reading from (used with byte_length)
+        byte_length: Number of bytes to return starting at byte_offset (0 = no byte range)
         tool_context: The tool context
         
     Returns:
         A dictionary containing the file contents
     """
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        stats = os.stat(path)
+        file_size = stats.st_size
+        line_range = start_line > 0 or end_line > 0
+        byte_range = byte_length > 0 or byte_offset > 0
+        whole_file = not line_range and not byte_range and file_size <= MAX_FULL_READ_BYTES
         
-        return {
-            "success": True,
-            "path": path,
-            "content": content,
-            "size": len(content)
-        }
-    except UnicodeDecodeError:
-        # Try reading as binary if text reading fails
-        try:
-            with open(path, 'rb') as f:
-                content = f.read()
-            return {
-                "success": True,
-                "path": path,
-                "is_binary": True,
-                "message": "This appears to be a binary file",
-                "size": len(content)
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"Failed to read binary file: {str(e)}"
-            }
+        # Whole-file reads are cached on path + mtime + size, so repeated reads skip the disk
+        cache_tag = local_file_tag(path)
+        cache_key = ("file", cache_tag, stats.st_mtime_ns, file_size)
+        if whole_file:
+            content = content_cache.get(cache_key)
+            if content is not None:
+                return {
+                    "success": True,
+                    "path": path,
+                    "content": content,
+                    "size": len(content)
+                }
+        
+        with open(path, 'rb') as f:
+            # Sniff the beginning of the file instead of reading it all
+            if looks_binary(f.read(BINARY_SNIFF_BYTES)):
+                return {
+                    "success": True,
+                    "path": path,
+                    "is_binary": True,
+                    "message": "This appears to be a binary file",
+                    "size": file_size
+                }
+            f.seek(0)
+            
+            if whole_file:
+                try:
+                    content = f.read().decode('utf-8')
+                except UnicodeDecodeError:
+                    return {
+                        "success": True,
+                        "path": path,
+                        "is_binary": True,
+                        "message": "This appears to be a binary file",
+                        "size": file_size
+                    }
+                content_cache.put(cache_key, content, file_size, tag=cache_tag)
+                return {
+                    "success": True,
+                    "path": path,
+                    "content": content,
+                    "size": len(content)
+                }
+            
+            if file_size == 0:
+                return {
+                    "success": True,
+                    "path": path,
+                    "content": "",
+                    "size": 0
+                }
+            
+            # Map the file for random access without loading it into memory
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                if byte_range:
+                    offset = min(max(0, byte_offset), file_size)
+                    length = byte_length if byte_length > 0 else file_size - offset
+                    length = min(length, MAX_FULL_READ_BYTES)
+                    content = _decode_text(buffer[offset:offset + length])
+                    return {
+                        "success": True,
+                        "path": path,
+                        "content": content,
+                        "size": len(content),
+                        "file_size": file_size,
+                        "byte_offset": offset,
+                        "byte_length": min(length, file_size - offset),
+                        "truncated": offset + length < file_size
+                    }
+                
+                total_lines = _count_lines(buffer)
+                if line_range:
+                    first = max(1, start_line)
+                    last = min(end_line if end_line > 0 else total_lines, total_lines)
+                    begin = _line_offset(buffer, first)
+                    end = _line_offset(buffer, last + 1) if last >= first else begin
+                    # Never hand back more than the full-read limit, even for a wide range
+                    truncated = end - begin > MAX_FULL_READ_BYTES
+                    if truncated:
+                        end = buffer.rfind(b"\n", begin, begin + MAX_FULL_READ_BYTES) + 1 or begin + MAX_FULL_READ_BYTES
+                        last = first + buffer[begin:end].count(b"\n") - 1
+                    content = _decode_text(buffer[begin:end])
+                    return {
+                        "success": True,
+                        "path": path,
+                        "content": content,
+                        "size": len(content),
+                        "file_size": file_size,
+                        "start_line": first,
+                        "end_line": last,
+                        "total_lines": total_lines,
+                        "truncated": truncated
+                    }
+                
+                # Oversized file without a range: return a head/tail preview
+                head_end = _line_offset(buffer, PREVIEW_LINES + 1)
+                tail_start = max(head_end, _tail_offset(buffer, PREVIEW_LINES))
+                head = _decode_text(buffer[:min(head_end, MAX_FULL_READ_BYTES // 2)])
+                tail = _decode_text(buffer[max(tail_start, file_size - MAX_FULL_READ_BYTES // 2):])
+                return {
+                    "success": True,
+                    "path": path,
+                    "head": head,
+                    "tail": tail,
+                    "size": file_size,
+                    "file_size": file_size,
+                    "total_lines": total_lines,
+                    "truncated": True,
+                    "message": (
+                        f"File is {file_size} bytes ({total_lines} lines); showing the first and last "
+                        f"{PREVIEW_LINES} lines. Use start_line/end_line or byte_offset/byte_length "
+                        f"to read other parts."
+                    )
+                }
     except Exception as e:
         return {
             "success": False,
             "error": str(e)
         }
 
-def list_directory(path: str, tool_context: ToolContext) -> dict:
+@instrumented
+def list_directory(path: str, compact: bool = False, tool_context: ToolContext = None) -> dict:
     """
     List the contents of a directory.
+    Entries excluded by the shared pruning policy (.git, node_modules, ignored
+    files, ...) are left out.
+    With compact=True the entries come back as a table of [name, type, size,
+    lastModified] rows, which is several times smaller.
     
     Args:
         path: The path to the directory to list
+        compact: Return the entries as a compact table
         tool_context: The tool context
         
     Returns:
         A dictionary containing the directory contents
     """
-    import os
-    from datetime import datetime
-    
     try:
-        # Get all entries in the directory
+        if not os.path.isdir(path):
+            raise NotADirectoryError(f"Not a directory: {path}")
+        
+        # Get all entries in the directory, from the project catalog when it covers the path
+        catalogued = catalog_entries(path, recursive=False)
+        if catalogued is not None:
+            listing = [(entry_path, record.name, record.type == "directory", record.mtime_ns, record.size)
+                       for entry_path, record in catalogued]
+        else:
+            listing = []
+            for item in TreeWalker(path, max_depth=1):
+                # Get info about the entry (cached on the DirEntry)
+                stats = item.stat()
+                listing.append((item.path, item.name, item.is_dir, stats.st_mtime_ns, stats.st_size))
+        
+        if compact:
+            rows = [[name, "DIR" if is_dir else "FILE", 0 if is_dir else size, mtime_ns // 1_000_000]
+                    for _, name, is_dir, mtime_ns, size in listing]
+            return {
+                "success": True,
+                "path": path,
+                "columns": ["name", "type", "size", "lastModified"],
+                "rows": rows,
+                "count": len(rows)
+            }
+        
         entries = []
-        for entry in os.listdir(path):
-            entry_path = os.path.join(path, entry)
-            
-            # Get info about the entry
-            stats = os.stat(entry_path)
-            
+        for entry_path, name, is_dir, mtime_ns, size in listing:
             entry_info = {
-                "name": entry,
+                "name": name,
                 "path": entry_path,
-                "lastModified": int(stats.st_mtime * 1000)  # Convert to milliseconds
+                "lastModified": mtime_ns // 1_000_000  # Convert to milliseconds
             }
             
             # Add type and size info
-            if os.path.isdir(entry_path):
+            if is_dir:
                 entry_info["type"] = "DIR"
             else:
                 entry_info["type"] = "FILE"
-                entry_info["size"] = stats.st_size
+                entry_info["size"] = size
                 
             entries.append(entry_info)
             
@@ -159,6 +366,7 @@ def list_directory(path: str, tool_context: ToolContext) -> dict:
             "error": str(e)
         }
 
+@instrumented
 def write_file(path: str, content: str, tool_context: ToolContext) -> dict:
     """
     Write content to a file.
@@ -180,6 +388,8 @@ def write_file(path: str, content: str, tool_context: ToolContext) -> dict:
         # Write the content to the file
         with open(path, 'w', encoding='utf-8') as f:
             f.write(content)
+        invalidate_local_file(path)
+        notify_path_changed(path)
             
         return {
             "success": True,
@@ -248,7 +458,11 @@ def load_initial_context(callback_context: CallbackContext):
             print(f"\nWarning: Failed to load context from {context_path}: {str(e)}\n")
     
     _set_initial_states(data.get("state", {}), callback_context.state)
+    
+    # Start cataloguing the project in the background so file lookups skip the disk walk
+    warm_catalog(callback_context.state.get(constants.PROJECT_PATH))
 
+@instrumented
 def memorize(key: str, value: str, tool_context: ToolContext):
     """
     Store information in the session state.
@@ -0,0 +1,228 @@
+"""
+Conditional-request cache for the GitHub tools.
+
+Responses of GitHub GET requests are stored on disk together with their ETag
+and Last-Modified validators. Later requests for the same URL send these
+validators, so unchanged content comes back as a 304 Not Modified, which does
+not count against the primary rate limit. Responses addressed by a commit SHA
+never change and are served from disk without a request at all. The cache
+directory is kept below a byte budget by evicting the least recently used
+responses.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from coding_assistant.shared_libraries.cache import count_cache_lookup, get_cache_dir
+from coding_assistant.tools.github_scheduler import INTERACTIVE, scheduler
+
+CACHE_VERSION = 1
+
+GITHUB_CACHE_ENV = "CODING_ASSISTANT_GITHUB_CACHE_BYTES"
+# Size budget of the cached responses on disk
+MAX_CACHE_BYTES = int(os.environ.get(GITHUB_CACHE_ENV, 256 * 1024 * 1024))
+
+# Hits served without a request, 304 revalidations, and full downloads
+_stats = {"fresh": 0, "revalidated": 0, "downloaded": 0}
+_stats_lock = threading.Lock()
+
+# Cached response files of this process's cache directory, least recently used
+# first, with their sizes; built from the directory on first use
+_disk_root: Optional[str] = None
+_disk_entries: "OrderedDict[str, int]" = OrderedDict()
+_disk_bytes = 0
+_disk_lock = threading.Lock()
+
+
+def _cache_path(token: str, url: str, parameters: Optional[Dict[str, Any]], accept: str) -> str:
+    # The token is part of the key so one credential never reads another's cached responses
+    key = json.dumps([
+        hashlib.sha256(token.encode("utf-8")).hexdigest(),
+        url,
+        sorted((parameters or {}).items()),
+        accept,
+    ])
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return os.path.join(get_cache_dir("github", digest[:2]), f"{digest}.json")
+
+
+def _disk_index() -> "OrderedDict[str, int]":
+    """Return the LRU index of the cache directory (call with _disk_lock held)."""
+    global _disk_root, _disk_entries, _disk_bytes
+    root = get_cache_dir("github")
+    if root != _disk_root:
+        # Recency survives restarts as the mtime, which hits refresh
+        found = []
+        for shard in os.scandir(root):
+            if not shard.is_dir():
+                continue
+            for item in os.scandir(shard.path):
+                if item.name.endswith(".json"):
+                    try:
+                        stats = item.stat()
+                    except OSError:
+                        continue
+                    found.append((stats.st_mtime_ns, item.path, stats.st_size))
+        found.sort()
+        _disk_root = root
+        _disk_entries = OrderedDict((path, size) for _, path, size in found)
+        _disk_bytes = sum(_disk_entries.values())
+    return _disk_entries
+
+
+def _forget(path: str):
+    global _disk_bytes
+    with _disk_lock:
+        _disk_bytes -= _disk_index().pop(path, 0)
+
+
+def _touch(path: str):
+    """Mark a cached response as recently used."""
+    with _disk_lock:
+        entries = _disk_index()
+        if path in entries:
+            entries.move_to_end(path)
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _record(path: str, size: int):
+    """Account for a stored response and evict the least recently used ones over the budget."""
+    global _disk_bytes
+    evicted = []
+    with _disk_lock:
+        entries = _disk_index()
+        _disk_bytes += size - entries.pop(path, 0)
+        entries[path] = size
+        while _disk_bytes > MAX_CACHE_BYTES and entries:
+            oldest, oldest_size = entries.popitem(last=False)
+            _disk_bytes -= oldest_size
+            evicted.append(oldest)
+    for oldest in evicted:
+        try:
+            os.remove(oldest)
+        except OSError:
+            pass
+
+
+def _load(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except FileNotFoundError:
+        # Evicted, possibly by another process
+        _forget(path)
+        return None
+    except (OSError, ValueError):
+        return None
+    if entry.get("version") != CACHE_VERSION:
+        return None
+    _touch(path)
+    return entry
+
+
+def _store(path: str, entry: dict):
+    data = json.dumps(entry).encode("utf-8")
+    if len(data) > MAX_CACHE_BYTES:
+        return
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return
+    _record(path, len(data))
+
+
+def _count(outcome: str):
+    with _stats_lock:
+        _stats[outcome] += 1
+    count_cache_lookup(outcome != "downloaded")
+
+
+def get_json(
+    github_client,
+    token: str,
+    url: str,
+    parameters: Optional[Dict[str, Any]] = None,
+    immutable: bool = False,
+    accept: str = "",
+    priority: int = INTERACTIVE,
+) -> Tuple[Dict[str, Any], Any]:
+    """
+    GET a GitHub API resource through the on-disk cache.
+
+    Args:
+        github_client: The PyGithub client whose connection is used
+        token: The token of the client (scopes the cache entries)
+        url: API URL, absolute or relative to the API root
+        parameters: Query parameters
+        immutable: The resource can never change (e.g. it is pinned to a commit
+            SHA), so a cached copy is returned without contacting GitHub
+        accept: Optional Accept header (e.g. for text-match metadata)
+        priority: Scheduler priority (INTERACTIVE or BACKGROUND)
+
+    Returns:
+        Tuple[Dict[str, Any], Any]: The response headers and the decoded JSON body
+
+    Raises:
+        GithubException: For error responses, as raised by PyGithub
+        RateLimitError: When the rate limit would not allow the request in time
+    """
+    path = _cache_path(token, url, parameters, accept)
+    entry = _load(path)
+    if entry is not None and immutable:
+        _count("fresh")
+        return entry["headers"], entry["data"]
+
+    headers = {}
+    if accept:
+        headers["Accept"] = accept
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    requester = github_client.requester
+    status, response_headers, output = scheduler.request(
+        lambda: requester.requestJson("GET", url, parameters, headers), url, priority
+    )
+    if status == 304 and entry is not None:
+        _count("revalidated")
+        return entry["headers"], entry["data"]
+
+    data = json.loads(output) if output else None
+    if status >= 400:
+        raise requester.createException(status, response_headers, data)
+
+    _count("downloaded")
+    if immutable or response_headers.get("etag") or response_headers.get("last-modified"):
+        kept_headers = {k: v for k, v in response_headers.items() if k in ("etag", "last-modified", "content-type")}
+        _store(path, {
+            "version": CACHE_VERSION,
+            "etag": response_headers.get("etag"),
+            "last_modified": response_headers.get("last-modified"),
+            "headers": kept_headers,
+            "data": data,
+        })
+    return response_headers, data
+
+
+def cache_stats() -> Dict[str, int]:
+    """
+    Return how GitHub requests were served since the process started.
+    """
+    with _stats_lock:
+        return dict(_stats)
@@ -0,0 +1,223 @@
+"""
+Local repository mirrors for the GitHub tools.
+
+For repositories listed in CODING_ASSISTANT_GITHUB_MIRROR, the GitHub tools
+read files, list directories and search code in a shallow clone kept in the
+cache directory instead of calling the API for every file. Each owner/repo@ref
+gets its own checkout; branch and tag checkouts are refreshed with a shallow
+fetch when the remote ref has moved, commit checkouts never change.
+"""
+
+import base64
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from coding_assistant.shared_libraries.cache import get_cache_dir
+
+MIRROR_ENV = "CODING_ASSISTANT_GITHUB_MIRROR"
+MIRROR_URL_ENV = "CODING_ASSISTANT_GITHUB_MIRROR_URL"
+MIRROR_TTL_ENV = "CODING_ASSISTANT_GITHUB_MIRROR_TTL"
+
+# Seconds between checks whether a branch or tag has moved
+DEFAULT_TTL = 300
+GIT_TIMEOUT = 600
+
+_COMMIT_SHA = re.compile(r"^[0-9a-fA-F]{40}$")
+_REPO_NAME = re.compile(r"^[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+$")
+
+
+class MirrorError(Exception):
+    """Raised when a mirror cannot be created or refreshed."""
+
+
+def mirror_enabled(repo_name: str) -> bool:
+    """
+    Tell whether a repository should be served from a local mirror.
+
+    CODING_ASSISTANT_GITHUB_MIRROR holds comma-separated 'owner/repo' names,
+    or '*' to mirror every repository.
+
+    Args:
+        repo_name: Repository in format 'owner/repo'
+    """
+    configured = os.environ.get(MIRROR_ENV, "")
+    names = {name.strip().lower() for name in configured.split(",") if name.strip()}
+    return "*" in names or repo_name.lower() in names
+
+
+def _check_repository(repo_name: str, ref: Optional[str]):
+    """Refuse names that could escape the cache directory or be read as git options."""
+    if not _REPO_NAME.match(repo_name) or any(part in (".", "..") for part in repo_name.split("/")):
+        raise MirrorError(f"Invalid repository name: {repo_name!r}")
+    if ref and ref.startswith("-"):
+        raise MirrorError(f"Invalid ref: {ref!r}")
+
+
+def _remote_url(repo_name: str) -> str:
+    """Return the clone URL; CODING_ASSISTANT_GITHUB_MIRROR_URL may be a template with {repository}."""
+    template = os.environ.get(MIRROR_URL_ENV)
+    if template:
+        return template.format(repository=repo_name)
+    host = os.environ.get("GITHUB_HOST") or "github.com"
+    return f"https://{host}/{repo_name}.git"
+
+
+def _git(args, cwd: Optional[str] = None, token: Optional[str] = None) -> str:
+    """Run a git command and return its stdout."""
+    env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+    if token:
+        # Passed through the environment so the token never shows up in the process list
+        credentials = base64.b64encode(f"x-access-token:{token}".encode("utf-8")).decode("ascii")
+        env.update({
+            "GIT_CONFIG_COUNT": "1",
+            "GIT_CONFIG_KEY_0": "http.extraHeader",
+            "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials}",
+        })
+    try:
+        completed = subprocess.run(
+            ["git", *args], cwd=cwd, env=env, capture_output=True, text=True, timeout=GIT_TIMEOUT
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise MirrorError(f"git {args[0]} failed: {e}")
+    if completed.returncode != 0:
+        raise MirrorError(f"git {args[0]} failed: {completed.stderr.strip()}")
+    return completed.stdout
+
+
+class RepoMirror:
+    """
+    A shallow checkout of one repository at one ref.
+    """
+
+    def __init__(self, repo_name: str, ref: Optional[str], path: str):
+        self.repo_name = repo_name
+        self.ref = ref
+        self.path = path
+        self.commit: Optional[str] = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    @property
+    def immutable(self) -> bool:
+        return bool(self.ref and _COMMIT_SHA.match(self.ref))
+
+    def ensure(self, token: Optional[str]):
+        """
+        Create the checkout, or update it when its branch or tag has moved.
+
+        Args:
+            token: GitHub token used for fetching
+        """
+        with self.lock:
+            if self.commit is None and os.path.isdir(os.path.join(self.path, ".git")):
+                self.commit = _git(["rev-parse", "HEAD"], cwd=self.path).strip()
+            if self.commit is None:
+                self._clone(token)
+                return
+            if self.immutable:
+                return
+            ttl = float(os.environ.get(MIRROR_TTL_ENV, DEFAULT_TTL))
+            if time.monotonic() - self.checked_at < ttl:
+                return
+            if self._remote_commit(token) != self.commit:
+                self._fetch(self.path, token)
+            self.checked_at = time.monotonic()
+
+    def _remote_commit(self, token: Optional[str]) -> Optional[str]:
+        output = _git(["ls-remote", "origin", self.ref or "HEAD"], cwd=self.path, token=token)
+        for line in output.splitlines():
+            sha, _, name = line.partition("\t")
+            # Prefer the peeled commit of an annotated tag
+            if name.endswith("^{}"):
+                return sha
+        return output.split("\t", 1)[0] if output else None
+
+    def _fetch(self, path: str, token: Optional[str]):
+        _git(["fetch", "--quiet", "--depth", "1", "origin", self.ref or "HEAD"], cwd=path, token=token)
+        _git(["checkout", "--quiet", "--force", "FETCH_HEAD"], cwd=path)
+        self.commit = _git(["rev-parse", "HEAD"], cwd=path).strip()
+
+    def _clone(self, token: Optional[str]):
+        # Build the checkout next to its final place so a failed clone leaves nothing behind
+        tmp_path = f"{self.path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        try:
+            _git(["init", "--quiet", tmp_path])
+            _git(["remote", "add", "origin", _remote_url(self.repo_name)], cwd=tmp_path)
+            self._fetch(tmp_path, token)
+            shutil.rmtree(self.path, ignore_errors=True)
+            os.rename(tmp_path, self.path)
+        except Exception:
+            self.commit = None
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        self.checked_at = time.monotonic()
+
+    def resolve(self, relpath: str) -> Optional[str]:
+        """
+        Map a repository path to the checkout, refusing paths that escape it.
+
+        Args:
+            relpath: Path relative to the repository root
+
+        Returns:
+            The absolute path, or None when the path lies outside the checkout
+        """
+        root = os.path.realpath(self.path)
+        target = os.path.realpath(os.path.join(root, relpath))
+        if target != root and not target.startswith(root + os.sep):
+            return None
+        if target == os.path.join(root, ".git") or target.startswith(os.path.join(root, ".git") + os.sep):
+            return None
+        return target
+
+    def html_url(self, relpath: str, kind: str = "blob") -> str:
+        host = os.environ.get("GITHUB_HOST") or "github.com"
+        return f"https://{host}/{self.repo_name}/{kind}/{self.commit}/{relpath}"
+
+
+def blob_sha(data: bytes) -> str:
+    """Return the git blob SHA of file content, as reported by the GitHub API."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+_mirrors: Dict[Tuple[str, str], RepoMirror] = {}
+_mirrors_lock = threading.Lock()
+
+
+def get_mirror(repo_name: str, ref: Optional[str], token: Optional[str]) -> Optional[RepoMirror]:
+    """
+    Return the up-to-date mirror of a repository, if mirroring is enabled for it.
+
+    Args:
+        repo_name: Repository in format 'owner/repo'
+        ref: Branch, tag or commit SHA (defaults to the remote HEAD)
+        token: GitHub token used for fetching
+
+    Returns:
+        The RepoMirror, or None when the repository is not mirrored
+
+    Raises:
+        MirrorError: When the name or ref is invalid, or cloning or fetching fails
+    """
+    if not mirror_enabled(repo_name):
+        return None
+    _check_repository(repo_name, ref)
+    key = (repo_name.lower(), ref or "")
+    with _mirrors_lock:
+        mirror = _mirrors.get(key)
+        if mirror is None:
+            owner, _, name = repo_name.lower().partition("/")
+            label = re.sub(r"[^A-Za-z0-9._-]", "_", ref or "HEAD")[:40]
+            digest = hashlib.sha1((ref or "").encode("utf-8")).hexdigest()[:8]
+            path = os.path.join(get_cache_dir("mirrors", owner, name), f"{label}-{digest}")
+            mirror = RepoMirror(repo_name, ref, path)
+            _mirrors[key] = mirror
+    mirror.ensure(token)
+    return mirror
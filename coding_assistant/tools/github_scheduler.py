@@ -0,0 +1,241 @@
+"""
+Request scheduler for the GitHub tools.
+
+Every GitHub API request made by the tools passes through one process-wide
+scheduler. It tracks the remaining quota of each rate limit resource from the
+response headers, queues requests (interactive tool calls ahead of background
+fetches such as search snippets) instead of running into an exhausted limit,
+and retries rate limited and failed requests with jittered exponential backoff.
+A request waiting for an exhausted resource never holds up requests charged
+to another one.
+"""
+
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Request priorities, lower runs first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+MAX_CONCURRENT = int(os.environ.get("CODING_ASSISTANT_GITHUB_MAX_CONCURRENT", 8))
+# Longest a request may wait for quota or backoff before it fails instead
+MAX_WAIT_SECONDS = float(os.environ.get("CODING_ASSISTANT_GITHUB_MAX_WAIT", 60))
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 1.0
+# Requests left in a resource that only interactive calls may use
+BACKGROUND_RESERVE = 0.1
+
+_RETRY_STATUSES = (403, 429, 500, 502, 503, 504)
+
+Response = Tuple[int, Dict[str, Any], str]
+
+
+class RateLimitError(Exception):
+    """Raised when a request would have to wait too long for the rate limit."""
+
+
+class _Quota:
+    """Last known state of one rate limit resource (core, search, graphql, ...)."""
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+
+    def update(self, headers: Dict[str, Any]):
+        try:
+            self.limit = int(headers["x-ratelimit-limit"])
+            self.remaining = int(headers["x-ratelimit-remaining"])
+            self.reset_at = float(headers["x-ratelimit-reset"])
+        except (KeyError, TypeError, ValueError):
+            pass
+
+    def wait_seconds(self, priority: int, now: float) -> float:
+        """Return how long a request must wait for quota (0 when it may run now)."""
+        if self.remaining is None or now >= self.reset_at:
+            return 0.0
+        reserve = int(self.limit * BACKGROUND_RESERVE) if priority == BACKGROUND and self.limit else 0
+        if self.remaining > reserve:
+            return 0.0
+        return self.reset_at - now
+
+
+def _resource_for(url: str) -> str:
+    """Guess the rate limit resource a request is charged to before it is sent."""
+    path = url.split("://", 1)[-1]
+    if "/search/" in path or path.startswith("/search"):
+        return "search"
+    if "/graphql" in path:
+        return "graphql"
+    return "core"
+
+
+class RequestScheduler:
+    """
+    Admits GitHub requests by priority, concurrency and remaining quota.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT):
+        self.max_concurrent = max(1, max_concurrent)
+        self._cond = threading.Condition()
+        self._waiting: list = []
+        self._tickets = itertools.count()
+        self._active = 0
+        self._quotas: Dict[str, _Quota] = {}
+        # Set after a secondary rate limit or 429: every request pauses until then
+        self._paused_until = 0.0
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.wait_seconds = 0.0
+
+    def _quota(self, resource: str) -> _Quota:
+        quota = self._quotas.get(resource)
+        if quota is None:
+            quota = self._quotas[resource] = _Quota()
+        return quota
+
+    def _delay(self, ticket: Tuple[int, int, str], now: float) -> float:
+        priority, _, resource = ticket
+        return max(self._paused_until - now, self._quota(resource).wait_seconds(priority, now))
+
+    def _next_admissible(self, now: float) -> Optional[Tuple[int, int, str]]:
+        """Return the first waiting ticket, by priority and arrival, whose resource has quota now."""
+        for ticket in sorted(self._waiting):
+            if self._delay(ticket, now) <= 0:
+                return ticket
+        return None
+
+    def _acquire(self, resource: str, priority: int):
+        ticket = (priority, next(self._tickets), resource)
+        started = time.monotonic()
+        with self._cond:
+            self._waiting.append(ticket)
+            try:
+                while True:
+                    now = time.time()
+                    delay = self._delay(ticket, now)
+                    if delay > 0:
+                        if time.monotonic() - started + delay > MAX_WAIT_SECONDS:
+                            raise RateLimitError(
+                                f"GitHub rate limit for '{resource}' requests is exhausted; "
+                                f"it resets in {int(delay)} seconds"
+                            )
+                    elif self._active < self.max_concurrent and self._next_admissible(now) == ticket:
+                        break
+                    self._cond.wait(timeout=delay if delay > 0 else None)
+                self._waiting.remove(ticket)
+                self._active += 1
+            except BaseException:
+                self._waiting.remove(ticket)
+                self._cond.notify_all()
+                raise
+            finally:
+                self.wait_seconds += time.monotonic() - started
+
+    def _release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def _retry_delay(self, status: int, headers: Dict[str, Any], output: str, attempt: int, resource: str) -> Optional[float]:
+        """Return how long to wait before retrying a response, or None if it should not be retried."""
+        if status not in _RETRY_STATUSES:
+            return None
+        retry_after = headers.get("retry-after")
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        if status in (403, 429):
+            if headers.get("x-ratelimit-remaining") == "0":
+                return max(0.0, self._quota(resource).reset_at - time.time()) + 1
+            try:
+                message = (json.loads(output).get("message") or "").lower() if output else ""
+            except (ValueError, AttributeError):
+                message = ""
+            if status == 403 and "rate limit" not in message:
+                # A permission error, not a throttle
+                return None
+        # Full jitter keeps concurrent retries from hitting GitHub in lockstep
+        return random.uniform(0, BACKOFF_BASE_SECONDS * 2 ** attempt)
+
+    def request(self, send: Callable[[], Response], url: str, priority: int = INTERACTIVE) -> Response:
+        """
+        Run a request when quota and concurrency allow, retrying rate limits and server errors.
+
+        Args:
+            send: Performs the request and returns (status, headers, body)
+            url: The request URL, used to pick the rate limit resource
+            priority: INTERACTIVE for tool calls, BACKGROUND for optional extras
+
+        Returns:
+            The (status, headers, body) of the final attempt
+
+        Raises:
+            RateLimitError: When waiting for the rate limit would exceed MAX_WAIT_SECONDS
+        """
+        resource = _resource_for(url)
+        for attempt in range(MAX_RETRIES + 1):
+            self._acquire(resource, priority)
+            try:
+                status, headers, output = send()
+            finally:
+                self._release()
+            with self._cond:
+                self.requests += 1
+                resource = headers.get("x-ratelimit-resource", resource)
+                self._quota(resource).update(headers)
+                # Queued requests may have become admissible (or blocked)
+                self._cond.notify_all()
+            delay = self._retry_delay(status, headers, output, attempt, resource)
+            if delay is None or attempt == MAX_RETRIES:
+                return status, headers, output
+            if delay > MAX_WAIT_SECONDS:
+                raise RateLimitError(
+                    f"GitHub rate limit for '{resource}' requests is exhausted; it resets in {int(delay)} seconds"
+                )
+            with self._cond:
+                self.retries += 1
+                if status in (403, 429):
+                    self.rate_limited += 1
+                    self._paused_until = max(self._paused_until, time.time() + delay)
+                    self._cond.notify_all()
+            if status not in (403, 429):
+                time.sleep(delay)
+        return status, headers, output
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return queue depth, request counters and the known quota per resource.
+        """
+        with self._cond:
+            return {
+                "queue_depth": len(self._waiting),
+                "active": self._active,
+                "requests": self.requests,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "wait_seconds": round(self.wait_seconds, 3),
+                "paused_for": max(0.0, round(self._paused_until - time.time(), 3)),
+                "quota": {
+                    resource: {"limit": quota.limit, "remaining": quota.remaining, "reset": quota.reset_at}
+                    for resource, quota in self._quotas.items()
+                },
+            }
+
+
+scheduler = RequestScheduler()
+
+
+def scheduler_stats() -> Dict[str, Any]:
+    """
+    Return the metrics of the shared GitHub request scheduler.
+    """
+    return scheduler.stats()
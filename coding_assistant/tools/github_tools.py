@@ -5,34 +5,58 @@ This module provides tools for GitHub repository content management operations.
 """
 
 import base64
-from typing import Dict, Optional, Any, Tuple
+import importlib.util
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+from urllib.parse import parse_qs, quote, urlparse
 from google.adk.tools import ToolContext
 
+from coding_assistant.shared_libraries.cache import content_cache
+from coding_assistant.tools.github_cache import get_json
+from coding_assistant.tools.github_scheduler import BACKGROUND, INTERACTIVE, RateLimitError
+from coding_assistant.tools.github_mirror import MirrorError, blob_sha, get_mirror
+from coding_assistant.tools.grep import grep_files
+from coding_assistant.tools.instrumentation import instrumented
+from coding_assistant.tools.walker import TreeWalker, compile_glob
+
 # Try importing GitHub libraries
-# First, check if PyGithub is available
-try:
-    import github
-    from github import Github
-    from github.Repository import Repository
-    from github.ContentFile import ContentFile
-    from github.GithubException import GithubException
-    try:
-        from github.GithubException import UnknownObjectException
-    except ImportError:
-        # In some versions, this might be in a different location
-        UnknownObjectException = GithubException
-    _GITHUB_AVAILABLE = True
-    _USING_PYGITHUB = True
-except ImportError:
-    # PyGithub not available, try githubpy
-    try:
+# PyGithub (or githubpy) and its dependencies take a noticeable share of the
+# start-up time, so only their presence is checked here; they are imported by
+# _load_github() when the first client is created.
+_USING_PYGITHUB = importlib.util.find_spec("github") is not None
+_GITHUB_AVAILABLE = _USING_PYGITHUB or importlib.util.find_spec("githubpy") is not None
+_github_loaded = False
+
+
+class _GithubNotLoaded(Exception):
+    """Stands in for the PyGithub exceptions until the library is imported."""
+
+
+GithubException = UnknownObjectException = _GithubNotLoaded
+
+
+def _load_github():
+    """Import the GitHub library on first use and bind its names in this module."""
+    global _github_loaded, github, githubpy, Github, ContentFile, GithubException, UnknownObjectException
+    if _github_loaded:
+        return
+    if _USING_PYGITHUB:
+        import github
+        from github import Github
+        from github.ContentFile import ContentFile
+        from github.GithubException import GithubException
+        try:
+            from github.GithubException import UnknownObjectException
+        except ImportError:
+            # In some versions, this might be in a different location
+            UnknownObjectException = GithubException
+    else:
         import githubpy
-        _GITHUB_AVAILABLE = True
-        _USING_PYGITHUB = False
-    except ImportError:
-        # No GitHub libraries available
-        _GITHUB_AVAILABLE = False
-        _USING_PYGITHUB = False
+    _github_loaded = True
 
 
 def _get_github_env() -> Tuple[bool, Dict[str, Any]]:
@@ -61,9 +85,36 @@ def _get_github_env() -> Tuple[bool, Dict[str, Any]]:
         return False, {"error": f"Failed to get GitHub environment: {str(e)}"}
 
 
+# Clients are shared process-wide per token. Each PyGithub client keeps a
+# keep-alive connection pool, so repeated calls skip the TCP/TLS handshakes.
+GITHUB_POOL_SIZE = int(os.environ.get("CODING_ASSISTANT_GITHUB_POOL_SIZE", 16))
+MAX_CACHED_REPOS = 128
+
+# Asks the search API to return the matching fragments of each hit
+TEXT_MATCH_ACCEPT = "application/vnd.github.v3.text-match+json"
+# Concurrent requests used to fetch snippets that the search did not provide
+SNIPPET_FETCH_WORKERS = 8
+SNIPPET_LENGTH = 200
+# Concurrent requests and file cap of a github_get_files call
+FILE_FETCH_WORKERS = 8
+MAX_BATCH_FILES = 100
+# Rows returned by a recursive directory listing
+MAX_TREE_ENTRIES = 5000
+
+# Git tree entry types as reported by the listing tools
+_TREE_ENTRY_TYPES = {"blob": "file", "tree": "directory", "commit": "submodule"}
+
+_clients: Dict[str, Any] = {}
+_repos: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+_clients_lock = threading.Lock()
+
+
 def _create_github_client(env: Dict[str, Any]) -> Tuple[bool, Any]:
     """
-    Create a GitHub client using the provided environment.
+    Get the shared GitHub client for the token in the provided environment.
+    
+    The first call for a token creates the client; later calls reuse it and
+    its pooled connections.
     
     Args:
         env: GitHub environment configuration
@@ -80,19 +131,60 @@ def _create_github_client(env: Dict[str, Any]) -> Tuple[bool, Any]:
         if not token:
             return False, {"error": "GitHub token not provided"}
         
-        # Check which GitHub library is available
-        if globals().get('_USING_PYGITHUB', False):
-            # Using PyGithub
-            client = Github(token)
-        else:
-            # Using githubpy
-            client = githubpy.Github(token)
+        with _clients_lock:
+            client = _clients.get(token)
+            if client is None:
+                _load_github()
+                # Check which GitHub library is available
+                if globals().get('_USING_PYGITHUB', False):
+                    # Using PyGithub
+                    # Throttling and retries are left to the shared request scheduler;
+                    # lazy objects make no request until data is read
+                    client = Github(
+                        auth=github.Auth.Token(token),
+                        lazy=True,
+                        pool_size=GITHUB_POOL_SIZE,
+                        retry=None,
+                        seconds_between_requests=None,
+                    )
+                else:
+                    # Using githubpy
+                    client = githubpy.Github(token)
+                _clients[token] = client
         
         return True, client
     except Exception as e:
         return False, {"error": f"Failed to create GitHub client: {str(e)}"}
 
 
+def _get_repo(github_client, token: str, repo_name: str):
+    """
+    Get a repository object, reusing the one cached for this token and name.
+    
+    With PyGithub the client is lazy, so no metadata request is made until an
+    attribute of the repository that needs it is read.
+    
+    Args:
+        github_client: The GitHub client
+        token: The token the client was created for
+        repo_name: Repository in format 'owner/repo'
+    
+    Returns:
+        The repository object
+    """
+    key = (token, repo_name.lower())
+    with _clients_lock:
+        repo = _repos.get(key)
+        if repo is not None:
+            _repos.move_to_end(key)
+            return repo
+    repo = github_client.get_repo(repo_name)
+    with _clients_lock:
+        _repos[key] = repo
+        while len(_repos) > MAX_CACHED_REPOS:
+            _repos.popitem(last=False)
+    return repo
+
 
 def _format_content_details(content) -> Dict[str, Any]:
     """
@@ -118,6 +210,389 @@ def _format_content_details(content) -> Dict[str, Any]:
     return result
 
 
+# A full commit SHA pins content forever, so it can be served from cache without asking GitHub
+_COMMIT_SHA = re.compile(r"^[0-9a-fA-F]{40}$")
+
+
+def _file_cache_key(repo_name: str, path: str, ref: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Build the content cache key of a GitHub file, if its content is immutable.
+    
+    Args:
+        repo_name: Repository in format 'owner/repo'
+        path: Normalized file path
+        ref: Requested ref
+    
+    Returns:
+        Optional[Tuple[str, ...]]: The cache key, or None when ref is not a commit SHA
+    """
+    if not ref or not _COMMIT_SHA.match(ref):
+        return None
+    return ("github", repo_name.lower(), ref.lower(), path)
+
+
+def _get_contents(github_client, token: str, repo, path: str, ref: Optional[str]):
+    """
+    Get a file or the entries of a directory.
+    
+    With PyGithub the request goes through the conditional-request cache, so
+    unchanged content is revalidated with a 304 and content at a commit SHA is
+    served from disk.
+    
+    Args:
+        github_client: The GitHub client
+        token: The token the client was created for
+        repo: The repository object
+        path: Normalized path in the repository
+        ref: Branch or commit SHA (defaults to the default branch)
+    
+    Returns:
+        A content object, or a list of them for a directory
+    """
+    if not globals().get('_USING_PYGITHUB', False):
+        return repo.get_contents(path, ref=ref) if ref else repo.get_contents(path)
+    
+    url = f"{repo.url}/contents/{quote(path)}"
+    immutable = bool(ref and _COMMIT_SHA.match(ref))
+    _, data = get_json(github_client, token, url, {"ref": ref} if ref else None, immutable=immutable)
+    if isinstance(data, list):
+        return [github_client.create_from_raw_data(ContentFile, item) for item in data]
+    return github_client.create_from_raw_data(ContentFile, data)
+
+
+def _search_code_hits(github_client, token: str, query: str, limit: int) -> Iterator[Any]:
+    """
+    Yield up to limit code search results, page by page.
+    
+    Args:
+        github_client: The GitHub client
+        token: The token the client was created for
+        query: The complete search query
+        limit: Maximum number of results
+    
+    Returns:
+        Iterator[Any]: Content objects of the matching files
+    """
+    if not globals().get('_USING_PYGITHUB', False):
+        yield from github_client.search_code(query)[:limit]
+        return
+    
+    per_page = min(limit, 100)
+    page = 1
+    count = 0
+    while count < limit:
+        _, data = get_json(
+            github_client, token, "/search/code", {"q": query, "per_page": per_page, "page": page},
+            accept=TEXT_MATCH_ACCEPT,
+        )
+        items = data.get("items", []) if data else []
+        for item in items[:limit - count]:
+            yield github_client.create_from_raw_data(ContentFile, item)
+            count += 1
+        if len(items) < per_page:
+            return
+        page += 1
+
+
+def _text_match_snippet(content) -> Optional[str]:
+    """
+    Build a snippet from the text-match fragments returned with a search hit.
+    
+    Args:
+        content: The content object of the search result
+    
+    Returns:
+        Optional[str]: The matching fragments, or None when the hit has none
+    """
+    try:
+        text_matches = content.raw_data.get("text_matches") or []
+    except (AttributeError, TypeError):
+        return None
+    fragments = [m.get("fragment") for m in text_matches if m.get("property", "content") == "content" and m.get("fragment")]
+    return "\n...\n".join(fragments) if fragments else None
+
+
+def _file_snippet(github_client, token: str, content) -> str:
+    """
+    Download a search hit and return the start of the file as its snippet.
+    
+    Args:
+        github_client: The GitHub client
+        token: The token the client was created for
+        content: The content object of the search result
+    
+    Returns:
+        str: The snippet, or a placeholder when the content is unavailable
+    """
+    try:
+        # Snippets are optional, so they must not eat into the quota left for tool calls
+        file_content = _decoded_search_hit(github_client, token, content, BACKGROUND)
+    except Exception:
+        # Ignore content retrieval errors for search results
+        return "[Content unavailable]"
+    
+    # Get a snippet (first SNIPPET_LENGTH chars or less)
+    snippet = file_content[:SNIPPET_LENGTH]
+    if len(snippet) < len(file_content):
+        snippet += "..."
+    return snippet
+
+
+def _decoded_search_hit(github_client, token: str, content, priority: int = INTERACTIVE) -> str:
+    """
+    Get the text of a code search result.
+    
+    Search results point at the file at a commit SHA, so the content is served
+    from the cache once it has been downloaded.
+    
+    Args:
+        github_client: The GitHub client
+        token: The token the client was created for
+        content: The content object of the search result
+        priority: Scheduler priority of the download
+    
+    Returns:
+        str: The decoded file content
+    """
+    if not globals().get('_USING_PYGITHUB', False):
+        return content.decoded_content.decode('utf-8')
+    
+    ref = parse_qs(urlparse(content.url).query).get("ref", [""])[0]
+    _, data = get_json(github_client, token, content.url, immutable=bool(_COMMIT_SHA.match(ref)), priority=priority)
+    return base64.b64decode(data.get("content") or "").decode('utf-8')
+
+
+def _mirror_for(repo_name: str, ref: Optional[str], token: str):
+    """
+    Get the local mirror of a repository, if mirroring is enabled for it.
+    
+    Args:
+        repo_name: Repository in format 'owner/repo'
+        ref: Branch or commit SHA (defaults to the default branch)
+        token: The GitHub token
+    
+    Returns:
+        The mirror, or None to use the API (not mirrored, or the mirror failed)
+    """
+    try:
+        return get_mirror(repo_name, ref, token)
+    except MirrorError:
+        return None
+
+
+def _mirror_file(mirror, normalized_path: str) -> Dict[str, Any]:
+    """
+    Read a file from a local mirror in the shape of github_get_file_contents.
+    
+    Args:
+        mirror: The repository mirror
+        normalized_path: Path of the file relative to the repository root
+    
+    Returns:
+        Dict[str, Any]: A success response with the file, or an error response
+    """
+    local_path = mirror.resolve(normalized_path)
+    if local_path is None or not os.path.exists(local_path):
+        return _error_response(f"File not found in repository {mirror.repo_name}: {normalized_path}")
+    if os.path.isdir(local_path):
+        return _error_response("Path points to a directory, not a file")
+    
+    with open(local_path, "rb") as f:
+        data = f.read()
+    try:
+        content = data.decode('utf-8')
+    except UnicodeDecodeError as e:
+        content = f"[Content decoding failed: {str(e)}]"
+    
+    return _success_response({
+        "file": {
+            "name": os.path.basename(normalized_path),
+            "path": normalized_path,
+            "sha": blob_sha(data),
+            "size": len(data),
+            "type": "file",
+            "url": mirror.html_url(normalized_path),
+            "download_url": mirror.html_url(normalized_path, "raw"),
+            "content": content,
+        },
+        "source": "mirror"
+    })
+
+
+def _mirror_listing(mirror, dir_path: str) -> Dict[str, Any]:
+    """
+    List a directory of a local mirror in the shape of github_list_directory_contents.
+    
+    Args:
+        mirror: The repository mirror
+        dir_path: Path of the directory relative to the repository root
+    
+    Returns:
+        Dict[str, Any]: A success response with the entries, or an error response
+    """
+    local_path = mirror.resolve(dir_path)
+    if local_path is None or not os.path.exists(local_path):
+        return _error_response(f"Directory not found in repository {mirror.repo_name}: {dir_path}")
+    if not os.path.isdir(local_path):
+        return _error_response(f"Path '{dir_path}' points to a file, not a directory")
+    
+    contents_list = []
+    with os.scandir(local_path) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    for entry in entries:
+        if entry.name == ".git" and not dir_path:
+            continue
+        entry_path = f"{dir_path.rstrip('/')}/{entry.name}" if dir_path else entry.name
+        is_dir = entry.is_dir(follow_symlinks=False)
+        content_data = {
+            "name": entry.name,
+            "path": entry_path,
+            "sha": "",
+            "size": 0 if is_dir else entry.stat(follow_symlinks=False).st_size,
+            "type": "directory" if is_dir else "file",
+            "url": mirror.html_url(entry_path, "tree" if is_dir else "blob"),
+        }
+        if not is_dir:
+            content_data["download_url"] = mirror.html_url(entry_path, "raw")
+        contents_list.append(content_data)
+    
+    return _success_response({
+        "contents": contents_list,
+        "path": dir_path,
+        "source": "mirror"
+    })
+
+
+# Search qualifiers such as 'language:python' that only the GitHub API understands
+_SEARCH_QUALIFIER = re.compile(r"\b[\w-]+:\S+")
+
+
+def _mirror_search(mirror, query: str, extension: Optional[str], limit: int) -> Dict[str, Any]:
+    """
+    Search a local mirror with grep_files in the shape of github_search_code.
+    
+    The query text (without search qualifiers) is matched as a case-insensitive phrase.
+    
+    Args:
+        mirror: The repository mirror
+        query: The search query
+        extension: Filter by file extension (e.g., 'java', 'py')
+        limit: Maximum number of results to return
+    
+    Returns:
+        Dict[str, Any]: A success response with the matching files, or an error response
+    """
+    text = " ".join(_SEARCH_QUALIFIER.sub(" ", query).split())
+    if not text:
+        return _error_response("Search query has no text to match in the local mirror")
+    
+    found = grep_files(
+        mirror.path,
+        re.escape(text),
+        file_extension=f".{extension.lstrip('.')}" if extension else "",
+        ignore_case=True,
+    )
+    if not found.get("success"):
+        return _error_response(found.get("error", "Search failed"))
+    
+    results_list = []
+    for file_match in found["file_matches"][:limit]:
+        relpath = os.path.relpath(file_match["file"], mirror.path).replace(os.sep, "/")
+        with open(file_match["file"], "rb") as f:
+            sha = blob_sha(f.read())
+        results_list.append({
+            "name": os.path.basename(relpath),
+            "path": relpath,
+            "sha": sha,
+            "repository": mirror.repo_name,
+            "html_url": mirror.html_url(relpath),
+            "text_matches": "\n...\n".join(m["match"] for m in file_match["matches"][:3]),
+        })
+    
+    return _success_response({
+        "items": results_list,
+        "count": len(results_list),
+        "query": text,
+        "source": "mirror"
+    })
+
+
+def _tree_table(github_client, token: str, repo, repo_name: str, ref: Optional[str]) -> Tuple[List[Tuple[str, str, int]], bool]:
+    """
+    Get the (path, type, size) rows of a whole repository tree.
+    
+    The rows are cached by tree SHA, so every ref pointing at the same tree
+    shares them; the tree request itself goes through the conditional-request cache.
+    
+    Args:
+        github_client: The GitHub client
+        token: The token the client was created for
+        repo: The repository object
+        repo_name: Repository in format 'owner/repo'
+        ref: Branch or commit SHA (defaults to the default branch)
+    
+    Returns:
+        Tuple[List[Tuple[str, str, int]], bool]: The rows in path order and whether GitHub truncated the tree
+    """
+    immutable = bool(ref and _COMMIT_SHA.match(ref))
+    _, data = get_json(github_client, token, f"{repo.url}/git/trees/{quote(ref or 'HEAD', safe='')}", {"recursive": "1"}, immutable=immutable)
+    cache_key = ("github-tree", repo_name.lower(), data.get("sha", ""))
+    cached = content_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    rows = sorted(
+        (entry["path"], _TREE_ENTRY_TYPES.get(entry.get("type"), "file"), entry.get("size", 0))
+        for entry in data.get("tree", [])
+    )
+    table = (rows, bool(data.get("truncated")))
+    content_cache.put(cache_key, table, sum(len(row[0]) + 64 for row in rows), tag=cache_key[:2])
+    return table
+
+
+def _mirror_tree_table(mirror) -> Tuple[List[Tuple[str, str, int]], bool]:
+    """
+    Get the (path, type, size) rows of a local mirror, in the shape of _tree_table.
+    
+    Args:
+        mirror: The repository mirror
+    
+    Returns:
+        Tuple[List[Tuple[str, str, int]], bool]: The rows in path order and False
+    """
+    rows = []
+    for item in TreeWalker(mirror.path, excludes={".git"}, respect_ignore_files=False):
+        rows.append((item.relpath, "directory" if item.is_dir else "file", 0 if item.is_dir else item.stat().st_size))
+    return sorted(rows), False
+
+
+def _filter_tree(rows: List[Tuple[str, str, int]], dir_path: str, max_depth: int, pattern: str) -> List[List[Any]]:
+    """
+    Select the rows below a directory, down to a depth and matching a glob.
+    
+    Args:
+        rows: (path, type, size) rows of the whole tree
+        dir_path: Directory to list ('' for the root)
+        max_depth: Deepest level to include (1 = direct children, 0 = unlimited)
+        pattern: Optional glob; without a '/' it is matched against entry names
+    
+    Returns:
+        List[List[Any]]: The selected [path, type, size] rows
+    """
+    prefix = f"{dir_path.rstrip('/')}/" if dir_path else ""
+    matcher = compile_glob(pattern) if pattern else None
+    selected = []
+    for path, kind, size in rows:
+        if not path.startswith(prefix):
+            continue
+        relative = path[len(prefix):]
+        if max_depth > 0 and relative.count("/") >= max_depth:
+            continue
+        if matcher is not None and not matcher.match(path if "/" in pattern else relative.rsplit("/", 1)[-1]):
+            continue
+        selected.append([path, kind, size])
+    return selected
+
+
 def _success_response(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Format a successful response.
@@ -150,60 +625,42 @@ def _error_response(message: str) -> Dict[str, Any]:
     }
 
 
-def github_get_file_contents(
-    path: str,
-    repository: Optional[str] = None,
-    ref: Optional[str] = None,
-    tool_context: ToolContext = None
-) -> Dict[str, Any]:
+def _fetch_file(github_client, token: str, repo_name: str, normalized_path: str, ref: Optional[str]) -> Dict[str, Any]:
     """
-    Get the contents of a file in a GitHub repository.
-    Returns the file content and metadata such as size and sha.
+    Fetch and decode one file of a repository.
     
     Args:
-        path: Path to the file in the GitHub repository (relative to repo root, e.g., 'src/main/java/file.java')
-        repository: The GitHub repository name in format 'owner/repo'
+        github_client: The GitHub client
+        token: The token the client was created for
+        repo_name: Repository in format 'owner/repo'
+        normalized_path: Path of the file relative to the repository root
         ref: Branch or commit SHA (defaults to the default branch)
-        tool_context: The tool context
     
     Returns:
-        Dict[str, Any]: A dictionary containing file content and metadata or error
+        Dict[str, Any]: A success response with the file, or an error response
     """
-    # Check if GitHub is available first
-    if not globals().get('_GITHUB_AVAILABLE', False):
-        return _error_response("GitHub functionality is not available. Please install PyGithub with: pip install PyGithub")
-        
-    if not path:
-        return _error_response("File path is required")
-    
-    # Normalize path - convert any absolute paths to relative (remove leading slashes)
-    normalized_path = path.lstrip('/')
-    
-    success, env = _get_github_env()
-    if not success:
-        return _error_response(env["error"])
-    
-    success, github_client = _create_github_client(env)
-    if not success:
-        return _error_response(github_client["error"])
+    mirror = _mirror_for(repo_name, ref, token)
+    if mirror is not None:
+        return _mirror_file(mirror, normalized_path)
     
-    # Use provided repository or default from environment
-    repo_name = repository if repository else env.get("repository")
-    if not repo_name:
-        return _error_response("Repository name is required")
+    # Content at a commit SHA never changes; serve repeated reads from the shared cache
+    cache_key = _file_cache_key(repo_name, normalized_path, ref)
+    if cache_key:
+        cached = content_cache.get(cache_key)
+        if cached is not None:
+            return _success_response({"file": dict(cached)})
     
     try:
-        repo = github_client.get_repo(repo_name)
+        repo = _get_repo(github_client, token, repo_name)
         
         # Get contents, using ref if provided
         try:
-            if ref:
-                content = repo.get_contents(normalized_path, ref=ref)
-            else:
-                content = repo.get_contents(normalized_path)
+            content = _get_contents(github_client, token, repo, normalized_path, ref)
         except UnknownObjectException:
             # File not found - provide a clearer error message
-            return _error_response(f"File not found in repository: {normalized_path}")
+            return _error_response(f"File not found in repository {repo_name}: {normalized_path}")
+        except RateLimitError as e:
+            return _error_response(str(e))
         except Exception as e:
             # Handle other API exceptions
             return _error_response(f"Error accessing file {normalized_path}: {str(e)}")
@@ -244,28 +701,190 @@ def github_get_file_contents(
         except (AttributeError, TypeError) as e:
             content_data["content"] = f"[Content access error: {str(e)}]"
         
+        if cache_key:
+            content_cache.put(cache_key, dict(content_data), len(content_data["content"]), tag=cache_key[:3])
+        
         return _success_response({"file": content_data})
         
     except UnknownObjectException:
         return _error_response(f"Repository not found: {repo_name}")
+    except RateLimitError as e:
+        return _error_response(str(e))
+    except Exception as e:
+        return _error_response(f"Unexpected error: {str(e)}")
+
+
+@instrumented
+def github_get_file_contents(
+    path: str,
+    repository: Optional[str] = None,
+    ref: Optional[str] = None,
+    tool_context: ToolContext = None
+) -> Dict[str, Any]:
+    """
+    Get the contents of a file in a GitHub repository.
+    Returns the file content and metadata such as size and sha.
+    
+    Args:
+        path: Path to the file in the GitHub repository (relative to repo root, e.g., 'src/main/java/file.java')
+        repository: The GitHub repository name in format 'owner/repo'
+        ref: Branch or commit SHA (defaults to the default branch)
+        tool_context: The tool context
+    
+    Returns:
+        Dict[str, Any]: A dictionary containing file content and metadata or error
+    """
+    # Check if GitHub is available first
+    if not globals().get('_GITHUB_AVAILABLE', False):
+        return _error_response("GitHub functionality is not available. Please install PyGithub with: pip install PyGithub")
+        
+    if not path:
+        return _error_response("File path is required")
+    
+    # Normalize path - convert any absolute paths to relative (remove leading slashes)
+    normalized_path = path.lstrip('/')
+    
+    success, env = _get_github_env()
+    if not success:
+        return _error_response(env["error"])
+    
+    success, github_client = _create_github_client(env)
+    if not success:
+        return _error_response(github_client["error"])
+    
+    # Use provided repository or default from environment
+    repo_name = repository if repository else env.get("repository")
+    if not repo_name:
+        return _error_response("Repository name is required")
+    
+    return _fetch_file(github_client, env["token"], repo_name, normalized_path, ref)
+
+
+@instrumented
+def github_get_files(
+    paths: List[str],
+    repository: Optional[str] = None,
+    ref: Optional[str] = None,
+    tool_context: ToolContext = None
+) -> Dict[str, Any]:
+    """
+    Get the contents of several files in a GitHub repository in one call.
+    Files are fetched concurrently; prefer this over repeated github_get_file_contents calls.
+    
+    Args:
+        paths: File paths relative to the repo root. Glob patterns such as 'src/**/*.py' are
+            expanded against the repository tree
+        repository: The GitHub repository name in format 'owner/repo'
+        ref: Branch or commit SHA (defaults to the default branch)
+        tool_context: The tool context
+    
+    Returns:
+        Dict[str, Any]: A dictionary containing the files in request order and per-path errors
+    """
+    # Check if GitHub is available first
+    if not globals().get('_GITHUB_AVAILABLE', False):
+        return _error_response("GitHub functionality is not available. Please install PyGithub with: pip install PyGithub")
+    
+    if not paths:
+        return _error_response("At least one file path is required")
+    
+    success, env = _get_github_env()
+    if not success:
+        return _error_response(env["error"])
+    
+    success, github_client = _create_github_client(env)
+    if not success:
+        return _error_response(github_client["error"])
+    
+    # Use provided repository or default from environment
+    repo_name = repository if repository else env.get("repository")
+    if not repo_name:
+        return _error_response("Repository name is required")
+    
+    try:
+        # Expand glob patterns against the repository tree (fetched at most once)
+        file_paths = []
+        tree = None
+        for path in paths:
+            normalized_path = path.lstrip('/')
+            if not any(ch in normalized_path for ch in "*?["):
+                file_paths.append(normalized_path)
+                continue
+            if tree is None:
+                mirror = _mirror_for(repo_name, ref, env["token"])
+                if mirror is not None:
+                    tree, _ = _mirror_tree_table(mirror)
+                elif not globals().get('_USING_PYGITHUB', False):
+                    return _error_response("Glob patterns require PyGithub")
+                else:
+                    repo = _get_repo(github_client, env["token"], repo_name)
+                    tree, _ = _tree_table(github_client, env["token"], repo, repo_name, ref)
+            pattern = compile_glob(normalized_path)
+            file_paths.extend(
+                entry_path for entry_path, kind, _ in tree
+                if kind == "file" and pattern.match(entry_path)
+            )
+        
+        # Keep the first occurrence of each path
+        file_paths = list(dict.fromkeys(file_paths))
+        truncated = len(file_paths) > MAX_BATCH_FILES
+        file_paths = file_paths[:MAX_BATCH_FILES]
+        if not file_paths:
+            return _error_response("No files matched the given paths")
+        
+        with ThreadPoolExecutor(max_workers=min(FILE_FETCH_WORKERS, len(file_paths))) as executor:
+            results = list(executor.map(
+                lambda file_path: _fetch_file(github_client, env["token"], repo_name, file_path, ref),
+                file_paths,
+            ))
+        
+        files = []
+        errors = []
+        for file_path, result in zip(file_paths, results):
+            if result.get("success"):
+                files.append(result["file"])
+            else:
+                errors.append({"path": file_path, "error": result.get("error")})
+        
+        return _success_response({
+            "files": files,
+            "errors": errors,
+            "count": len(files),
+            "truncated": truncated
+        })
+        
+    except UnknownObjectException:
+        return _error_response(f"Repository or ref not found: {repo_name}")
+    except RateLimitError as e:
+        return _error_response(str(e))
     except Exception as e:
         return _error_response(f"Unexpected error: {str(e)}")
 
 
+@instrumented
 def github_list_directory_contents(
     repository: Optional[str] = None,
     path: Optional[str] = None,
     ref: Optional[str] = None,
+    recursive: bool = False,
+    max_depth: int = 0,
+    pattern: str = "",
     tool_context: ToolContext = None
 ) -> Dict[str, Any]:
     """
     List contents of a directory in a GitHub repository.
     Returns a list of files and directories at the specified GitHub path.
+    With recursive=True the whole subtree is listed with a single request, as a
+    compact table of [path, type, size] rows; use this to explore a repository's
+    structure instead of listing directories one by one.
     
     Args:
         repository: The GitHub repository name in format 'owner/repo'
         path: Path to the directory in the GitHub repository (use '/' for root)
         ref: Branch or commit SHA (defaults to the default branch)
+        recursive: List every entry below the directory
+        max_depth: With recursive, the deepest level to include (1 = direct children, 0 = unlimited)
+        pattern: With recursive, only include entries matching this glob (e.g. '*.py' or 'src/**/test_*.py')
         tool_context: The tool context
     
     Returns:
@@ -291,18 +910,45 @@ def github_list_directory_contents(
     # Normalize path - convert any absolute paths to relative (remove leading slashes)
     dir_path = path.lstrip('/') if path else ""
     
+    mirror = _mirror_for(repo_name, ref, env["token"])
+    if mirror is not None and not recursive:
+        return _mirror_listing(mirror, dir_path)
+    
     try:
-        repo = github_client.get_repo(repo_name)
+        if recursive:
+            if mirror is not None:
+                rows, truncated = _mirror_tree_table(mirror)
+            elif globals().get('_USING_PYGITHUB', False):
+                repo = _get_repo(github_client, env["token"], repo_name)
+                try:
+                    rows, truncated = _tree_table(github_client, env["token"], repo, repo_name, ref)
+                except UnknownObjectException:
+                    return _error_response(f"Repository or ref not found: {repo_name}")
+            else:
+                return _error_response("Recursive listing requires PyGithub")
+            
+            if dir_path and not any(row[0] == dir_path.rstrip('/') and row[1] == "directory" for row in rows):
+                return _error_response(f"Directory not found in repository {repo_name}: {dir_path}")
+            
+            selected = _filter_tree(rows, dir_path, max_depth or 0, pattern or "")
+            return _success_response({
+                "columns": ["path", "type", "size"],
+                "rows": selected[:MAX_TREE_ENTRIES],
+                "count": len(selected),
+                "path": dir_path,
+                "truncated": truncated or len(selected) > MAX_TREE_ENTRIES
+            })
+        
+        repo = _get_repo(github_client, env["token"], repo_name)
         
         # Get contents, using ref if provided
         try:
-            if ref:
-                contents = repo.get_contents(dir_path, ref=ref)
-            else:
-                contents = repo.get_contents(dir_path)
+            contents = _get_contents(github_client, env["token"], repo, dir_path, ref)
         except UnknownObjectException:
             # Directory not found - provide a clearer error message
-            return _error_response(f"Directory not found in repository: {dir_path}")
+            return _error_response(f"Directory not found in repository {repo_name}: {dir_path}")
+        except RateLimitError as e:
+            return _error_response(str(e))
         except Exception as e:
             # Handle other API exceptions
             return _error_response(f"Error accessing directory {dir_path}: {str(e)}")
@@ -315,7 +961,8 @@ def github_list_directory_contents(
         
         for content in contents:
             content_data = _format_content_details(content)
-            content_data["type"] = "directory" if isinstance(content, list) else "file"
+            content_type = getattr(content, "type", None)
+            content_data["type"] = "directory" if content_type == "dir" else "submodule" if content_type == "submodule" else "file"
             
             # Safely get URL attributes
             try:
@@ -342,6 +989,8 @@ def github_list_directory_contents(
         
     except UnknownObjectException:
         return _error_response(f"Repository not found: {repo_name}")
+    except RateLimitError as e:
+        return _error_response(str(e))
     except Exception as e:
         return _error_response(f"Unexpected error: {str(e)}")
 
@@ -442,22 +1091,26 @@ def github_list_directory_contents(
 #         return _error_response(f"Unexpected error: {str(e)}")
 
 
+@instrumented
 def github_search_code(
     query: str,
     repository: Optional[str] = None,
     extension: Optional[str] = None,
     limit: Optional[int] = None,
+    fetch_snippets: bool = False,
     tool_context: ToolContext = None
 ) -> Dict[str, Any]:
     """
     Search for code within GitHub repositories.
-    Searches GitHub for code matching the query.
+    Searches GitHub for code matching the query. Each result carries the
+    matching code fragments returned by the search in a single request.
     
     Args:
         query: Search query
         repository: The GitHub repository name in format 'owner/repo' to limit search
         extension: Filter by file extension (e.g., 'java', 'py')
         limit: Maximum number of results to return
+        fetch_snippets: Download the start of files for results without matching fragments
         tool_context: The tool context
     
     Returns:
@@ -488,13 +1141,19 @@ def github_search_code(
         
         actual_limit = limit if limit and limit > 0 else 20  # Default to 20 results
         
+        # A mirrored repository is searched locally
+        mirror = _mirror_for(repository, None, env["token"]) if repository else None
+        if mirror is not None:
+            return _mirror_search(mirror, query, extension, actual_limit)
+        
         # Search for code
-        code_search = github_client.search_code(query_builder)
+        code_search = _search_code_hits(github_client, env["token"], query_builder, actual_limit)
         
         results_list = []
+        missing = []
         count = 0
         
-        for content in code_search[:actual_limit]:
+        for content in code_search:
             if count >= actual_limit:
                 break
             
@@ -526,29 +1185,32 @@ def github_search_code(
                 except (AttributeError, TypeError):
                     content_data["html_url"] = "unknown_url"
             
-            # Try to get a snippet of content for context
-            try:
-                file_content = content.decoded_content.decode('utf-8')
-                
-                # Get a snippet (first 200 chars or less)
-                snippet_length = min(len(file_content), 200)
-                snippet = file_content[:snippet_length]
-                if snippet_length < len(file_content):
-                    snippet += "..."
-                
+            # Use the matching fragments returned by the search itself
+            snippet = _text_match_snippet(content)
+            if snippet is not None:
                 content_data["text_matches"] = snippet
-            except Exception:
-                # Ignore content retrieval errors for search results
-                content_data["text_matches"] = "[Content unavailable]"
+            elif fetch_snippets or not globals().get('_USING_PYGITHUB', False):
+                missing.append((content_data, content))
+            else:
+                content_data["text_matches"] = "[No matching fragment returned; set fetch_snippets to download the file start]"
             
             results_list.append(content_data)
             count += 1
         
+        # Download the hits that came without fragments concurrently
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(SNIPPET_FETCH_WORKERS, len(missing))) as executor:
+                snippets = executor.map(lambda hit: _file_snippet(github_client, env["token"], hit[1]), missing)
+                for (content_data, _), snippet in zip(missing, snippets):
+                    content_data["text_matches"] = snippet
+        
         return _success_response({
             "items": results_list,
             "count": len(results_list),
             "query": query_builder
         })
         
+    except RateLimitError as e:
+        return _error_response(str(e))
     except Exception as e:
         return _error_response(f"Unexpected error: {str(e)}")
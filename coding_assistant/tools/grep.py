@@ -4,89 +4,512 @@ Grep tools for the Coding Assistant.
 This module provides tools for searching text patterns in files.
 """
 
+import functools
+import os
+import re
+from collections import deque
+from concurrent.futures import BrokenExecutor
+from typing import AnyStr, Iterator, List, NamedTuple, Optional, Tuple
+
 from google.adk.tools import ToolContext
 
-def grep_files(directory: str, pattern: str, file_extension: str = "", context_lines: int = 0, tool_context: ToolContext = None) -> dict:
+try:
+    # Python 3.11+
+    import re._parser as _sre_parse
+except ImportError:
+    import sre_parse as _sre_parse
+
+from coding_assistant.shared_libraries import constants
+from coding_assistant.shared_libraries.text import looks_binary
+from coding_assistant.shared_libraries.workers import get_process_pool, reset_process_pool, worker_count
+from coding_assistant.tools.catalog import catalog_entries
+from coding_assistant.tools.instrumentation import instrumented
+from coding_assistant.tools.search_index import find_candidates, index_enabled
+from coding_assistant.tools.walker import iter_files, walk_reaches
+
+# Default result budget of a single grep_files call
+DEFAULT_MAX_MATCHES = 1000
+DEFAULT_MAX_BYTES = int(os.environ.get("CODING_ASSISTANT_GREP_MAX_BYTES", 512 * 1024 * 1024))
+
+# Searches over fewer files than this are not worth shipping to worker processes
+PARALLEL_MIN_FILES = 64
+# Files handed to a worker per task, and tasks kept in flight per worker
+CHUNK_SIZE = 32
+TASKS_PER_WORKER = 2
+
+# Anchors that only make sense per line, so the whole-buffer search cannot be used
+_LINE_ONLY_ANCHORS = re.compile(r"\\[AZ]")
+
+# Characters whose Unicode case folding reaches outside ASCII (e.g. KELVIN SIGN)
+_UNICODE_FOLD_CHARS = frozenset(map(ord, "kKsS"))
+_REPEATS = tuple(
+    op for op in (
+        _sre_parse.MAX_REPEAT,
+        _sre_parse.MIN_REPEAT,
+        getattr(_sre_parse, "POSSESSIVE_REPEAT", None),
+    ) if op is not None
+)
+_ATOMIC_GROUP = getattr(_sre_parse, "ATOMIC_GROUP", None)
+# Anchors that do not depend on what counts as a word character
+_BYTE_SAFE_ANCHORS = frozenset({
+    _sre_parse.AT_BEGINNING, _sre_parse.AT_BEGINNING_STRING,
+    _sre_parse.AT_END, _sre_parse.AT_END_STRING,
+})
+
+
+class _Matcher(NamedTuple):
+    """A compiled search: either a literal scan or a (buffer, line) regex pair."""
+    literal: Optional[bytes]
+    fold_case: bool
+    buffer_rx: Optional["re.Pattern"]
+    line_rx: "re.Pattern"
+    # Match decoded text instead of raw bytes
+    text: bool
+
+
+def _index_root(directory: str, tool_context: Optional[ToolContext]) -> Optional[str]:
+    """
+    Pick the root whose trigram index should serve a search.
+
+    Searches below the session's project path share the project index, anything
+    else gets an index of its own. Returns None for a directory inside the
+    project that the project walk prunes (node_modules, ignored paths, ...):
+    the project index has no entries for it, so it must be searched in full.
+    """
+    directory = os.path.abspath(directory)
+    if tool_context is not None:
+        project_path = tool_context.state.get(constants.PROJECT_PATH)
+        if project_path:
+            project_path = os.path.abspath(project_path)
+            if directory == project_path or directory.startswith(project_path + os.sep):
+                return project_path if walk_reaches(project_path, directory) else None
+    return directory
+
+
+def _literal_bytes(pattern: bytes) -> Optional[bytes]:
+    """Return the text a pattern matches if it is a plain (possibly escaped) literal."""
+    try:
+        parsed = _sre_parse.parse(pattern)
+    except re.error:
+        return None
+    state = getattr(parsed, "state", None) or getattr(parsed, "pattern", None)
+    if getattr(state, "flags", 0) & re.IGNORECASE:
+        # Inline (?i) flags make the literal case-insensitive
+        return None
+    if not len(parsed) or any(op is not _sre_parse.LITERAL for op, _ in parsed):
+        return None
+    return bytes(av for _, av in parsed)
+
+
+def _byte_safe(parsed, ignore_case: bool, repeated: bool = False) -> bool:
+    """
+    Tell whether a parsed bytes pattern (UTF-8 encoded from str) matches the same lines as the str pattern.
+
+    ASCII and multi-byte literals do, since UTF-8 is self-synchronizing, as
+    long as no quantifier applies to a single byte of a character. Any
+    single-character wildcard (., \\w, negated or non-ASCII classes), word
+    boundaries and case folding beyond ASCII need decoded text.
+    """
+    for op, av in parsed:
+        if op is _sre_parse.LITERAL:
+            if av > 127 and (ignore_case or repeated):
+                return False
+            if ignore_case and av in _UNICODE_FOLD_CHARS:
+                return False
+        elif op is _sre_parse.IN:
+            for item_op, item_av in av:
+                if item_op is _sre_parse.LITERAL:
+                    if item_av > 127 or (ignore_case and item_av in _UNICODE_FOLD_CHARS):
+                        return False
+                elif item_op is _sre_parse.RANGE:
+                    low, high = item_av
+                    if high > 127 or (ignore_case and any(low <= c <= high for c in _UNICODE_FOLD_CHARS)):
+                        return False
+                else:
+                    return False
+        elif op is _sre_parse.AT:
+            if av not in _BYTE_SAFE_ANCHORS:
+                return False
+        elif op is _sre_parse.SUBPATTERN:
+            _, add_flags, _, items = av
+            if not _byte_safe(items, ignore_case or bool(add_flags & re.IGNORECASE), repeated):
+                return False
+        elif op in _REPEATS:
+            if not _byte_safe(av[2], ignore_case, True):
+                return False
+        elif op is _sre_parse.BRANCH:
+            if not all(_byte_safe(branch, ignore_case, repeated) for branch in av[1]):
+                return False
+        elif op in (_sre_parse.ASSERT, _sre_parse.ASSERT_NOT):
+            if not _byte_safe(av[1], ignore_case, repeated):
+                return False
+        elif op is _sre_parse.GROUPREF_EXISTS:
+            if not all(_byte_safe(branch, ignore_case, repeated) for branch in av[1:] if branch is not None):
+                return False
+        elif _ATOMIC_GROUP is not None and op is _ATOMIC_GROUP:
+            if not _byte_safe(av, ignore_case, repeated):
+                return False
+        elif op is not _sre_parse.GROUPREF:
+            return False
+    return True
+
+
+def _needs_text(pattern: str, flags: int) -> bool:
+    """Tell whether a pattern must be run on decoded text rather than raw bytes."""
+    try:
+        parsed = _sre_parse.parse(pattern.encode("utf-8"), flags)
+    except re.error:
+        # Escapes like \\u or \\N{...} only exist in str patterns
+        return True
+    state = getattr(parsed, "state", None) or getattr(parsed, "pattern", None)
+    return not _byte_safe(parsed, bool((flags | getattr(state, "flags", 0)) & re.IGNORECASE))
+
+
+def _combine(patterns: Tuple[str, ...]) -> str:
+    """Join several patterns into a single alternation."""
+    if len(patterns) == 1:
+        return patterns[0]
+    return "|".join(f"(?:{p})" for p in patterns)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile(patterns: Tuple[str, ...], ignore_case: bool = False) -> _Matcher:
+    """
+    Compile one or more patterns for matching file contents.
+
+    Pure literals are scanned for with bytes.find (on a lower-cased buffer for
+    case-insensitive searches). Everything else becomes a single alternation
+    compiled twice: the buffer pattern finds candidate lines in a whole file and
+    the line pattern confirms them with per-line grep semantics. The buffer
+    pattern is None when the pattern must be evaluated line by line. Patterns
+    are run on raw bytes when that gives the same result as on text, and on
+    the decoded UTF-8 text of each file otherwise.
+    """
+    flags = re.IGNORECASE if ignore_case else 0
+    combined = _combine(patterns)
+    text = _needs_text(combined, flags)
+
+    if not text:
+        literals = [_literal_bytes(p.encode("utf-8")) for p in patterns]
+        if all(literals):
+            if len(literals) == 1:
+                literal = literals[0].lower() if ignore_case else literals[0]
+                return _Matcher(literal, ignore_case, None, re.compile(re.escape(literals[0]), flags), False)
+            alternation = b"|".join(re.escape(lit) for lit in literals)
+            return _Matcher(None, False, re.compile(alternation, flags), re.compile(alternation, flags), False)
+
+    raw = combined if text else combined.encode("utf-8")
+    line_rx = re.compile(raw, flags)
+    if _LINE_ONLY_ANCHORS.search(combined):
+        return _Matcher(None, False, None, line_rx, text)
+    return _Matcher(None, False, re.compile(raw, flags | re.MULTILINE), line_rx, text)
+
+
+def _newline(data: AnyStr) -> AnyStr:
+    return b"\n" if isinstance(data, bytes) else "\n"
+
+
+def _line_bounds(data: AnyStr, pos: int) -> Tuple[int, int]:
+    """Return the [start, end) bounds of the line containing pos, newline included."""
+    newline = _newline(data)
+    start = data.rfind(newline, 0, pos) + 1
+    end = data.find(newline, pos)
+    return start, (len(data) if end < 0 else end + 1)
+
+
+def _decode(line: AnyStr) -> str:
+    if isinstance(line, bytes):
+        line = line.decode("utf-8", errors="replace")
+    return line.strip()
+
+
+def _context(data: AnyStr, start: int, end: int, context_lines: int) -> dict:
+    """Collect up to context_lines lines before [start, end) and after it."""
+    before = []
+    pos = start
+    while len(before) < context_lines and pos > 0:
+        prev_start = data.rfind(_newline(data), 0, pos - 1) + 1
+        before.append(_decode(data[prev_start:pos]))
+        pos = prev_start
+    before.reverse()
+
+    after = []
+    pos = end
+    while len(after) < context_lines and pos < len(data):
+        _, next_end = _line_bounds(data, pos)
+        after.append(_decode(data[pos:next_end]))
+        pos = next_end
+    return {"before": before, "after": after}
+
+
+def _match_lines(data: AnyStr, matcher: _Matcher) -> Iterator[Tuple[int, int]]:
+    """Yield the [start, end) bounds of every line in data that matches."""
+    if matcher.literal is not None:
+        haystack = data.lower() if matcher.fold_case else data
+        needle = matcher.literal
+        pos = 0
+        while True:
+            hit = haystack.find(needle, pos)
+            if hit < 0:
+                return
+            start, end = _line_bounds(data, hit)
+            # Later hits on the same line end even further out, so one check is enough
+            if hit + len(needle) <= end:
+                yield start, end
+            pos = end
+
+    line_rx = matcher.line_rx
+    if matcher.buffer_rx is None:
+        start = 0
+        while start < len(data):
+            _, end = _line_bounds(data, start)
+            if line_rx.search(data[start:end]):
+                yield start, end
+            start = end
+        return
+
+    pos = 0
+    while pos < len(data):
+        m = matcher.buffer_rx.search(data, pos)
+        if m is None:
+            return
+        start, end = _line_bounds(data, m.start())
+        if start >= len(data):
+            return
+        # A buffer hit may span lines; only keep lines that match on their own
+        if line_rx.search(data[start:end]):
+            yield start, end
+        pos = end
+
+
+def _grep_file(file_path: str, matcher: _Matcher, context_lines: int, max_matches: int) -> Tuple[int, Optional[List[dict]]]:
+    """
+    Search one file.
+
+    Returns:
+        The number of bytes read and the list of matches (None if the file was
+        skipped as binary or unreadable)
+    """
+    try:
+        with open(file_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return 0, None
+    size = len(data)
+    if looks_binary(data):
+        return size, None
+    if b"\r" in data:
+        # Universal newlines, as text-mode reading would give: $ must match before \r\n too
+        data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    if matcher.text:
+        data = data.decode("utf-8", errors="replace")
+
+    matches = []
+    line_number = 1
+    counted_to = 0
+    newline = _newline(data)
+    for start, end in _match_lines(data, matcher):
+        line_number += data.count(newline, counted_to, start)
+        counted_to = start
+        matches.append({
+            "line_number": line_number,
+            "match": _decode(data[start:end]),
+            "context": _context(data, start, end, context_lines),
+        })
+        if len(matches) >= max_matches:
+            break
+    return size, matches
+
+
+def _grep_chunk(file_paths: List[str], patterns: Tuple[str, ...], ignore_case: bool, context_lines: int, max_matches: int, max_bytes: int) -> List[Tuple[str, int, Optional[List[dict]]]]:
+    """
+    Search a chunk of files in a worker process.
+
+    The chunk stops on its own budget; the caller applies the global budget in
+    file order, so the combined result is the same as a serial search.
+    """
+    matcher = _compile(patterns, ignore_case)
+    results = []
+    match_count = 0
+    bytes_read = 0
+    for file_path in file_paths:
+        if match_count >= max_matches or bytes_read >= max_bytes:
+            break
+        size, matches = _grep_file(file_path, matcher, context_lines, max_matches - match_count)
+        bytes_read += size
+        match_count += len(matches or ())
+        results.append((file_path, size, matches))
+    return results
+
+
+def _iter_grep(file_paths: List[str], patterns: Tuple[str, ...], ignore_case: bool, context_lines: int, max_matches: int, max_bytes: int) -> Iterator[Tuple[str, int, Optional[List[dict]]]]:
+    """
+    Stream (file, bytes read, matches) in file order, fanning out to worker processes for large searches.
+    """
+    pool = get_process_pool() if len(file_paths) >= PARALLEL_MIN_FILES else None
+    if pool is None:
+        yield from _grep_chunk(file_paths, patterns, ignore_case, context_lines, max_matches, max_bytes)
+        return
+
+    chunks = deque(file_paths[i:i + CHUNK_SIZE] for i in range(0, len(file_paths), CHUNK_SIZE))
+    in_flight = deque()
+    try:
+        while chunks or in_flight:
+            # Keep a bounded window of tasks running ahead of the consumer
+            while chunks and len(in_flight) < worker_count() * TASKS_PER_WORKER:
+                in_flight.append(pool.submit(_grep_chunk, chunks.popleft(), patterns, ignore_case, context_lines, max_matches, max_bytes))
+            try:
+                results = in_flight.popleft().result()
+            except BrokenExecutor:
+                reset_process_pool()
+                raise
+            yield from results
+    finally:
+        # The consumer stopped early: drop the work it will never read
+        for future in in_flight:
+            future.cancel()
+
+
+@instrumented
+def grep_files(directory: str, pattern: str, file_extension: str = "", context_lines: int = 0, max_matches: int = DEFAULT_MAX_MATCHES, ignore_case: bool = False, patterns: Optional[List[str]] = None, max_bytes: int = DEFAULT_MAX_BYTES, start_at: str = "", start_line: int = 0, tool_context: ToolContext = None) -> dict:
     """
     Search for text patterns within files. Returns matching files with line numbers and snippets.
     Similar to the Unix 'grep' command but optimized for code review.
-    
+
+    Patterns follow Python re syntax with Unicode semantics;
+    binary files, ignored files and directories like .git or node_modules are skipped. Plain literal patterns use a fast substring scan.
+    Large searches are spread over worker processes; results are always returned
+    in a stable path order. A search that hits max_matches or max_bytes returns
+    truncated=True with resume_from (and resume_after_line when a file was cut
+    short); pass them as start_at and start_line to continue where it stopped.
+
     Args:
         directory: The base directory to search in
         pattern: The pattern to search for in file contents
         file_extension: Optional file extension to filter files (e.g., '.py', '.java'). Use empty string to search all files.
         context_lines: Number of context lines to include before/after matches
+        max_matches: Stop after this many matching lines
+        ignore_case: Match case-insensitively
+        patterns: Optional additional patterns; a line matches if any pattern matches
+        max_bytes: Stop scanning once this many bytes of files were read
+        start_at: Resume a truncated search at this file (its resume_from)
+        start_line: Skip matches up to this line of the start_at file (its resume_after_line)
         tool_context: The tool context
-        
+
     Returns:
         A dictionary containing matches found in files
     """
-    import os
-    import re
-    
     try:
+        max_matches = max_matches if max_matches and max_matches > 0 else DEFAULT_MAX_MATCHES
+        max_bytes = max_bytes if max_bytes and max_bytes > 0 else DEFAULT_MAX_BYTES
+        context_lines = max(0, context_lines or 0)
+        start_line = max(0, start_line or 0) if start_at else 0
+        all_patterns = (pattern,) + tuple(p for p in (patterns or ()) if p)
+        # Fail fast on invalid patterns instead of silently skipping every file
+        _compile(all_patterns, ignore_case)
+
+        if not os.path.isdir(directory):
+            raise NotADirectoryError(f"Not a directory: {directory}")
+
+        # Narrow the files to open using the trigram index when the pattern allows it
+        candidates = None
+        index_root = _index_root(directory, tool_context) if index_enabled() else None
+        if index_root is not None:
+            candidates = find_candidates(
+                index_root,
+                _combine(all_patterns),
+                re.IGNORECASE if ignore_case else 0,
+            )
+
+        # List files in a stable order, skipping pruned and ignored paths; the
+        # project catalog answers without touching the disk when it covers the directory
+        entries = catalog_entries(directory)
+        if entries is not None:
+            listing = ((entry_path, record.name) for entry_path, record in entries if record.type == "file")
+        else:
+            listing = ((item.path, item.name) for item in iter_files(directory))
+
+        file_paths = []
+        for file_path, filename in listing:
+            # Skip non-matching extensions if specified
+            if file_extension != "" and not filename.endswith(file_extension):
+                continue
+            if candidates is not None and os.path.abspath(file_path) not in candidates:
+                continue
+            file_paths.append(file_path)
+
+        if start_at:
+            start = os.path.abspath(start_at)
+            for index, file_path in enumerate(file_paths):
+                if os.path.abspath(file_path) == start:
+                    file_paths = file_paths[index:]
+                    break
+            else:
+                raise ValueError(f"start_at is not a file of this search: {start_at}")
+
         results = []
-        file_count = 0
         match_count = 0
-        
-        # Walk through the directory
-        for root, _, files in os.walk(directory):
-            for filename in files:
-                # Skip non-matching extensions if specified
-                if file_extension != "" and not filename.endswith(file_extension):
-                    continue
-                    
-                file_path = os.path.join(root, filename)
-                
-                # Skip binary files
-                try:
-                    # Try to read as text
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        lines = f.readlines()
-                        
-                    file_matches = []
-                    
-                    # Search for the pattern in each line
-                    for i, line in enumerate(lines):
-                        if re.search(pattern, line):
-                            # Calculate context line boundaries
-                            start = max(0, i - context_lines)
-                            end = min(len(lines), i + context_lines + 1)
-                            
-                            # Add match with context
-                            file_matches.append({
-                                "line_number": i + 1,
-                                "match": line.strip(),
-                                "context": {
-                                    "before": [lines[j].strip() for j in range(start, i)],
-                                    "after": [lines[j].strip() for j in range(i + 1, end)]
-                                }
-                            })
-                            match_count += 1
-                    
-                    if file_matches:
-                        file_count += 1
-                        results.append({
-                            "file": file_path,
-                            "matches": file_matches
-                        })
-                        
-                except UnicodeDecodeError:
-                    # Skip binary files
-                    continue
-                except Exception as e:
-                    # Skip files with access issues
+        bytes_scanned = 0
+        files_scanned = 0
+        resume_from = None
+        resume_after_line = 0
+
+        # One match more than needed tells whether a file was cut short; matches
+        # skipped in the start_at file do not count against the budget
+        stream = _iter_grep(file_paths, all_patterns, ignore_case, context_lines, max_matches + start_line + 1, max_bytes)
+        try:
+            for file_path, size, file_matches in stream:
+                # A worker chunk that ran out of budget leaves a gap before the next chunk
+                if match_count >= max_matches or bytes_scanned >= max_bytes or file_path != file_paths[files_scanned]:
+                    resume_from = file_paths[files_scanned]
+                    break
+                files_scanned += 1
+                bytes_scanned += size
+                if file_matches and start_line and files_scanned == 1:
+                    file_matches = [m for m in file_matches if m["line_number"] > start_line]
+                if not file_matches:
                     continue
-        
-        return {
+                kept = file_matches[:max_matches - match_count]
+                match_count += len(kept)
+                results.append({
+                    "file": file_path,
+                    "matches": kept
+                })
+                if len(kept) < len(file_matches):
+                    resume_from, resume_after_line = file_path, kept[-1]["line_number"]
+                    break
+        finally:
+            stream.close()
+        if resume_from is None and files_scanned < len(file_paths):
+            resume_from = file_paths[files_scanned]
+
+        response = {
             "success": True,
             "pattern": pattern,
+            "patterns": list(all_patterns),
             "directory": directory,
             "file_matches": results,
-            "files_with_matches": file_count,
-            "total_matches": match_count
+            "files_with_matches": len(results),
+            "total_matches": match_count,
+            "files_scanned": files_scanned,
+            "bytes_scanned": bytes_scanned,
+            "truncated": resume_from is not None
         }
-    
+        if resume_from is not None:
+            if match_count >= max_matches:
+                response["truncated_by"] = "max_matches"
+                reason = f"Stopped after {match_count} matches (max_matches)"
+            else:
+                response["truncated_by"] = "max_bytes"
+                reason = f"Stopped after scanning {bytes_scanned} bytes (max_bytes)"
+            response["resume_from"] = resume_from
+            resume = f"start_at='{resume_from}'"
+            if resume_after_line:
+                response["resume_after_line"] = resume_after_line
+                resume += f" and start_line={resume_after_line}"
+            response["truncation_note"] = f"{reason}. Call grep_files again with the same arguments plus {resume} to continue."
+        return response
+
     except Exception as e:
         return {
             "success": False,
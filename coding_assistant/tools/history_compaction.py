@@ -0,0 +1,213 @@
+"""
+Conversation history compaction for the Coding Assistant.
+
+Every model call re-sends the whole session history, including the complete
+output of every earlier read_file, grep_files or GitHub call, so the prompt of
+a long session grows with each step. history_compaction() builds a
+before-model callback that, once the estimated prompt is over a token
+threshold, replaces large tool responses (and large model-written arguments
+and text) older than the most recent steps with a short summary and a
+content-hash reference. The user's own messages are never compacted.
+The full value stays available through get_more_results for a while; recent
+steps are always sent verbatim.
+
+Only the request sent to the model is changed; session events keep the
+original responses.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from coding_assistant.shared_libraries.text import CHARS_PER_TOKEN, estimate_content_tokens, estimate_tokens, json_size
+from coding_assistant.tools.response_budget import CONTEXT_FIELD_CHARS, store_page
+
+HISTORY_TOKENS_ENV = "CODING_ASSISTANT_HISTORY_TOKENS"
+KEEP_RECENT_ENV = "CODING_ASSISTANT_HISTORY_KEEP_RECENT"
+
+# Prompt size (estimated tokens) above which old history is compacted
+DEFAULT_MAX_TOKENS = int(os.environ.get(HISTORY_TOKENS_ENV, 32000))
+# Most recent tool responses that are always sent verbatim
+DEFAULT_KEEP_RECENT = int(os.environ.get(KEEP_RECENT_ENV, 6))
+# Responses, arguments and texts smaller than this are never compacted
+MIN_COMPACT_TOKENS = 256
+# Leading characters of a compacted text that are kept as a preview
+TEXT_PREVIEW_CHARS = 600
+# Compacted payloads remembered so later model calls do not hash them again
+MEMO_ENTRIES = 4096
+
+# id(payload) -> (payload, compacted value, (ref, full value, size) or None);
+# the payload is held so its id stays unique
+_memo: "OrderedDict[int, tuple]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _ref(value: Any) -> str:
+    data = json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8", "surrogatepass")).hexdigest()[:16]
+
+
+def _describe(value: Any) -> Any:
+    """Replace a large value by a short description of what was left out."""
+    if isinstance(value, str):
+        return f"<{len(value)} chars, {value.count(chr(10)) + 1} lines compacted>"
+    if isinstance(value, list):
+        return f"<{len(value)} items compacted>"
+    if isinstance(value, dict):
+        return f"<{len(value)} fields compacted: {', '.join(list(map(str, value))[:10])}>"
+    return value
+
+
+def _summarize(fields: dict) -> dict:
+    """Keep the small fields of a tool response (ids, paths, counts) and describe the rest."""
+    summary = {}
+    for key, value in fields.items():
+        if estimate_tokens(value) * CHARS_PER_TOKEN <= CONTEXT_FIELD_CHARS:
+            summary[key] = value
+        elif isinstance(value, dict):
+            summary[key] = {k: v if estimate_tokens(v) * CHARS_PER_TOKEN <= CONTEXT_FIELD_CHARS else _describe(v) for k, v in value.items()}
+        else:
+            summary[key] = _describe(value)
+    return summary
+
+
+def _compact_response(response: dict) -> Tuple[dict, tuple]:
+    ref = _ref(response)
+    summary = _summarize(response)
+    summary["compacted"] = True
+    summary["content_ref"] = ref
+    summary["compaction_note"] = (
+        "Older tool output compacted to keep the prompt small. Call get_more_results "
+        "with content_ref to see it again, or repeat the original call."
+    )
+    return summary, (ref, response)
+
+
+def _compact_text(text: str) -> Tuple[str, tuple]:
+    ref = _ref(text)
+    compacted = (
+        f"{text[:TEXT_PREVIEW_CHARS]}\n"
+        f"[... {len(text) - TEXT_PREVIEW_CHARS} more chars compacted, content_ref {ref}]"
+    )
+    return compacted, (ref, {"text": text})
+
+
+def _summarize_args(args: dict) -> Tuple[dict, None]:
+    return _summarize(args), None
+
+
+def _memoized(payload: Any, compact: Callable[[Any], Tuple[Any, Optional[tuple]]]) -> Any:
+    """
+    Compact a payload once and keep its full value available to get_more_results.
+
+    Request parts are fresh copies on every model call, but their payloads are
+    shared with the session events, so the payload object identifies the part.
+    """
+    key = id(payload)
+    with _memo_lock:
+        entry = _memo.get(key)
+        if entry is not None and entry[0] is payload:
+            _memo.move_to_end(key)
+    if entry is None or entry[0] is not payload:
+        compacted, page = compact(payload)
+        if page is not None:
+            page += (json_size(page[1]),)
+        entry = (payload, compacted, page)
+        with _memo_lock:
+            _memo[key] = entry
+            while len(_memo) > MEMO_ENTRIES:
+                _memo.popitem(last=False)
+    _, compacted, page = entry
+    if page is not None:
+        # Stored on every call, so the page outlives older pages while the part is compacted
+        ref, value, size = page
+        store_page(value, ref, size)
+    return compacted
+
+
+def _compact_part(part: types.Part, role: Optional[str]) -> Optional[types.Part]:
+    """Return a compacted copy of a large tool response or model part, or None to keep it as is."""
+    if part.function_response is not None:
+        response = part.function_response.response
+        if isinstance(response, dict) and estimate_tokens(response) > MIN_COMPACT_TOKENS:
+            function_response = part.function_response.model_copy(update={"response": _memoized(response, _compact_response)})
+            return part.model_copy(update={"function_response": function_response})
+    elif role != "model":
+        # What the user wrote is always sent as is
+        return None
+    elif part.function_call is not None:
+        args = part.function_call.args
+        if isinstance(args, dict) and estimate_tokens(args) > MIN_COMPACT_TOKENS:
+            function_call = part.function_call.model_copy(update={"args": _memoized(args, _summarize_args)})
+            return part.model_copy(update={"function_call": function_call})
+    elif part.text and not part.thought and len(part.text) > MIN_COMPACT_TOKENS * CHARS_PER_TOKEN:
+        return part.model_copy(update={"text": _memoized(part.text, _compact_text)})
+    return None
+
+
+def _recent_start(contents: List[types.Content], keep_recent: int) -> int:
+    """Index of the first content that is sent verbatim: the one holding the keep_recent-th newest tool response."""
+    seen = 0
+    for i in range(len(contents) - 1, -1, -1):
+        if any(part.function_response is not None for part in contents[i].parts or []):
+            seen += 1
+            if seen >= keep_recent:
+                return i
+    return 0
+
+
+def compact_contents(contents: List[types.Content], max_tokens: int, keep_recent: int) -> int:
+    """
+    Compact the stale part of a request history in place.
+
+    Content objects are given new part lists rather than mutated parts, since
+    the parts of a request are shared with the session events.
+
+    Args:
+        contents: The contents of a model request
+        max_tokens: Compact only when the history is estimated above this size
+        keep_recent: Number of most recent tool responses kept verbatim
+
+    Returns:
+        int: The number of parts that were compacted
+    """
+    if estimate_content_tokens(contents) <= max_tokens:
+        return 0
+    compacted = 0
+    for content in contents[:_recent_start(contents, keep_recent)]:
+        parts = list(content.parts or [])
+        changed = False
+        for i, part in enumerate(parts):
+            replacement = _compact_part(part, content.role)
+            if replacement is not None:
+                parts[i] = replacement
+                changed = True
+                compacted += 1
+        if changed:
+            content.parts = parts
+    return compacted
+
+
+def history_compaction(max_tokens: int = DEFAULT_MAX_TOKENS, keep_recent: int = DEFAULT_KEEP_RECENT):
+    """
+    Build a before-model callback that compacts old history in long sessions.
+
+    Args:
+        max_tokens: Estimated prompt size above which old history is compacted
+        keep_recent: Number of most recent tool responses always sent verbatim
+
+    Returns:
+        A callback for the before_model_callback of an agent
+    """
+    def compact_history(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        compact_contents(llm_request.contents, max_tokens, keep_recent)
+        return None
+
+    return compact_history
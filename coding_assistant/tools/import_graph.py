@@ -0,0 +1,366 @@
+"""
+Python import graph for the Coding Assistant.
+
+This module parses the Python files of a project with ast, resolves their
+imports to project modules and keeps the resulting module dependency graph in
+a cache file. Files are only re-parsed when their content hash changes, and
+large batches of changed files are parsed across the shared worker pool.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import BrokenExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from coding_assistant.shared_libraries.cache import get_cache_dir
+from coding_assistant.shared_libraries.workers import get_process_pool, reset_process_pool
+from coding_assistant.tools.catalog import catalog_entries
+from coding_assistant.tools.walker import iter_files
+
+GRAPH_VERSION = 1
+
+# Batches smaller than this are parsed in-process
+PARALLEL_MIN_FILES = 64
+CHUNK_SIZE = 64
+
+# (module, level, imported names) as found in an import statement
+ImportRecord = Tuple[str, int, List[str]]
+
+
+def _source_roots(relpaths: Iterable[str]) -> List[str]:
+    """
+    Return the directories that packages are imported from, deepest first.
+
+    Besides the project root, a directory without __init__.py that holds
+    packages is one when it is named 'src' or sits directly below the root,
+    as in the src layout ('src/pkg/__init__.py' is imported as 'pkg').
+    """
+    packages = {relpath.rpartition("/")[0] for relpath in relpaths if relpath.rpartition("/")[2] == "__init__.py"}
+    roots = set()
+    for package in packages:
+        parent = package.rpartition("/")[0]
+        if parent and parent not in packages and ("/" not in parent or parent.rpartition("/")[2] == "src"):
+            roots.add(parent)
+    return sorted(roots, key=lambda root: (-root.count("/"), root))
+
+
+def _module_name(relpath: str, roots: Iterable[str] = ()) -> str:
+    """Turn 'pkg/sub/mod.py' into 'pkg.sub.mod' and 'pkg/__init__.py' into 'pkg', relative to its source root."""
+    for root in roots:
+        if relpath.startswith(root + "/"):
+            relpath = relpath[len(root) + 1:]
+            break
+    parts = relpath[:-3].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+def _parse_imports(source: bytes, filename: str) -> List[ImportRecord]:
+    """Return the import statements of a Python source."""
+    tree = ast.parse(source, filename=filename)
+    imports: List[ImportRecord] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append((alias.name, 0, []))
+        elif isinstance(node, ast.ImportFrom):
+            imports.append((node.module or "", node.level or 0, [alias.name for alias in node.names]))
+    return imports
+
+
+def _parse_chunk(root: str, relpaths: List[str]) -> List[Tuple[str, str, Optional[List[ImportRecord]], Optional[str]]]:
+    """
+    Hash and parse a batch of files (runs in a worker process).
+
+    Returns:
+        (relpath, content hash, imports or None, error or None) per file
+    """
+    results = []
+    for relpath in relpaths:
+        try:
+            with open(os.path.join(root, relpath), "rb") as f:
+                source = f.read()
+        except OSError as e:
+            results.append((relpath, "", None, str(e)))
+            continue
+        digest = hashlib.sha1(source).hexdigest()
+        try:
+            results.append((relpath, digest, _parse_imports(source, relpath), None))
+        except (SyntaxError, ValueError) as e:
+            results.append((relpath, digest, None, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def _hash_file(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class ImportGraphSnapshot:
+    """
+    The module dependency graph as of one refresh.
+
+    A refresh builds a new snapshot instead of changing this one, so queries
+    need no lock while other threads refresh the graph.
+    """
+
+    def __init__(self, modules: Dict[str, str], edges: Dict[str, Set[str]], external: Dict[str, Set[str]],
+                 errors: Dict[str, str], last_refresh: Dict[str, int]):
+        self.modules = modules
+        self.edges = edges
+        self.external = external
+        self.errors = errors
+        self.last_refresh = last_refresh
+
+    def reverse_edges(self) -> Dict[str, Set[str]]:
+        """Return module -> modules that import it."""
+        reverse: Dict[str, Set[str]] = {module: set() for module in self.edges}
+        for module, deps in self.edges.items():
+            for dep in deps:
+                reverse[dep].add(module)
+        return reverse
+
+    @staticmethod
+    def closure(edges: Dict[str, Set[str]], start: str) -> Set[str]:
+        """Return every module reachable from start (excluding start itself)."""
+        seen: Set[str] = set()
+        stack = list(edges.get(start, ()))
+        while stack:
+            module = stack.pop()
+            if module in seen:
+                continue
+            seen.add(module)
+            stack.extend(edges.get(module, ()))
+        seen.discard(start)
+        return seen
+
+    def cycles(self) -> List[List[str]]:
+        """Return the strongly connected components that form import cycles (Tarjan)."""
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        components: List[List[str]] = []
+        counter = 0
+
+        for start in sorted(self.edges):
+            if start in index:
+                continue
+            work = [(start, iter(sorted(self.edges[start])))]
+            index[start] = lowlink[start] = counter
+            counter += 1
+            stack.append(start)
+            on_stack.add(start)
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if child not in index:
+                        index[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(sorted(self.edges[child]))))
+                        advanced = True
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1:
+                        components.append(sorted(component))
+        return sorted(components, key=lambda c: (-len(c), c))
+
+
+class ImportGraph:
+    """
+    The module dependency graph of the Python files below a root.
+    """
+
+    def __init__(self, root: str, cache_path: str):
+        self.root = root
+        self.cache_path = cache_path
+        self.lock = threading.Lock()
+        # relpath -> {"mtime_ns", "size", "hash", "imports", "error"}
+        self.files: Dict[str, dict] = {}
+        self.snapshot = ImportGraphSnapshot({}, {}, {}, {}, {})
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == GRAPH_VERSION and data.get("root") == self.root:
+            self.files = data.get("files", {})
+
+    def _save(self):
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": GRAPH_VERSION, "root": self.root, "files": self.files}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _python_files(self) -> Iterable[Tuple[str, int, int]]:
+        """Yield (relpath, mtime_ns, size) of the Python files below the root."""
+        entries = catalog_entries(self.root)
+        if entries is not None:
+            for display_path, record in entries:
+                if record.type == "file" and record.name.endswith(".py"):
+                    relpath = os.path.relpath(display_path, self.root).replace(os.sep, "/")
+                    yield relpath, record.mtime_ns, record.size
+            return
+        for item in iter_files(self.root):
+            if item.name.endswith(".py"):
+                try:
+                    stats = item.stat()
+                except OSError:
+                    continue
+                yield item.relpath, stats.st_mtime_ns, stats.st_size
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        Re-parse files whose content changed and rebuild the graph.
+
+        Returns:
+            Counters of reused and re-parsed files
+        """
+        current: Dict[str, Tuple[int, int]] = {}
+        stale: List[str] = []
+        for relpath, mtime_ns, size in self._python_files():
+            current[relpath] = (mtime_ns, size)
+            cached = self.files.get(relpath)
+            if cached is None or cached.get("mtime_ns") != mtime_ns or cached.get("size") != size:
+                stale.append(relpath)
+
+        # A touched but unchanged file only costs a hash, not a parse
+        to_parse = []
+        for relpath in stale:
+            cached = self.files.get(relpath)
+            if cached is not None:
+                try:
+                    if _hash_file(os.path.join(self.root, relpath)) == cached.get("hash"):
+                        cached["mtime_ns"], cached["size"] = current[relpath]
+                        continue
+                except OSError:
+                    pass
+            to_parse.append(relpath)
+
+        for relpath, digest, imports, error in self._parse(to_parse):
+            mtime_ns, size = current[relpath]
+            self.files[relpath] = {"mtime_ns": mtime_ns, "size": size, "hash": digest, "imports": imports or [], "error": error}
+
+        removed = [relpath for relpath in self.files if relpath not in current]
+        for relpath in removed:
+            del self.files[relpath]
+
+        if stale or removed:
+            self._save()
+        last_refresh = {"files": len(current), "parsed": len(to_parse), "reused": len(current) - len(to_parse)}
+        self.snapshot = self._build(last_refresh)
+        return last_refresh
+
+    def _parse(self, relpaths: List[str]):
+        """Parse files, fanning out to the worker pool for large batches."""
+        pool = get_process_pool() if len(relpaths) >= PARALLEL_MIN_FILES else None
+        if pool is None:
+            return _parse_chunk(self.root, relpaths)
+        futures = [
+            pool.submit(_parse_chunk, self.root, relpaths[i:i + CHUNK_SIZE])
+            for i in range(0, len(relpaths), CHUNK_SIZE)
+        ]
+        results = []
+        try:
+            for future in futures:
+                results.extend(future.result())
+        except BrokenExecutor:
+            reset_process_pool()
+            raise
+        return results
+
+    def _build(self, last_refresh: Dict[str, int]) -> ImportGraphSnapshot:
+        """Resolve the cached import records into module edges."""
+        roots = _source_roots(self.files)
+        names = {relpath: _module_name(relpath, roots) for relpath in self.files}
+        modules = {module: relpath for relpath, module in names.items()}
+        edges: Dict[str, Set[str]] = {module: set() for module in modules}
+        external: Dict[str, Set[str]] = {module: set() for module in modules}
+        errors = {relpath: entry["error"] for relpath, entry in self.files.items() if entry.get("error")}
+
+        def resolve(name: str) -> Optional[str]:
+            # The longest prefix of a dotted name that is a project module
+            while name:
+                if name in modules:
+                    return name
+                name = name.rpartition(".")[0]
+            return None
+
+        for relpath, entry in self.files.items():
+            module = names[relpath]
+            is_package = relpath.endswith("__init__.py")
+            for name, level, imported in entry.get("imports", []):
+                if level:
+                    # Relative import: climb from the importing module's package
+                    package = module if is_package else module.rpartition(".")[0]
+                    for _ in range(level - 1):
+                        package = package.rpartition(".")[0]
+                    base = ".".join(p for p in (package, name) if p)
+                else:
+                    base = name
+                targets = [f"{base}.{n}" if base else n for n in imported] or [base]
+                for target in targets:
+                    resolved = resolve(target) or resolve(base)
+                    if resolved is not None:
+                        if resolved != module:
+                            edges[module].add(resolved)
+                    elif not level and base:
+                        external[module].add(base.split(".")[0])
+        return ImportGraphSnapshot(modules, edges, external, errors, last_refresh)
+
+
+_graphs: Dict[str, ImportGraph] = {}
+_graphs_lock = threading.Lock()
+
+
+def get_import_graph(root: str) -> ImportGraphSnapshot:
+    """
+    Return the refreshed import graph of a project root.
+
+    Args:
+        root: The directory containing the Python code
+
+    Returns:
+        A snapshot of the graph, updated for files changed since the last call
+    """
+    root = os.path.abspath(root)
+    with _graphs_lock:
+        graph = _graphs.get(root)
+        if graph is None:
+            digest = hashlib.sha1(root.encode("utf-8")).hexdigest()
+            graph = ImportGraph(root, os.path.join(get_cache_dir("imports"), f"{digest}.json"))
+            _graphs[root] = graph
+    with graph.lock:
+        graph.refresh()
+        return graph.snapshot
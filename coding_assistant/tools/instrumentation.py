@@ -0,0 +1,310 @@
+"""
+Per-tool instrumentation for the Coding Assistant.
+
+Every tool is wrapped with @instrumented, which records per tool and agent the
+calls, errors, wall time, characters and estimated tokens returned, and the
+cache lookups the call made (content cache, GitHub response cache, ...).
+prometheus_metrics() renders the process totals in the Prometheus text format
+(the HTTP server serves them at /metrics), session_summary() breaks one
+session down by tool and agent, and with CODING_ASSISTANT_TOOL_SPANS=1 every
+call is also recorded as an OpenTelemetry span.
+"""
+
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from coding_assistant.shared_libraries.cache import cache_lookups, content_cache
+from coding_assistant.shared_libraries.text import CHARS_PER_TOKEN, json_size
+
+# Try importing OpenTelemetry for tool spans (installed with google-adk)
+try:
+    from opentelemetry import trace
+    _OTEL_AVAILABLE = True
+except ImportError:
+    _OTEL_AVAILABLE = False
+
+SPANS_ENV = "CODING_ASSISTANT_TOOL_SPANS"
+
+# Upper bounds (seconds) of the tool latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Sessions whose per-tool totals are kept for session_summary
+MAX_SESSIONS = 1024
+
+_COUNTERS = ("calls", "errors", "seconds", "chars", "tokens", "cache_hits", "cache_misses")
+
+# (tool, agent) -> counters and latency buckets, for the whole process
+_totals: Dict[Tuple[str, str], Dict[str, Any]] = {}
+# session ID -> (tool, agent) -> counters
+_sessions: "OrderedDict[str, Dict[Tuple[str, str], Dict[str, Any]]]" = OrderedDict()
+_lock = threading.Lock()
+
+_tracer = trace.get_tracer(__name__) if _OTEL_AVAILABLE else None
+
+
+def _spans_enabled() -> bool:
+    return _OTEL_AVAILABLE and os.environ.get(SPANS_ENV, "0") == "1"
+
+
+def _call_context(kwargs: dict) -> Tuple[str, Optional[str]]:
+    """Return the agent and session ID of a call from its tool context."""
+    tool_context = kwargs.get("tool_context")
+    if tool_context is None:
+        return "", None
+    try:
+        return tool_context.agent_name or "", tool_context.session.id
+    except (AttributeError, ValueError):
+        return getattr(tool_context, "agent_name", "") or "", None
+
+
+def _is_error(response: Any) -> bool:
+    return isinstance(response, dict) and (response.get("success") is False or ("error" in response and "success" not in response))
+
+
+def _record(tool: str, agent: str, session_id: Optional[str], seconds: float, response: Any, failed: bool, lookups: List[int]) -> Dict[str, Any]:
+    chars = json_size(response) if response is not None else 0
+    sample = {
+        "calls": 1,
+        "errors": int(failed or _is_error(response)),
+        "seconds": seconds,
+        "chars": chars,
+        "tokens": -(-chars // CHARS_PER_TOKEN),
+        "cache_hits": lookups[0],
+        "cache_misses": lookups[1],
+    }
+    key = (tool, agent)
+    with _lock:
+        totals = _totals.get(key)
+        if totals is None:
+            totals = _totals[key] = dict.fromkeys(_COUNTERS, 0)
+            totals["buckets"] = [0] * len(LATENCY_BUCKETS)
+        for name in _COUNTERS:
+            totals[name] += sample[name]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                totals["buckets"][i] += 1
+                break
+        if session_id:
+            session = _sessions.get(session_id)
+            if session is None:
+                session = _sessions[session_id] = {}
+                while len(_sessions) > MAX_SESSIONS:
+                    _sessions.popitem(last=False)
+            else:
+                _sessions.move_to_end(session_id)
+            counters = session.setdefault(key, dict.fromkeys(_COUNTERS, 0))
+            for name in _COUNTERS:
+                counters[name] += sample[name]
+    return sample
+
+
+class _Call:
+    """Measures one tool call; nested tool calls count towards the outer one."""
+
+    def __init__(self, tool: str, kwargs: dict):
+        self.tool = tool
+        self.kwargs = kwargs
+        self.nested = cache_lookups.get() is not None
+
+    def start(self) -> "_Call":
+        if self.nested:
+            return self
+        self.agent, self.session_id = _call_context(self.kwargs)
+        self.lookups = [0, 0]
+        self._reset = cache_lookups.set(self.lookups)
+        self._span = None
+        if _spans_enabled():
+            self._span = _tracer.start_span(f"tool {self.tool}", attributes={
+                "coding_assistant.tool": self.tool,
+                "coding_assistant.agent": self.agent,
+                "coding_assistant.session_id": self.session_id or "",
+            })
+        self.started = time.perf_counter()
+        return self
+
+    def finish(self, response: Any = None, error: Optional[BaseException] = None):
+        if self.nested:
+            return
+        seconds = time.perf_counter() - self.started
+        cache_lookups.reset(self._reset)
+        sample = _record(self.tool, self.agent, self.session_id, seconds, response, error is not None, self.lookups)
+        if self._span is not None:
+            self._span.set_attributes({f"coding_assistant.{name}": value for name, value in sample.items() if name != "calls"})
+            if error is not None:
+                self._span.record_exception(error)
+                self._span.set_status(trace.Status(trace.StatusCode.ERROR, str(error)))
+            self._span.end()
+
+
+def instrumented(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a tool so its calls are measured.
+
+    The wrapper keeps the tool's name, docstring and signature, so the model
+    sees the same function declaration. Agent and session are taken from the
+    tool_context argument.
+
+    Args:
+        func: The tool, synchronous or async
+
+    Returns:
+        The instrumented tool
+    """
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            call = _Call(func.__name__, kwargs).start()
+            try:
+                response = await func(*args, **kwargs)
+            except BaseException as e:
+                call.finish(error=e)
+                raise
+            call.finish(response)
+            return response
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        call = _Call(func.__name__, kwargs).start()
+        try:
+            response = func(*args, **kwargs)
+        except BaseException as e:
+            call.finish(error=e)
+            raise
+        call.finish(response)
+        return response
+    return wrapper
+
+
+def _rows(stats: Dict[Tuple[str, str], Dict[str, Any]]) -> Dict[str, Any]:
+    total_seconds = sum(counters["seconds"] for counters in stats.values())
+    rows = []
+    for (tool, agent), counters in sorted(stats.items(), key=lambda item: -item[1]["seconds"]):
+        row = {"tool": tool, "agent": agent, **{name: counters[name] for name in _COUNTERS}}
+        row["seconds"] = round(row["seconds"], 6)
+        row["avg_ms"] = round(counters["seconds"] * 1000 / counters["calls"], 3)
+        row["share"] = round(counters["seconds"] / total_seconds, 4) if total_seconds else 0.0
+        rows.append(row)
+    return {
+        "tool_calls": sum(counters["calls"] for counters in stats.values()),
+        "tool_seconds": round(total_seconds, 6),
+        "tools": rows,
+    }
+
+
+def tool_metrics() -> Dict[str, Any]:
+    """
+    Return the tool totals of this process, slowest tool first.
+
+    Returns:
+        Dict[str, Any]: Total calls and seconds, and per tool and agent the
+        counters and the share of the total tool time
+    """
+    with _lock:
+        stats = {key: dict(counters) for key, counters in _totals.items()}
+    return _rows(stats)
+
+
+def session_summary(session_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the tool totals of one session, slowest tool first.
+
+    Args:
+        session_id: The session ID
+
+    Returns:
+        Optional[Dict[str, Any]]: Like tool_metrics for the session, or None
+        when no tool call of the session was recorded by this process
+    """
+    with _lock:
+        session = _sessions.get(session_id)
+        stats = {key: dict(counters) for key, counters in session.items()} if session is not None else None
+    if stats is None:
+        return None
+    return {"session_id": session_id, **_rows(stats)}
+
+
+def _labels(**labels: Any) -> str:
+    escaped = (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for value in labels.values()
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+
+def prometheus_metrics() -> str:
+    """
+    Render the tool metrics, and the counters of the shared caches, in the
+    Prometheus text exposition format.
+
+    Returns:
+        str: The metrics page
+    """
+    with _lock:
+        stats = {key: {**counters, "buckets": list(counters["buckets"])} for key, counters in _totals.items()}
+
+    lines = []
+
+    def metric(name: str, kind: str, help_text: str, samples: List[Tuple[str, str, Any]]):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(f"{sample_name}{labels} {value}" for sample_name, labels, value in samples)
+
+    def per_tool(counter: str) -> List[Tuple[str, str, Any]]:
+        return [("", _labels(tool=tool, agent=agent), counters[counter]) for (tool, agent), counters in sorted(stats.items())]
+
+    for counter, help_text in (
+        ("calls", "Tool calls"),
+        ("errors", "Tool calls that raised or returned an error"),
+        ("chars", "Characters of JSON returned by tools"),
+        ("tokens", "Estimated tokens returned by tools"),
+        ("cache_hits", "Cache lookups served from a cache during tool calls"),
+        ("cache_misses", "Cache lookups that missed during tool calls"),
+    ):
+        name = f"coding_assistant_tool_{counter}_total"
+        metric(name, "counter", help_text, [(name, labels, value) for _, labels, value in per_tool(counter)])
+
+    name = "coding_assistant_tool_duration_seconds"
+    samples = []
+    for (tool, agent), counters in sorted(stats.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, counters["buckets"]):
+            cumulative += count
+            samples.append((f"{name}_bucket", _labels(tool=tool, agent=agent, le=bound), cumulative))
+        samples.append((f"{name}_bucket", _labels(tool=tool, agent=agent, le="+Inf"), counters["calls"]))
+        samples.append((f"{name}_sum", _labels(tool=tool, agent=agent), round(counters["seconds"], 6)))
+        samples.append((f"{name}_count", _labels(tool=tool, agent=agent), counters["calls"]))
+    metric(name, "histogram", "Wall time of tool calls", samples)
+
+    content = content_cache.stats()
+    for counter in ("hits", "misses", "evictions"):
+        name = f"coding_assistant_content_cache_{counter}_total"
+        metric(name, "counter", f"Content cache {counter}", [(name, "", content[counter])])
+    name = "coding_assistant_content_cache_bytes"
+    metric(name, "gauge", "Bytes held by the content cache", [(name, "", content["bytes"])])
+
+    # The GitHub modules do not import PyGithub, so this stays cheap
+    from coding_assistant.tools.github_cache import cache_stats
+    from coding_assistant.tools.github_scheduler import scheduler_stats
+    name = "coding_assistant_github_cache_responses_total"
+    metric(name, "counter", "GitHub responses by cache outcome", [
+        (name, _labels(outcome=outcome), count) for outcome, count in sorted(cache_stats().items())
+    ])
+    scheduler = scheduler_stats()
+    for counter, help_text in (("requests", "GitHub requests sent"), ("retries", "GitHub requests retried"), ("rate_limited", "GitHub responses that hit a rate limit")):
+        name = f"coding_assistant_github_{counter}_total"
+        metric(name, "counter", help_text, [(name, "", scheduler[counter])])
+    name = "coding_assistant_github_queue_depth"
+    metric(name, "gauge", "GitHub requests waiting for the scheduler", [(name, "", scheduler["queue_depth"])])
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    """Forget all recorded tool calls."""
+    with _lock:
+        _totals.clear()
+        _sessions.clear()
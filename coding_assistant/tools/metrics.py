@@ -0,0 +1,248 @@
+"""
+Code metrics for the Coding Assistant.
+
+This module computes cyclomatic complexity, line counts and per-function
+statistics of Python sources. Results are memoized per content hash, and
+batches of files are measured across the shared worker pool.
+"""
+
+import ast
+import hashlib
+import io
+import os
+import threading
+import tokenize
+from concurrent.futures import BrokenExecutor
+from typing import Dict, List, Optional, Tuple
+
+from coding_assistant.shared_libraries.cache import ByteLRUCache
+from coding_assistant.shared_libraries.workers import get_process_pool, reset_process_pool
+
+# Batches smaller than this are measured in-process
+PARALLEL_MIN_FILES = 32
+CHUNK_SIZE = 32
+
+# Rough in-memory footprint of a memoized result, used for the cache budget
+_BASE_RESULT_BYTES = 512
+_FUNCTION_RESULT_BYTES = 256
+
+_metrics_cache = ByteLRUCache(16 * 1024 * 1024)
+
+# realpath -> (mtime_ns, size, content hash), so unchanged files are not even read
+_digests: Dict[str, Tuple[int, int, str]] = {}
+_digests_lock = threading.Lock()
+
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+_SCOPE_NODES = _FUNCTION_NODES + (ast.ClassDef,)
+_BRANCH_NODES = (ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While, ast.ExceptHandler, ast.Assert)
+
+
+def _decision_points(node: ast.AST) -> int:
+    """Count the branches a single node adds to the control flow graph."""
+    if isinstance(node, _BRANCH_NODES):
+        return 1
+    if isinstance(node, ast.BoolOp):
+        return len(node.values) - 1
+    if isinstance(node, ast.comprehension):
+        return 1 + len(node.ifs)
+    if hasattr(ast, "match_case") and isinstance(node, ast.match_case):
+        return 1
+    return 0
+
+
+def _complexity(body: List[ast.AST]) -> int:
+    """Return the cyclomatic complexity of a block, not descending into nested scopes."""
+    complexity = 1
+    stack = [node for node in body if not isinstance(node, _SCOPE_NODES)]
+    while stack:
+        node = stack.pop()
+        complexity += _decision_points(node)
+        for child in ast.iter_child_nodes(node):
+            if not isinstance(child, _SCOPE_NODES):
+                stack.append(child)
+    return complexity
+
+
+def _functions(tree: ast.Module) -> List[dict]:
+    """Return per-function statistics in source order, with dotted qualified names."""
+    functions = []
+    stack: List[Tuple[ast.AST, str]] = [(node, "") for node in reversed(tree.body)]
+    while stack:
+        node, prefix = stack.pop()
+        if isinstance(node, _FUNCTION_NODES + (ast.ClassDef,)):
+            name = f"{prefix}{node.name}"
+            if isinstance(node, _FUNCTION_NODES):
+                end_line = getattr(node, "end_lineno", None) or node.lineno
+                functions.append({
+                    "name": name,
+                    "line": node.lineno,
+                    "end_line": end_line,
+                    "lines_of_code": end_line - node.lineno + 1,
+                    "cyclomatic_complexity": _complexity(node.body),
+                })
+            stack.extend((child, f"{name}.") for child in reversed(node.body))
+        else:
+            # Definitions nested in if/try/with blocks at this level
+            for child in reversed(list(ast.iter_child_nodes(node))):
+                if isinstance(child, ast.stmt):
+                    stack.append((child, prefix))
+    return functions
+
+
+def _line_counts(source: bytes) -> Tuple[int, int, int, int]:
+    """Return (total, source, comment, blank) line counts of a Python source."""
+    lines = source.splitlines()
+    total = len(lines)
+    blank = sum(1 for line in lines if not line.strip())
+    comment_lines = set()
+    code_lines = set()
+    skip = (tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT, tokenize.ENCODING, tokenize.ENDMARKER)
+    for token in tokenize.tokenize(io.BytesIO(source).readline):
+        if token.type == tokenize.COMMENT:
+            comment_lines.add(token.start[0])
+        elif token.type not in skip:
+            code_lines.update(range(token.start[0], token.end[0] + 1))
+    return total, len(code_lines), len(comment_lines), blank
+
+
+def compute_metrics(source: bytes, filename: str = "<source>") -> dict:
+    """
+    Compute the metrics of a Python source.
+
+    Args:
+        source: The file content
+        filename: Name used in syntax error messages
+
+    Returns:
+        Line counts, comment ratio, cyclomatic complexity and per-function stats
+    """
+    tree = ast.parse(source, filename=filename)
+    total, sloc, comments, blank = _line_counts(source)
+    functions = _functions(tree)
+    function_complexities = [f["cyclomatic_complexity"] for f in functions]
+    return {
+        "lines_of_code": total,
+        "source_lines_of_code": sloc,
+        "comment_lines": comments,
+        "blank_lines": blank,
+        "comment_ratio": round(comments / (total - blank), 3) if total > blank else 0.0,
+        # The whole module as one control flow graph (functions included)
+        "cyclomatic_complexity": 1 + sum(c - 1 for c in function_complexities) + _complexity(tree.body) - 1,
+        "function_count": len(functions),
+        "average_function_complexity": round(sum(function_complexities) / len(functions), 2) if functions else 0.0,
+        "max_function_complexity": max(function_complexities, default=0),
+        "functions": functions,
+    }
+
+
+def _measure_source(source: bytes, filename: str) -> Tuple[Optional[dict], Optional[str]]:
+    try:
+        return compute_metrics(source, filename), None
+    except (SyntaxError, ValueError, tokenize.TokenError) as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _measure_chunk(file_paths: List[str]) -> List[Tuple[str, str, Optional[dict], Optional[str]]]:
+    """
+    Measure a batch of files (runs in a worker process).
+
+    Returns:
+        (path, content hash, metrics or None, error or None) per file
+    """
+    results = []
+    for path in file_paths:
+        try:
+            with open(path, "rb") as f:
+                source = f.read()
+        except OSError as e:
+            results.append((path, "", None, str(e)))
+            continue
+        metrics, error = _measure_source(source, path)
+        results.append((path, hashlib.sha1(source).hexdigest(), metrics, error))
+    return results
+
+
+def _cached(path: str) -> Optional[Tuple[Optional[dict], Optional[str]]]:
+    """Return the memoized result of a file whose stat did not change."""
+    try:
+        stats = os.stat(path)
+    except OSError:
+        return None
+    with _digests_lock:
+        known = _digests.get(os.path.realpath(path))
+    if known is None or known[:2] != (stats.st_mtime_ns, stats.st_size):
+        return None
+    return _metrics_cache.get(known[2])
+
+
+def _remember(path: str, digest: str, metrics: Optional[dict], error: Optional[str]):
+    if not digest:
+        return
+    try:
+        stats = os.stat(path)
+    except OSError:
+        return
+    with _digests_lock:
+        _digests[os.path.realpath(path)] = (stats.st_mtime_ns, stats.st_size, digest)
+    size = _BASE_RESULT_BYTES + _FUNCTION_RESULT_BYTES * (metrics["function_count"] if metrics else 0)
+    _metrics_cache.put(digest, (metrics, error), size)
+
+
+def measure_files(file_paths: List[str]) -> Dict[str, Tuple[Optional[dict], Optional[str]]]:
+    """
+    Measure files, reusing results memoized for unchanged content.
+
+    Args:
+        file_paths: The Python files to measure
+
+    Returns:
+        path -> (metrics or None, error or None)
+    """
+    results: Dict[str, Tuple[Optional[dict], Optional[str]]] = {}
+    pending = []
+    for path in file_paths:
+        cached = _cached(path)
+        if cached is not None:
+            results[path] = cached
+        else:
+            pending.append(path)
+
+    # A touched file whose content is unchanged is re-read but not re-parsed
+    to_measure = []
+    for path in pending:
+        try:
+            with open(path, "rb") as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            to_measure.append(path)
+            continue
+        cached = _metrics_cache.get(digest)
+        if cached is not None:
+            _remember(path, digest, *cached)
+            results[path] = cached
+        else:
+            to_measure.append(path)
+
+    for path, digest, metrics, error in _measure(to_measure):
+        _remember(path, digest, metrics, error)
+        results[path] = (metrics, error)
+    return results
+
+
+def _measure(file_paths: List[str]) -> List[Tuple[str, str, Optional[dict], Optional[str]]]:
+    """Measure files, fanning out to the worker pool for large batches."""
+    pool = get_process_pool() if len(file_paths) >= PARALLEL_MIN_FILES else None
+    if pool is None:
+        return _measure_chunk(file_paths)
+    futures = [
+        pool.submit(_measure_chunk, file_paths[i:i + CHUNK_SIZE])
+        for i in range(0, len(file_paths), CHUNK_SIZE)
+    ]
+    results = []
+    try:
+        for future in futures:
+            results.extend(future.result())
+    except BrokenExecutor:
+        reset_process_pool()
+        raise
+    return results
@@ -6,6 +6,9 @@ This module provides tools for planning software features and components.
 
 from google.adk.tools import ToolContext
 
+from coding_assistant.tools.instrumentation import instrumented
+
+@instrumented
 def create_task_list(feature_description: str, tool_context: ToolContext) -> dict:
     """
     Create a task list for implementing a feature based on the user's description.
@@ -0,0 +1,199 @@
+"""
+Token budget for tool responses of the Coding Assistant.
+
+Listings, searches and file reads can return far more text than a model turn
+should carry. response_budget() builds an after-tool callback that estimates
+the tokens of every tool response and, when a response is over the agent's
+budget, returns the part that fits together with a continuation cursor. The
+rest is kept in memory and handed out page by page through get_more_results,
+whose responses are budgeted the same way.
+"""
+
+import os
+import secrets
+from typing import Any, Optional, Tuple
+
+from google.adk.tools import BaseTool, ToolContext
+
+from coding_assistant.shared_libraries.cache import ByteLRUCache
+from coding_assistant.shared_libraries.text import CHARS_PER_TOKEN, estimate_tokens, json_size
+from coding_assistant.tools.instrumentation import instrumented
+
+BUDGET_ENV = "CODING_ASSISTANT_RESPONSE_TOKENS"
+
+# Default token budget of a single tool response
+DEFAULT_MAX_TOKENS = int(os.environ.get(BUDGET_ENV, 8000))
+# Fields up to this size (ids, paths, counts) are repeated on every page
+CONTEXT_FIELD_CHARS = 200
+# Never split a value into a piece smaller than this, so every page makes progress
+MIN_SPLIT_CHARS = 512
+# Room kept for the cursor fields added to a truncated response
+NOTICE_CHARS = 400
+
+# Unread remainders of truncated responses, by cursor
+_pages = ByteLRUCache(32 * 1024 * 1024)
+
+
+def _split_text(text: str, budget: int) -> Tuple[str, Optional[str]]:
+    cut = max(budget, MIN_SPLIT_CHARS)
+    if cut >= len(text):
+        return text, None
+    # Prefer to end the page on a line boundary
+    newline = text.rfind("\n", 0, cut)
+    if newline >= cut // 2:
+        cut = newline + 1
+    return text[:cut], text[cut:]
+
+
+def _split_list(items: list, budget: int) -> Tuple[list, Optional[list]]:
+    head = []
+    used = 2
+    for i, item in enumerate(items):
+        size = json_size(item) + 1
+        if used + size <= budget:
+            head.append(item)
+            used += size
+            continue
+        remaining = budget - used
+        if head and remaining < MIN_SPLIT_CHARS:
+            return head, items[i:]
+        item_head, item_rest = _split(item, max(remaining, MIN_SPLIT_CHARS))
+        head.append(item_head)
+        rest = ([item_rest] if item_rest is not None else []) + items[i + 1:]
+        return head, rest or None
+    return head, None
+
+
+def _split_dict(fields: dict, budget: int) -> Tuple[dict, Optional[dict]]:
+    # Small fields identify the response, so both parts keep them
+    small = {key for key, value in fields.items() if json_size(value) <= CONTEXT_FIELD_CHARS}
+    used = json_size({key: fields[key] for key in small})
+    head, rest = {}, {}
+    split = False
+    for key, value in fields.items():
+        if key in small:
+            head[key] = rest[key] = value
+        elif split:
+            rest[key] = value
+        else:
+            size = json_size(key) + 1 + json_size(value) + 1
+            if used + size <= budget:
+                head[key] = value
+                used += size
+                continue
+            value_head, value_rest = _split(value, max(budget - used - json_size(key) - 2, MIN_SPLIT_CHARS))
+            head[key] = value_head
+            if value_rest is not None:
+                rest[key] = value_rest
+            # Everything after the split field is left for later pages
+            split = True
+    if len(rest) == len(small):
+        return head, None
+    return head, rest
+
+
+def _split(value: Any, budget: int) -> Tuple[Any, Any]:
+    """
+    Split a JSON-like value into a part of at most about budget characters and the rest.
+
+    Strings are cut (on a line boundary when possible), lists keep their leading
+    items and dicts their leading fields; a value that does not fit is split
+    recursively, so e.g. one file with thousands of grep matches still pages.
+
+    Returns:
+        The leading part and the remainder (None when everything fit)
+    """
+    if json_size(value) <= budget:
+        return value, None
+    if isinstance(value, str):
+        return _split_text(value, budget)
+    if isinstance(value, list):
+        return _split_list(value, budget)
+    if isinstance(value, dict):
+        return _split_dict(value, budget)
+    return value, None
+
+
+def store_page(value: Any, cursor: Optional[str] = None, size: Optional[int] = None) -> str:
+    """
+    Keep a value in memory so get_more_results can hand it out later.
+
+    Args:
+        value: The JSON-like value to keep
+        cursor: The key to store it under (a random cursor if empty)
+        size: The json_size of the value, when the caller already knows it
+
+    Returns:
+        str: The cursor to pass to get_more_results
+    """
+    cursor = cursor or secrets.token_urlsafe(12)
+    _pages.put(cursor, value, json_size(value) if size is None else size)
+    return cursor
+
+
+def _truncate(response: dict, max_tokens: int) -> Optional[dict]:
+    """Return the first page of an over-budget response, or None if it fits."""
+    budget = max_tokens * CHARS_PER_TOKEN
+    if json_size(response) <= budget:
+        return None
+    head, rest = _split(response, max(budget - NOTICE_CHARS, MIN_SPLIT_CHARS))
+    if rest is None:
+        return None
+    cursor = store_page(rest)
+    page = dict(head)
+    page["next_cursor"] = cursor
+    page["remaining_tokens"] = estimate_tokens(rest)
+    page["budget_message"] = (
+        f"Response truncated to about {max_tokens} tokens. Call get_more_results with "
+        f"next_cursor for the rest, or narrow the request."
+    )
+    return page
+
+
+def response_budget(scale: float = 1.0, max_tokens: Optional[int] = None):
+    """
+    Build an after-tool callback that keeps tool responses within a token budget.
+
+    Args:
+        scale: Budget relative to DEFAULT_MAX_TOKENS (CODING_ASSISTANT_RESPONSE_TOKENS),
+            for agents that need smaller or larger responses than the default
+        max_tokens: Fixed budget of a single tool response in (estimated) tokens,
+            overriding the scaled default
+
+    Returns:
+        A callback for the after_tool_callback of an agent
+    """
+    if max_tokens is None:
+        max_tokens = max(1, int(DEFAULT_MAX_TOKENS * scale))
+
+    def limit_response(tool: BaseTool, args: dict, tool_context: ToolContext, tool_response: Any) -> Optional[dict]:
+        if not isinstance(tool_response, dict):
+            return None
+        return _truncate(tool_response, max_tokens)
+
+    return limit_response
+
+
+@instrumented
+def get_more_results(cursor: str, tool_context: ToolContext) -> dict:
+    """
+    Continue a tool response that was truncated to fit the response budget.
+    Pass the next_cursor of the truncated response; the result has the same
+    fields as the original response, holding the entries that were left out,
+    and carries its own next_cursor while more remains. The content_ref of
+    compacted older output works the same way and returns that output again.
+
+    Args:
+        cursor: The next_cursor value of the truncated response, or a content_ref
+        tool_context: The tool context
+
+    Returns:
+        A dictionary with the next part of the response
+    """
+    rest = _pages.get(cursor)
+    if rest is None:
+        return {
+            "success": False,
+            "error": "Unknown or expired cursor; repeat the original call, ideally with a narrower request"
+        }
+    return rest
@@ -6,6 +6,9 @@ This module provides tools for reviewing code quality and identifying improvemen
 
 from google.adk.tools import ToolContext
 
+from coding_assistant.tools.instrumentation import instrumented
+
+@instrumented
 def check_best_practices(file_path: str, language: str, tool_context: ToolContext) -> dict:
     """
     Check if code follows best practices for a language.
@@ -46,6 +49,7 @@ def check_best_practices(file_path: str, language: str, tool_context: ToolContex
     except Exception as e:
         return {"error": str(e)}
 
+@instrumented
 def security_scan(file_path: str, tool_context: ToolContext) -> dict:
     """
     Scan a file for security vulnerabilities.
@@ -0,0 +1,343 @@
+"""
+Trigram search index for the Coding Assistant.
+
+This module keeps a persistent trigram index per project root so that grep_files
+only has to open files that can possibly contain a match. The index is refreshed
+incrementally using file mtime and size (taken from the project file catalog when
+one is available), so repeated searches over an unchanged tree are near-instant.
+"""
+
+import hashlib
+import os
+import pickle
+import re
+import threading
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+try:
+    # Python 3.11+
+    import re._parser as _sre_parse
+except ImportError:
+    import sre_parse as _sre_parse
+
+from coding_assistant.shared_libraries.cache import get_cache_dir
+from coding_assistant.tools.catalog import get_catalog
+from coding_assistant.tools.walker import iter_files
+
+INDEX_ENV = "CODING_ASSISTANT_GREP_INDEX"
+INDEX_VERSION = 2
+
+# Files larger than this are not indexed and are always treated as candidates
+MAX_INDEXED_FILE_SIZE = 4 * 1024 * 1024
+
+# Upper bound on the number of OR-alternatives a query may expand into
+MAX_QUERY_ALTERNATIVES = 64
+
+_LITERAL = _sre_parse.LITERAL
+_SUBPATTERN = _sre_parse.SUBPATTERN
+_BRANCH = _sre_parse.BRANCH
+_REPEATS = tuple(
+    op for op in (
+        _sre_parse.MAX_REPEAT,
+        _sre_parse.MIN_REPEAT,
+        getattr(_sre_parse, "POSSESSIVE_REPEAT", None),
+    ) if op is not None
+)
+_ATOMIC_GROUP = getattr(_sre_parse, "ATOMIC_GROUP", None)
+
+# Characters whose Unicode case folding reaches outside ASCII (e.g. KELVIN SIGN)
+_UNICODE_FOLD_CHARS = frozenset("kKsS")
+
+
+def index_enabled() -> bool:
+    """Return True unless the index was disabled via CODING_ASSISTANT_GREP_INDEX=0."""
+    return os.environ.get(INDEX_ENV, "1").lower() not in ("0", "false", "no", "off")
+
+
+def trigrams(data: bytes) -> Set[bytes]:
+    """
+    Return the set of case-folded (ASCII) trigrams contained in a buffer.
+
+    Args:
+        data: Raw file or literal bytes
+
+    Returns:
+        The set of 3-byte substrings of the lower-cased buffer
+    """
+    data = data.lower()
+    return {data[i:i + 3] for i in range(len(data) - 2)}
+
+
+def _and(left: List[Set[bytes]], right: List[Set[bytes]]) -> List[Set[bytes]]:
+    """Combine two OR-of-AND literal sets, bounding the expansion."""
+    if len(left) * len(right) > MAX_QUERY_ALTERNATIVES:
+        # Dropping constraints keeps the candidate set a superset of the matches
+        return left if len(left) <= len(right) else right
+    return [a | b for a in left for b in right]
+
+
+def _literal_runs(parsed, is_bytes: bool, ignore_case: bool) -> List[Set[bytes]]:
+    """Collect the literal runs every match of a parsed pattern must contain."""
+    alternatives: List[Set[bytes]] = [set()]
+    run: List[int] = []
+
+    def flush():
+        nonlocal alternatives
+        if run:
+            text = bytes(run) if is_bytes else "".join(map(chr, run)).encode("utf-8")
+            alternatives = [alt | {text} for alt in alternatives]
+            run.clear()
+
+    for op, av in parsed:
+        if op is _LITERAL:
+            if ignore_case and (av > 127 or (not is_bytes and chr(av) in _UNICODE_FOLD_CHARS)):
+                flush()
+            else:
+                run.append(av)
+            continue
+
+        flush()
+        if op is _SUBPATTERN:
+            # A scoped (?i:...) group folds case even when the pattern does not
+            scoped = (ignore_case or bool(av[1] & re.IGNORECASE)) and not av[2] & re.IGNORECASE
+            alternatives = _and(alternatives, _literal_runs(av[-1], is_bytes, scoped))
+        elif op in _REPEATS:
+            low, _, item = av
+            if low >= 1:
+                alternatives = _and(alternatives, _literal_runs(item, is_bytes, ignore_case))
+        elif _ATOMIC_GROUP is not None and op is _ATOMIC_GROUP:
+            alternatives = _and(alternatives, _literal_runs(av, is_bytes, ignore_case))
+        elif op is _BRANCH:
+            branches: List[Set[bytes]] = []
+            for branch in av[1]:
+                branches.extend(_literal_runs(branch, is_bytes, ignore_case))
+            alternatives = _and(alternatives, branches)
+    flush()
+    return alternatives
+
+
+def extract_query(pattern, flags: int = 0) -> Optional[List[FrozenSet[bytes]]]:
+    """
+    Turn a regular expression into a trigram query.
+
+    The query is a list of alternatives; a file is a candidate when it contains
+    every trigram of at least one alternative.
+
+    Args:
+        pattern: The regular expression (str or bytes)
+        flags: The re flags the pattern will be compiled with
+
+    Returns:
+        The list of trigram sets, or None when the pattern cannot be narrowed
+    """
+    is_bytes = isinstance(pattern, bytes)
+    try:
+        parsed = _sre_parse.parse(pattern, flags)
+    except Exception:
+        return None
+
+    state = getattr(parsed, "state", None) or getattr(parsed, "pattern", None)
+    all_flags = flags | getattr(state, "flags", 0)
+    ignore_case = bool(all_flags & re.IGNORECASE)
+
+    query = []
+    for literals in _literal_runs(parsed, is_bytes, ignore_case):
+        grams: Set[bytes] = set()
+        for literal in literals:
+            grams |= trigrams(literal)
+        if not grams:
+            return None
+        query.append(frozenset(grams))
+    return query or None
+
+
+class TrigramIndex:
+    """
+    An on-disk trigram index for the files below a project root.
+    """
+
+    def __init__(self, root: str, index_path: str):
+        self.root = root
+        self.index_path = index_path
+        self.lock = threading.Lock()
+        # relpath -> (mtime_ns, size, trigrams or None when not indexed)
+        self._files: Dict[str, Tuple[int, int, Optional[FrozenSet[bytes]]]] = {}
+        self._postings: Dict[bytes, Set[str]] = {}
+        self._unindexed: Set[str] = set()
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("root") != self.root:
+            return
+        for relpath, entry in data.get("files", {}).items():
+            self._add(relpath, entry)
+
+    def save(self):
+        """Persist the index if it changed since the last save."""
+        if not self._dirty:
+            return
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(
+                    {"version": INDEX_VERSION, "root": self.root, "files": self._files},
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _add(self, relpath: str, entry: Tuple[int, int, Optional[FrozenSet[bytes]]]):
+        self._files[relpath] = entry
+        grams = entry[2]
+        if grams is None:
+            self._unindexed.add(relpath)
+            return
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(relpath)
+
+    def _remove(self, relpath: str):
+        entry = self._files.pop(relpath, None)
+        if entry is None:
+            return
+        grams = entry[2]
+        if grams is None:
+            self._unindexed.discard(relpath)
+            return
+        for gram in grams:
+            paths = self._postings.get(gram)
+            if paths is not None:
+                paths.discard(relpath)
+                if not paths:
+                    del self._postings[gram]
+
+    def _index_file(self, relpath: str, mtime_ns: int, size: int):
+        grams: Optional[FrozenSet[bytes]] = None
+        if size <= MAX_INDEXED_FILE_SIZE:
+            try:
+                with open(os.path.join(self.root, relpath), "rb") as f:
+                    grams = frozenset(trigrams(f.read()))
+            except OSError:
+                grams = None
+        self._add(relpath, (mtime_ns, size, grams))
+
+    def update(self, files: Iterable[Tuple[str, int, int]]):
+        """
+        Bring the index in line with the current state of the tree.
+
+        Args:
+            files: (relpath, mtime_ns, size) for every file below the root
+        """
+        seen = set()
+        for relpath, mtime_ns, size in files:
+            seen.add(relpath)
+            entry = self._files.get(relpath)
+            if entry is not None and entry[0] == mtime_ns and entry[1] == size:
+                continue
+            self._remove(relpath)
+            self._index_file(relpath, mtime_ns, size)
+            self._dirty = True
+
+        for relpath in [p for p in self._files if p not in seen]:
+            self._remove(relpath)
+            self._dirty = True
+
+    def refresh(self):
+        """Re-index files whose mtime or size changed, using the project catalog when available."""
+        catalog = get_catalog(self.root)
+        if catalog is not None and catalog.root == self.root:
+            self.update(catalog.file_stats())
+        else:
+            self.update(_stat_tree(self.root))
+
+    def candidates(self, query: List[FrozenSet[bytes]]) -> Set[str]:
+        """
+        Return the relative paths of files that may match a query.
+
+        Args:
+            query: A query produced by extract_query
+
+        Returns:
+            The set of candidate relative paths
+        """
+        result = set(self._unindexed)
+        for grams in query:
+            postings = sorted((self._postings.get(g, set()) for g in grams), key=len)
+            if not postings or not postings[0]:
+                continue
+            matches = set(postings[0])
+            for paths in postings[1:]:
+                matches &= paths
+                if not matches:
+                    break
+            result |= matches
+        return result
+
+
+def _stat_tree(root: str) -> Iterable[Tuple[str, int, int]]:
+    """Yield (relpath, mtime_ns, size) for every file below root the walker does not prune."""
+    for item in iter_files(root):
+        try:
+            stats = item.stat()
+        except OSError:
+            continue
+        yield item.relpath, stats.st_mtime_ns, stats.st_size
+
+
+_indexes: Dict[str, TrigramIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(root: str) -> TrigramIndex:
+    """
+    Return the (process-wide) trigram index for a project root.
+
+    Args:
+        root: The project root directory
+
+    Returns:
+        The TrigramIndex, loaded from disk when a saved copy exists
+    """
+    root = os.path.realpath(root)
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            digest = hashlib.sha1(root.encode("utf-8")).hexdigest()
+            index_path = os.path.join(get_cache_dir("trigram"), f"{digest}.pickle")
+            index = TrigramIndex(root, index_path)
+            _indexes[root] = index
+        return index
+
+
+def find_candidates(root: str, pattern, flags: int = 0) -> Optional[Set[str]]:
+    """
+    Narrow the files below root that can contain a match for a pattern.
+
+    Args:
+        root: The project root directory
+        pattern: The regular expression that will be verified afterwards
+        flags: The re flags the pattern will be compiled with
+
+    Returns:
+        Absolute paths of candidate files, or None when the index cannot help
+    """
+    query = extract_query(pattern, flags)
+    if query is None:
+        return None
+    root = os.path.abspath(root)
+    index = get_index(root)
+    with index.lock:
+        index.refresh()
+        index.save()
+        return {os.path.join(root, p) for p in index.candidates(query)}
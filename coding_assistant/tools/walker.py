@@ -0,0 +1,370 @@
+"""
+Directory walker for the Coding Assistant.
+
+This module provides the single pruning policy used by the filesystem and grep
+tools: default-excluded directories (VCS metadata, dependency and build output),
+.gitignore/.ignore rules, and depth and entry limits. Traversal uses os.scandir
+so the stat information of each DirEntry is fetched at most once.
+"""
+
+import functools
+import os
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+EXCLUDES_ENV = "CODING_ASSISTANT_EXCLUDE_DIRS"
+
+# Directories that are never worth descending into
+DEFAULT_EXCLUDES = frozenset({
+    ".git", ".hg", ".svn",
+    "node_modules", "bower_components",
+    "venv", ".venv", "env", ".env", "__pycache__",
+    ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache",
+    "build", "dist", "target", "out", ".gradle", ".idea",
+})
+
+IGNORE_FILES = (".gitignore", ".ignore")
+
+
+def default_excludes() -> frozenset:
+    """
+    Return the directory names excluded from every walk.
+
+    CODING_ASSISTANT_EXCLUDE_DIRS (comma-separated) replaces the built-in set.
+    """
+    configured = os.environ.get(EXCLUDES_ENV)
+    if configured is None:
+        return DEFAULT_EXCLUDES
+    return frozenset(name.strip() for name in configured.split(",") if name.strip())
+
+
+class _IgnoreRule(NamedTuple):
+    regex: "re.Pattern[str]"
+    negate: bool
+    dir_only: bool
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore glob into a regular expression over '/'-separated paths."""
+    i, n = 0, len(pattern)
+    result = []
+    while i < n:
+        if pattern.startswith("**/", i):
+            result.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            result.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            result.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            result.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            result.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 2)
+            if end < 0:
+                result.append(re.escape("["))
+                i += 1
+                continue
+            body = pattern[i + 1:end]
+            if body[0] in "!^":
+                body = "^" + body[1:]
+            result.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < n:
+            result.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            result.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(result)
+
+
+def compile_glob(pattern: str) -> "re.Pattern[str]":
+    """
+    Compile a path glob where '*' stays within one directory and '**' spans any number.
+
+    Args:
+        pattern: The glob, e.g. 'src/**/*.py'
+
+    Returns:
+        A regex matching whole '/'-separated paths
+    """
+    return re.compile(f"^{_translate(pattern)}$", re.DOTALL)
+
+
+def parse_ignore_lines(lines: Iterable[str]) -> List[_IgnoreRule]:
+    """
+    Parse the lines of a .gitignore-style file.
+
+    Args:
+        lines: The lines of the file
+
+    Returns:
+        The rules in file order
+    """
+    rules = []
+    for line in lines:
+        line = line.rstrip("\n").rstrip("\r")
+        if not line.endswith("\\ "):
+            line = line.rstrip(" ")
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        anchored = "/" in line
+        line = line.lstrip("/")
+        prefix = "" if anchored else "(?:.*/)?"
+        try:
+            regex = re.compile(f"^{prefix}{_translate(line)}$", re.DOTALL)
+        except re.error:
+            continue
+        rules.append(_IgnoreRule(regex, negate, dir_only))
+    return rules
+
+
+@functools.lru_cache(maxsize=1024)
+def _load_ignore_file(path: str, mtime_ns: int) -> Tuple[_IgnoreRule, ...]:
+    """Parse an ignore file, memoized on its path and mtime."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return tuple(parse_ignore_lines(f))
+    except OSError:
+        return ()
+
+
+def _ignore_rules_in(directory: str) -> Tuple[_IgnoreRule, ...]:
+    """Return the rules of every ignore file found directly in a directory."""
+    rules: Tuple[_IgnoreRule, ...] = ()
+    for name in IGNORE_FILES:
+        path = os.path.join(directory, name)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        rules += _load_ignore_file(path, mtime_ns)
+    return rules
+
+
+class _IgnoreScope(NamedTuple):
+    """Ignore rules declared in one directory."""
+    # Directory of the ignore file relative to the walk root ("" for root and ancestors)
+    base: str
+    # Walk root relative to an ancestor's ignore file ("" for files inside the walk)
+    prefix: str
+    rules: Tuple[_IgnoreRule, ...]
+
+
+def _is_ignored(scopes: List[_IgnoreScope], relpath: str, is_dir: bool) -> bool:
+    """Apply gitignore precedence: the deepest file and the last matching rule win."""
+    for scope in reversed(scopes):
+        if scope.base:
+            if not relpath.startswith(scope.base + "/"):
+                continue
+            local = relpath[len(scope.base) + 1:]
+        else:
+            local = relpath
+        if scope.prefix:
+            local = f"{scope.prefix}/{local}"
+        for rule in reversed(scope.rules):
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.regex.match(local):
+                return not rule.negate
+    return False
+
+
+def _ancestor_scopes(root: str, ignore_root: Optional[str] = None) -> List[_IgnoreScope]:
+    """
+    Collect ignore rules from the directories between the enclosing repository
+    top level (or ignore_root outside a repository) and root (exclusive).
+    """
+    ancestors = []
+    current = root
+    while not os.path.exists(os.path.join(current, ".git")):
+        parent = os.path.dirname(current)
+        if parent == current:
+            if ignore_root is None:
+                # Not inside a repository: only the walked tree's own files apply
+                return []
+            ancestors = _directories_between(root, ignore_root)
+            break
+        current = parent
+        ancestors.append(current)
+
+    scopes = []
+    for directory in reversed(ancestors):
+        rules = _ignore_rules_in(directory)
+        if rules:
+            prefix = os.path.relpath(root, directory).replace(os.sep, "/")
+            scopes.append(_IgnoreScope("", prefix, rules))
+    return scopes
+
+
+def _directories_between(root: str, top: str) -> List[str]:
+    """Return the ancestors of root up to and including top, nearest first."""
+    ancestors = []
+    current = root
+    while current != top:
+        parent = os.path.dirname(current)
+        if parent == current:
+            return []
+        current = parent
+        ancestors.append(current)
+    return ancestors
+
+
+class WalkEntry(NamedTuple):
+    """A file or directory produced by TreeWalker."""
+    path: str
+    relpath: str
+    name: str
+    is_dir: bool
+    depth: int
+    entry: os.DirEntry
+
+    def stat(self) -> os.stat_result:
+        """Return the (cached) stat result of the entry."""
+        try:
+            return self.entry.stat()
+        except OSError:
+            return self.entry.stat(follow_symlinks=False)
+
+
+class TreeWalker:
+    """
+    Walk a directory tree in sorted order, applying the shared pruning policy.
+
+    Iterate over the walker to receive WalkEntry items; after iteration the
+    truncated attribute tells whether max_entries cut the walk short.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_depth: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        excludes: Optional[Iterable[str]] = None,
+        respect_ignore_files: bool = True,
+        ignore_root: Optional[str] = None,
+    ):
+        """
+        Args:
+            root: The directory to walk
+            max_depth: Deepest level to report (1 = direct children only)
+            max_entries: Stop after reporting this many entries
+            excludes: Directory names to prune (defaults to default_excludes())
+            respect_ignore_files: Honour .gitignore and .ignore files
+            ignore_root: Outside a git repository, the top directory whose ignore
+                files still apply when walking one of its subdirectories
+        """
+        self.root = root
+        self.max_depth = max_depth if max_depth and max_depth > 0 else None
+        self.max_entries = max_entries if max_entries and max_entries > 0 else None
+        self.excludes = frozenset(excludes) if excludes is not None else default_excludes()
+        self.respect_ignore_files = respect_ignore_files
+        self.ignore_root = os.path.abspath(ignore_root) if ignore_root else None
+        self.truncated = False
+
+    def __iter__(self) -> Iterator[WalkEntry]:
+        self.truncated = False
+        scopes = _ancestor_scopes(os.path.abspath(self.root), self.ignore_root) if self.respect_ignore_files else []
+        count = 0
+        # Stack of (directory path, relpath, depth, ignore scopes in effect)
+        stack = [(self.root, "", 1, scopes)]
+        while stack:
+            directory, dir_relpath, depth, scopes = stack.pop()
+            if self.respect_ignore_files:
+                rules = _ignore_rules_in(directory)
+                if rules:
+                    scopes = scopes + [_IgnoreScope(dir_relpath, "", rules)]
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+
+            subdirs = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir and entry.name in self.excludes:
+                    continue
+                relpath = f"{dir_relpath}/{entry.name}" if dir_relpath else entry.name
+                if scopes and _is_ignored(scopes, relpath, is_dir):
+                    continue
+                if self.max_entries is not None and count >= self.max_entries:
+                    self.truncated = True
+                    return
+                count += 1
+                yield WalkEntry(entry.path, relpath, entry.name, is_dir, depth, entry)
+                if is_dir and not entry.is_symlink() and (self.max_depth is None or depth < self.max_depth):
+                    subdirs.append((entry.path, relpath, depth + 1, scopes))
+            # Reverse so that the stack pops subdirectories in sorted order
+            stack.extend(reversed(subdirs))
+
+
+def iter_files(root: str, **kwargs) -> Iterator[WalkEntry]:
+    """
+    Yield only the files of a walk.
+
+    Args:
+        root: The directory to walk
+        **kwargs: Options forwarded to TreeWalker
+
+    Returns:
+        An iterator of file entries in sorted order
+    """
+    for item in TreeWalker(root, **kwargs):
+        if not item.is_dir:
+            yield item
+
+
+def walk_reaches(root: str, directory: str) -> bool:
+    """
+    Tell whether a default walk of root descends into a directory.
+
+    Args:
+        root: The walk root
+        directory: A directory at or below root
+
+    Returns:
+        False when the directory lies outside root, or when an excluded, ignored
+        or symlinked directory on the way prunes it from the walk
+    """
+    root = os.path.abspath(root)
+    relpath = os.path.relpath(os.path.abspath(directory), root)
+    if relpath == os.curdir:
+        return True
+    if relpath == os.pardir or relpath.startswith(os.pardir + os.sep):
+        return False
+
+    excludes = default_excludes()
+    scopes = _ancestor_scopes(root)
+    current, dir_relpath = root, ""
+    for name in relpath.split(os.sep):
+        rules = _ignore_rules_in(current)
+        if rules:
+            scopes = scopes + [_IgnoreScope(dir_relpath, "", rules)]
+        if name in excludes:
+            return False
+        dir_relpath = f"{dir_relpath}/{name}" if dir_relpath else name
+        if scopes and _is_ignored(scopes, dir_relpath, True):
+            return False
+        current = os.path.join(current, name)
+        if os.path.islink(current):
+            return False
+    return True
@@ -0,0 +1,19 @@
+"""
+Shared fixtures for the Coding Assistant tests.
+"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path_factory, monkeypatch):
+    """Keep on-disk caches (trigram index, GitHub responses, ...) out of the user's cache."""
+    path = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("CODING_ASSISTANT_CACHE_DIR", str(path))
+    return path
+
+
+@pytest.fixture
+def serial(monkeypatch):
+    """Run the tools without the worker process pool."""
+    monkeypatch.setenv("CODING_ASSISTANT_WORKERS", "1")
@@ -0,0 +1,63 @@
+"""
+Tests for the project file catalog and its invalidation.
+"""
+
+import os
+
+import pytest
+
+from coding_assistant.tools.catalog import FileCatalog
+from coding_assistant.tools.walker import iter_files
+
+
+def _listing(catalog: FileCatalog, relpath: str = "") -> dict:
+    return {record.relpath: (record.type, record.size) for record in catalog.iter_tree(relpath)}
+
+
+def _walked(root) -> set:
+    return {item.relpath for item in iter_files(str(root))}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / ".env").write_text("A=1\n")
+    (tmp_path / "sub" / "main.py").write_text("print()\n")
+    catalog = FileCatalog(str(tmp_path))
+    catalog.build()
+    return catalog
+
+
+@pytest.mark.parametrize("name", [".env", "env", "build", "dist", "out", "target"])
+def test_files_named_like_excluded_directories_are_updated(tmp_path, catalog, name):
+    path = tmp_path / "sub" / name
+    path.write_text("CHANGED=1\nMORE=2\n")
+    catalog.mark_changed(str(path))
+    assert _listing(catalog, "sub")[f"sub/{name}"] == ("file", path.stat().st_size)
+
+
+def test_changes_inside_excluded_directories_are_ignored(tmp_path, catalog):
+    (tmp_path / "sub" / "build").mkdir()
+    (tmp_path / "sub" / "build" / "out.o").write_text("x")
+    catalog.mark_changed(str(tmp_path / "sub" / "build" / "out.o"))
+    catalog.mark_changed(str(tmp_path / "sub" / "build"))
+    assert "sub/build" not in _listing(catalog)
+    assert "sub/build/out.o" not in _listing(catalog)
+
+
+def test_catalog_matches_walk_after_changes(tmp_path, catalog):
+    (tmp_path / "sub" / "main.py").unlink()
+    (tmp_path / "new").mkdir()
+    (tmp_path / "new" / "mod.py").write_text("x = 1\n")
+    for path in ("sub/main.py", "new"):
+        catalog.mark_changed(os.path.join(str(tmp_path), path))
+    files = {relpath for relpath, (kind, _) in _listing(catalog).items() if kind == "file"}
+    assert files == _walked(tmp_path)
+
+
+def test_directories_created_with_their_parents_are_catalogued(tmp_path, catalog):
+    nested = tmp_path / "a" / "b" / "c"
+    nested.mkdir(parents=True)
+    (nested / "mod.py").write_text("x = 1\n")
+    catalog.mark_changed(str(nested / "mod.py"))
+    assert _listing(catalog)["a/b/c/mod.py"][0] == "file"
@@ -0,0 +1,50 @@
+"""
+Tests for read_file line and byte ranges.
+"""
+
+import pytest
+
+from coding_assistant.tools import filesystem
+from coding_assistant.tools.filesystem import read_file
+
+LINES = [f"line {i} é\n" for i in range(1, 501)]
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    path = tmp_path / "big.txt"
+    path.write_text("".join(LINES), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("start, end", [(1, 1), (10, 20), (495, 0), (0, 3), (499, 900)])
+def test_line_ranges(text_file, start, end):
+    result = read_file(text_file, start_line=start, end_line=end)
+    first = max(1, start)
+    last = min(end or len(LINES), len(LINES))
+    assert result["content"] == "".join(LINES[first - 1:last])
+    assert (result["start_line"], result["end_line"], result["total_lines"]) == (first, last, len(LINES))
+
+
+def test_byte_range(text_file):
+    data = "".join(LINES).encode("utf-8")
+    result = read_file(text_file, byte_offset=100, byte_length=50)
+    assert result["content"].encode("utf-8") == data[100:150]
+    assert result["truncated"] is True
+    assert read_file(text_file, byte_offset=len(data) - 10, byte_length=50)["truncated"] is False
+
+
+def test_large_file_preview(text_file, monkeypatch):
+    monkeypatch.setattr(filesystem, "MAX_FULL_READ_BYTES", 1024)
+    monkeypatch.setattr(filesystem, "PREVIEW_LINES", 5)
+    result = read_file(text_file)
+    assert result["truncated"] is True
+    assert result["head"] == "".join(LINES[:5])
+    assert result["tail"] == "".join(LINES[-5:])
+
+
+def test_whole_file_reads_see_changes(text_file):
+    assert read_file(text_file)["content"] == "".join(LINES)
+    with open(text_file, "a", encoding="utf-8") as f:
+        f.write("appended\n")
+    assert read_file(text_file)["content"].endswith("appended\n")
@@ -0,0 +1,55 @@
+"""
+Tests for the on-disk GitHub response cache.
+"""
+
+import json
+import os
+
+from coding_assistant.shared_libraries.cache import get_cache_dir
+from coding_assistant.tools import github_cache
+from coding_assistant.tools.github_cache import get_json
+
+
+class _Requester:
+    def __init__(self):
+        self.calls = []
+
+    def requestJson(self, verb, url, parameters, headers):
+        self.calls.append((url, headers))
+        if "If-None-Match" in headers:
+            return 304, {}, ""
+        return 200, {"etag": f'"{url}"'}, json.dumps({"url": url, "body": "x" * 1000})
+
+
+class _Client:
+    def __init__(self):
+        self.requester = _Requester()
+
+
+def _cached_bytes() -> int:
+    root = get_cache_dir("github")
+    return sum(entry.stat().st_size for shard in os.scandir(root) for entry in os.scandir(shard.path))
+
+
+def test_least_recently_used_responses_are_evicted(monkeypatch):
+    monkeypatch.setattr(github_cache, "MAX_CACHE_BYTES", 3500)
+    client = _Client()
+    for name in ("a", "b", "c"):
+        get_json(client, "token", f"/repos/o/{name}")
+    # Revalidating a keeps it recent, so d evicts b
+    get_json(client, "token", "/repos/o/a")
+    get_json(client, "token", "/repos/o/d")
+    assert _cached_bytes() <= 3500
+
+    cached = {name for name in "abcd" if os.path.exists(github_cache._cache_path("token", f"/repos/o/{name}", None, ""))}
+    assert cached == {"a", "c", "d"}
+
+    client.requester.calls.clear()
+    get_json(client, "token", "/repos/o/c")
+    assert client.requester.calls[0][1] == {"If-None-Match": '"/repos/o/c"'}
+
+def test_responses_over_the_budget_are_not_stored(monkeypatch):
+    monkeypatch.setattr(github_cache, "MAX_CACHE_BYTES", 500)
+    client = _Client()
+    get_json(client, "token", "/repos/o/a")
+    assert _cached_bytes() == 0
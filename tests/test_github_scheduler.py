@@ -0,0 +1,61 @@
+"""
+Tests for the GitHub request scheduler.
+"""
+
+import threading
+import time
+
+import pytest
+
+from coding_assistant.tools import github_scheduler
+from coding_assistant.tools.github_scheduler import RateLimitError, RequestScheduler
+
+OK = (200, {}, "{}")
+
+
+def _exhausted(resource: str, reset_in: float) -> dict:
+    return {
+        "x-ratelimit-limit": "30",
+        "x-ratelimit-remaining": "0",
+        "x-ratelimit-reset": str(time.time() + reset_in),
+        "x-ratelimit-resource": resource,
+    }
+
+
+def test_exhausted_resource_does_not_block_others(monkeypatch):
+    monkeypatch.setattr(github_scheduler, "MAX_WAIT_SECONDS", 30)
+    scheduler = RequestScheduler(max_concurrent=2)
+    scheduler.request(lambda: (200, _exhausted("search", 1.0), "{}"), "https://api.github.com/search/code")
+
+    waiter = threading.Thread(target=scheduler.request, args=(lambda: OK, "https://api.github.com/search/code"))
+    waiter.start()
+    started = time.monotonic()
+    assert scheduler.request(lambda: OK, "https://api.github.com/repos/o/r") == OK
+    assert time.monotonic() - started < 0.5
+    waiter.join()
+    assert scheduler.stats()["requests"] == 3
+
+
+def test_server_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(github_scheduler, "BACKOFF_BASE_SECONDS", 0.001)
+    responses = iter([(502, {}, ""), (503, {}, ""), OK])
+    scheduler = RequestScheduler()
+    assert scheduler.request(lambda: next(responses), "https://api.github.com/repos/o/r") == OK
+    assert scheduler.stats()["retries"] == 2
+
+
+def test_permission_errors_are_not_retried():
+    scheduler = RequestScheduler()
+    denied = (403, {}, '{"message": "Resource not accessible by integration"}')
+    assert scheduler.request(lambda: denied, "https://api.github.com/repos/o/r") == denied
+    assert scheduler.stats()["retries"] == 0
+
+
+def test_long_waits_fail_fast(monkeypatch):
+    monkeypatch.setattr(github_scheduler, "MAX_WAIT_SECONDS", 5)
+    scheduler = RequestScheduler()
+    scheduler.request(lambda: (200, _exhausted("core", 3600), "{}"), "https://api.github.com/repos/o/r")
+    with pytest.raises(RateLimitError):
+        scheduler.request(lambda: OK, "https://api.github.com/repos/o/r")
+    # Other resources are still served
+    assert scheduler.request(lambda: OK, "https://api.github.com/search/code") == OK
@@ -0,0 +1,59 @@
+"""
+Tests for grep_files: line endings, non-ASCII text and truncation.
+"""
+
+import pytest
+
+from coding_assistant.tools.grep import grep_files
+
+
+def _matches(directory, pattern, **kwargs) -> list:
+    result = grep_files(str(directory), pattern, **kwargs)
+    assert result["success"], result
+    return [(match["line_number"], match["match"]) for entry in result["file_matches"] for match in entry["matches"]]
+
+
+@pytest.mark.parametrize("newline", ["\r\n", "\r", "\n"])
+def test_anchors_match_any_line_ending(tmp_path, newline):
+    (tmp_path / "a.c").write_bytes(newline.join(["int x = 1;", "int y = 2", "int z = 3;", ""]).encode())
+    assert _matches(tmp_path, r";$") == [(1, "int x = 1;"), (3, "int z = 3;")]
+    assert _matches(tmp_path, r"^int y = 2$", context_lines=1) == [(2, "int y = 2")]
+
+
+def test_crlf_context_has_no_carriage_returns(tmp_path):
+    (tmp_path / "a.txt").write_bytes(b"before\r\nhit\r\nafter\r\n")
+    result = grep_files(str(tmp_path), "hit", context_lines=1)
+    match = result["file_matches"][0]["matches"][0]
+    assert match["context"] == {"before": ["before"], "after": ["after"]}
+
+
+@pytest.mark.parametrize("pattern, ignore_case, expected", [
+    ("[é]", False, ["word é"]),
+    ("na.ve", False, ["naïve"]),
+    ("café", True, ["CAFÉ"]),
+    ("straße", False, ["straße"]),
+    (r"word \w$", False, ["word é"]),
+    (r"\bstra", False, ["straße"]),
+    ("k", True, ["K"]),
+    ("é+", False, ["word é"]),
+])
+def test_non_ascii_patterns_use_text_semantics(tmp_path, pattern, ignore_case, expected):
+    (tmp_path / "a.txt").write_text("straße\nnaïve\nCAFÉ\nword é\nK\n", encoding="utf-8")
+    assert [text for _, text in _matches(tmp_path, pattern, ignore_case=ignore_case)] == expected
+
+
+@pytest.mark.parametrize("limits", [{"max_matches": 1}, {"max_matches": 4}, {"max_bytes": 64}])
+def test_truncated_search_resumes_where_it_stopped(tmp_path, limits):
+    for i in range(12):
+        (tmp_path / f"f{i:02d}.txt").write_text("".join(f"token {i} {j}\n" for j in range(i % 4)) + "filler\n")
+    expected = _matches(tmp_path, "token")
+
+    collected, resume = [], {}
+    for _ in range(100):
+        result = grep_files(str(tmp_path), "token", **limits, **resume)
+        collected += [(m["line_number"], m["match"]) for entry in result["file_matches"] for m in entry["matches"]]
+        if not result["truncated"]:
+            break
+        assert result["truncated_by"] in limits
+        resume = {"start_at": result["resume_from"], "start_line": result.get("resume_after_line", 0)}
+    assert collected == expected
@@ -0,0 +1,48 @@
+"""
+Tests for compaction of old conversation history.
+"""
+
+from google.genai import types
+
+from coding_assistant.tools.history_compaction import compact_contents
+from coding_assistant.tools.response_budget import get_more_results
+
+BIG = "".join(f"def function_{i}():\n    return {i}\n" for i in range(300))
+
+
+def _tool_turn(i: int) -> list:
+    return [
+        types.Content(role="model", parts=[types.Part.from_function_call(name="read_file", args={"path": f"f{i}.py"})]),
+        types.Content(role="user", parts=[types.Part.from_function_response(
+            name="read_file", response={"success": True, "path": f"f{i}.py", "content": BIG + str(i)})]),
+    ]
+
+
+def _history(turns: int) -> list:
+    contents = [types.Content(role="user", parts=[types.Part(text="Please refactor this:\n" + BIG)])]
+    for i in range(turns):
+        contents += _tool_turn(i)
+    return contents
+
+
+def test_small_history_is_left_alone():
+    contents = _history(2)
+    assert compact_contents(contents, max_tokens=10 ** 6, keep_recent=1) == 0
+
+
+def test_old_tool_responses_are_compacted_and_retrievable():
+    contents = _history(5)
+    original = [content.parts for content in contents]
+    assert compact_contents(contents, max_tokens=1000, keep_recent=2) == 3
+
+    # The user's own message is never compacted
+    assert contents[0].parts[0].text.endswith(BIG)
+    responses = [content.parts[0].function_response.response for content in contents[2::2]]
+    for i, response in enumerate(responses[:3]):
+        assert response["compacted"] is True
+        assert response["path"] == f"f{i}.py"
+        assert get_more_results(response["content_ref"], tool_context=None)["content"] == BIG + str(i)
+    assert [response["content"] for response in responses[3:]] == [BIG + "3", BIG + "4"]
+
+    # Parts shared with the session events are replaced, not mutated
+    assert original[2][0].function_response.response["content"] == BIG + "0"
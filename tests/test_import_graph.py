@@ -0,0 +1,60 @@
+"""
+Tests for the Python import graph.
+"""
+
+import pytest
+
+from coding_assistant.tools.import_graph import get_import_graph
+
+
+def _write(root, files: dict):
+    for name, source in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source)
+
+
+@pytest.fixture
+def src_layout(tmp_path):
+    _write(tmp_path, {
+        "src/pkg/__init__.py": "",
+        "src/pkg/core.py": "import os\nfrom . import util\n",
+        "src/pkg/util.py": "",
+        "src/pkg/cli.py": "import pkg.core\nfrom pkg.util import helper\n",
+        "tests/test_core.py": "from pkg import core\nimport pytest\n",
+        "setup.py": "import setuptools\n",
+    })
+    return tmp_path
+
+
+def test_src_layout_modules_resolve(src_layout):
+    graph = get_import_graph(str(src_layout))
+    assert sorted(graph.modules) == ["pkg", "pkg.cli", "pkg.core", "pkg.util", "setup", "tests.test_core"]
+    assert graph.edges["pkg.cli"] == {"pkg.core", "pkg.util"}
+    assert graph.external["pkg.cli"] == set()
+    assert graph.edges["pkg.core"] == {"pkg.util"}
+    assert graph.external["pkg.core"] == {"os"}
+    assert graph.edges["tests.test_core"] == {"pkg.core"}
+    assert graph.external["tests.test_core"] == {"pytest"}
+
+
+def test_flat_layout_keeps_root_relative_names(tmp_path):
+    _write(tmp_path, {
+        "app/__init__.py": "",
+        "app/models/__init__.py": "",
+        "app/models/user.py": "from app import settings\n",
+        "app/settings.py": "",
+    })
+    graph = get_import_graph(str(tmp_path))
+    assert sorted(graph.modules) == ["app", "app.models", "app.models.user", "app.settings"]
+    assert graph.edges["app.models.user"] == {"app.settings"}
+
+
+def test_returned_graph_is_a_snapshot(src_layout):
+    before = get_import_graph(str(src_layout))
+    (src_layout / "src" / "pkg" / "util.py").write_text("from pkg import core\n")
+    (src_layout / "src" / "pkg" / "extra.py").write_text("")
+    after = get_import_graph(str(src_layout))
+    assert "pkg.extra" not in before.modules and before.edges["pkg.util"] == set()
+    assert "pkg.extra" in after.modules and after.edges["pkg.util"] == {"pkg.core"}
+    assert after.cycles() == [["pkg.core", "pkg.util"]]
@@ -0,0 +1,30 @@
+"""
+Tests for the command-line entry point.
+"""
+
+import json
+
+from google.adk.agents import LlmAgent
+
+from coding_assistant.agent import root_agent
+from coding_assistant.main import run_coding_assistant
+from coding_assistant.shared_libraries.scripted_llm import ScriptedLlm
+
+
+def _models(agent) -> dict:
+    models = {agent.name: agent.model} if isinstance(agent, LlmAgent) else {}
+    for sub_agent in agent.sub_agents:
+        models.update(_models(sub_agent))
+    return models
+
+
+def test_scripted_run_keeps_the_agent_models(tmp_path, capsys):
+    script = tmp_path / "script.json"
+    script.write_text(json.dumps({"latency_ms": 0, "steps": [{"text": "Done."}]}))
+    before = _models(root_agent)
+
+    run_coding_assistant("Say done", script=str(script))
+
+    assert "Done." in capsys.readouterr().out
+    assert _models(root_agent) == before
+    assert not any(isinstance(model, ScriptedLlm) for model in before.values())
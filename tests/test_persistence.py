@@ -0,0 +1,66 @@
+"""
+Tests for the SQLite session and artifact services.
+"""
+
+import asyncio
+
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from coding_assistant.shared_libraries.persistence import SqliteArtifactService, SqliteSessionService
+
+
+def test_session_round_trip(tmp_path):
+    async def run():
+        service = SqliteSessionService(str(tmp_path / "sessions.db"))
+        session = await service.create_session(app_name="app", user_id="u", state={"project": "demo"})
+        for i in range(3):
+            await service.append_event(session, Event(
+                author="user",
+                invocation_id=f"inv-{i}",
+                content=types.Content(role="user", parts=[types.Part(text=f"message {i}")]),
+                actions=EventActions(state_delta={"step": i, "user:theme": "dark", "temp:scratch": i}),
+            ))
+        await service.flush()
+
+        reopened = SqliteSessionService(str(tmp_path / "sessions.db"))
+        loaded = await reopened.get_session(app_name="app", user_id="u", session_id=session.id)
+        assert [event.content.parts[0].text for event in loaded.events] == ["message 0", "message 1", "message 2"]
+        assert loaded.state["project"] == "demo"
+        assert loaded.state["step"] == 2
+        assert loaded.state["user:theme"] == "dark"
+        assert "temp:scratch" not in loaded.state
+
+        other = await reopened.create_session(app_name="app", user_id="u")
+        assert other.state["user:theme"] == "dark"
+        assert {s.id for s in (await reopened.list_sessions(app_name="app", user_id="u")).sessions} == {session.id, other.id}
+
+        assert await reopened.compact(max_events=1) == 2
+        loaded = await reopened.get_session(app_name="app", user_id="u", session_id=session.id)
+        assert [event.content.parts[0].text for event in loaded.events] == ["message 2"]
+        assert loaded.state["step"] == 2
+
+        await reopened.delete_session(app_name="app", user_id="u", session_id=session.id)
+        assert await reopened.get_session(app_name="app", user_id="u", session_id=session.id) is None
+
+    asyncio.run(run())
+
+
+def test_artifact_versions(tmp_path):
+    async def run():
+        service = SqliteArtifactService(str(tmp_path / "artifacts.db"))
+        keys = dict(app_name="app", user_id="u", session_id="s")
+        for text in ("first", "second"):
+            await service.save_artifact(filename="plan.md", artifact=types.Part(text=text), **keys)
+        await service.save_artifact(filename="user:notes.md", artifact=types.Part(text="notes"), **keys)
+
+        assert (await service.load_artifact(filename="plan.md", **keys)).text == "second"
+        assert (await service.load_artifact(filename="plan.md", version=0, **keys)).text == "first"
+        assert await service.list_versions(filename="plan.md", **keys) == [0, 1]
+        assert await service.list_artifact_keys(**keys) == ["plan.md", "user:notes.md"]
+        assert await service.list_artifact_keys(app_name="app", user_id="u", session_id="other") == ["user:notes.md"]
+
+        await service.delete_artifact(filename="plan.md", **keys)
+        assert await service.load_artifact(filename="plan.md", **keys) is None
+
+    asyncio.run(run())
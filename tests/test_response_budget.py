@@ -0,0 +1,56 @@
+"""
+Tests for response budgeting and paging through get_more_results.
+"""
+
+from coding_assistant.tools.response_budget import get_more_results, response_budget
+
+
+def _merge(pages: list) -> dict:
+    """Reassemble a paged response: lists and long texts continue, small fields repeat."""
+    merged = {}
+    for page in pages:
+        for key, value in page.items():
+            if key in ("next_cursor", "remaining_tokens", "budget_message"):
+                continue
+            if key not in merged:
+                merged[key] = value
+            elif isinstance(value, list):
+                merged[key] = merged[key] + value
+            elif isinstance(value, str) and merged[key] != value:
+                merged[key] += value
+    return merged
+
+
+def _page_through(response: dict, max_tokens: int) -> list:
+    limit = response_budget(max_tokens=max_tokens)
+    pages = [limit(None, {}, None, response) or response]
+    while "next_cursor" in pages[-1]:
+        rest = get_more_results(pages[-1]["next_cursor"], tool_context=None)
+        assert "error" not in rest
+        # The agent's callback budgets get_more_results the same way
+        pages.append(limit(None, {}, None, rest) or rest)
+        assert len(pages) < 100
+    return pages
+
+
+def test_small_responses_are_untouched():
+    response = {"success": True, "content": "short"}
+    assert response_budget(max_tokens=100)(None, {}, None, response) is None
+
+
+def test_paging_returns_every_entry_once():
+    response = {
+        "success": True,
+        "path": "src/app.py",
+        "items": [f"entry {i:04d} " + "x" * 40 for i in range(400)],
+        "content": "".join(f"line {i}\n" for i in range(3000)),
+    }
+    pages = _page_through(response, max_tokens=1000)
+    assert len(pages) > 2
+    assert all(page["path"] == "src/app.py" for page in pages)
+    assert _merge(pages) == response
+
+
+def test_unknown_cursor_fails():
+    result = get_more_results("no-such-cursor", tool_context=None)
+    assert result["success"] is False
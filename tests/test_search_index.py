@@ -0,0 +1,58 @@
+"""
+Tests for the trigram index: it may only ever narrow a search, never change its result.
+"""
+
+import pytest
+
+from coding_assistant.shared_libraries import constants
+from coding_assistant.tools.grep import grep_files
+from coding_assistant.tools.search_index import extract_query
+
+FILES = {
+    "ecole.txt": "L'École est fermée\n",
+    "kelvin.txt": "Temperatures in \u212aELVIN\n",
+    "plain.txt": "school and kelvin scale\n",
+    "mixed.py": "def Load_Config():\n    return CONFIG\n",
+}
+
+PATTERNS = [
+    r"(?i:école)",
+    r"(?i:kelvin)",
+    r"(?i:load_)Config",
+    r"(?i)config",
+    r"sch(?i:OOL)",
+    r"(?i:(?-i:Load)_CONFIG)",
+    r"scale|(?i:RETURN)",
+]
+
+
+class _ToolContext:
+    def __init__(self, project_path: str):
+        self.state = {constants.PROJECT_PATH: project_path}
+
+
+def _matches(directory: str, pattern: str) -> list:
+    result = grep_files(directory, pattern, tool_context=_ToolContext(directory))
+    assert result["success"], result
+    return [(entry["file"], match["line_number"]) for entry in result["file_matches"] for match in entry["matches"]]
+
+
+@pytest.fixture
+def project(tmp_path):
+    for name, text in FILES.items():
+        (tmp_path / name).write_text(text, encoding="utf-8")
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_index_matches_full_scan(project, pattern, monkeypatch):
+    indexed = _matches(project, pattern)
+    monkeypatch.setenv("CODING_ASSISTANT_GREP_INDEX", "0")
+    assert indexed == _matches(project, pattern)
+    assert indexed
+
+
+def test_scoped_ignore_case_folds_trigrams():
+    # The group folds case, so its trigrams must be the case-insensitive ones
+    assert extract_query(r"(?i:HELLO)") == extract_query(r"hello", 0)
+    assert extract_query(r"(?i:kelvin)") != extract_query(r"kelvin")
@@ -0,0 +1,42 @@
+"""
+Tests for the shared directory walker and its ignore rules.
+"""
+
+import pytest
+
+from coding_assistant.tools.walker import iter_files, walk_reaches
+
+
+@pytest.fixture
+def tree(tmp_path):
+    files = [
+        "README.md", "app.log", "keep.log", "src/main.py", "src/gen/out.py",
+        "src/vendor/lib.py", "docs/index.md", "docs/build/page.html",
+        "node_modules/pkg/index.js", "tmp/cache.txt", "data/tmp",
+    ]
+    for name in files:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x\n")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".gitignore").write_text("*.log\n!keep.log\ntmp/\n/src/gen\n")
+    (tmp_path / "src" / ".gitignore").write_text("vendor/\n")
+    return tmp_path
+
+
+def test_ignore_rules_and_excludes(tree):
+    assert sorted(item.relpath for item in iter_files(str(tree))) == [
+        ".gitignore", "README.md", "data/tmp", "docs/index.md", "keep.log", "src/.gitignore", "src/main.py",
+    ]
+
+
+def test_walking_a_subdirectory_applies_ancestor_rules(tree):
+    assert [item.relpath for item in iter_files(str(tree / "src"))] == [".gitignore", "main.py"]
+
+
+@pytest.mark.parametrize("relpath, reached", [
+    ("", True), ("src", True), ("docs", True), ("src/gen", False), ("src/vendor", False),
+    ("docs/build", False), ("node_modules/pkg", False), ("tmp", False), ("..", False),
+])
+def test_walk_reaches(tree, relpath, reached):
+    assert walk_reaches(str(tree), str(tree / relpath)) is reached